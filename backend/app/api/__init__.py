@@ -1,3 +0,0 @@
-from app.api import auth, dashboard, medicines, purchases, sales, suppliers, users
-
-__all__ = ["auth", "dashboard", "medicines", "purchases", "sales", "suppliers", "users"]
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db, row_columns
+from app.core.http_cache import conditional
+from app.core.rbac import branch_db, current_branch, require_roles
+from app.models.audit_log import AuditLog
+from app.models.user import User
+from app.schemas.audit import AuditPage
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+
+@router.get("", response_model=AuditPage, dependencies=[Depends(conditional("audit_log"))])
+def list_audit(
+    action: str | None = None,
+    entity: str | None = None,
+    entity_id: int | None = None,
+    user_id: int | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    before_id: int | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(branch_db(get_read_db)),
+    branch_id: int = Depends(current_branch),
+    current_user: User = Depends(require_roles(["Admin"])),
+):
+    query = select(*row_columns(AuditLog))
+    if current_user.role == "Super Admin":
+        # Suppliers, users and branches are shared, so their entries carry no branch.
+        query = query.where(or_(AuditLog.branch_id == branch_id, AuditLog.branch_id.is_(None)))
+    else:
+        query = query.where(AuditLog.branch_id == branch_id)
+    if action:
+        query = query.where(AuditLog.action == action)
+    if entity:
+        query = query.where(AuditLog.entity == entity)
+    if entity_id is not None:
+        query = query.where(AuditLog.entity_id == entity_id)
+    if user_id is not None:
+        query = query.where(AuditLog.user_id == user_id)
+    if date_from:
+        query = query.where(AuditLog.at >= date_from)
+    if date_to:
+        query = query.where(AuditLog.at < date_to)
+    if before_id is not None:
+        query = query.where(AuditLog.id < before_id)
+
+    items = db.execute(query.order_by(AuditLog.id.desc()).limit(limit)).all()
+    return AuditPage(items=items, next_before_id=items[-1].id if len(items) == limit else None)
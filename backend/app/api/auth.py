@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from app.core.audit import record
 from app.core.database import get_db
+from app.core.ratelimit import limiter
 from app.core.rbac import get_current_user
 from app.core.security import hash_password, verify_password
+from app.core.statements import USER_BY_LOGIN
 from app.models.user import User
 from app.schemas.auth import ChangePasswordRequest, LoginRequest
 from app.schemas.user import UserRead
@@ -17,12 +19,10 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
     identifier = payload.username.strip()
     if not identifier:
         raise HTTPException(status_code=400, detail="Username is required")
+    # The middleware limits each IP; this also limits guessing one account from many addresses.
+    limiter.check("login", f"account:{identifier.lower()}")
 
-    user = (
-        db.query(User)
-        .filter(or_(User.username == identifier, User.email == identifier))
-        .first()
-    )
+    user = db.scalar(USER_BY_LOGIN, {"login": identifier})
 
     if not user or not user.active or not verify_password(payload.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid username or password")
@@ -40,5 +40,6 @@ def change_password(
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
     current_user.password_hash = hash_password(payload.new_password)
+    record(db, "user.password_changed", "user", current_user.id)
     db.commit()
     return {"message": "Password updated"}
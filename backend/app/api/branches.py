@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.audit import record
+from app.core.database import get_db, get_readonly_db, row_columns
+from app.core.http_cache import conditional
+from app.core.rbac import get_current_user, require_roles
+from app.models.branch import Branch
+from app.models.user import User
+from app.schemas.branch import BranchCreate, BranchRead, BranchUpdate
+
+router = APIRouter(prefix="/branches", tags=["branches"])
+
+
+@router.get("", response_model=list[BranchRead], dependencies=[Depends(conditional("branches"))])
+def list_branches(db: Session = Depends(get_readonly_db), user: User = Depends(get_current_user)):
+    query = select(*row_columns(Branch)).order_by(Branch.name.asc())
+    if user.role != "Super Admin":
+        query = query.where(Branch.id == user.branch_id)
+    return list(db.execute(query).all())
+
+
+@router.post(
+    "",
+    response_model=BranchRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_roles(["Super Admin"]))],
+)
+def create_branch(payload: BranchCreate, db: Session = Depends(get_db)):
+    if db.scalar(select(Branch.id).where(Branch.name == payload.name)):
+        raise HTTPException(status_code=400, detail="Branch already exists")
+
+    branch = Branch(**payload.model_dump())
+    db.add(branch)
+    db.flush()
+    record(db, "branch.created", "branch", branch.id, payload.model_dump())
+    db.commit()
+    db.refresh(branch)
+    return branch
+
+
+@router.put("/{branch_id}", response_model=BranchRead, dependencies=[Depends(require_roles(["Super Admin"]))])
+def update_branch(branch_id: int, payload: BranchUpdate, db: Session = Depends(get_db)):
+    branch = db.get(Branch, branch_id)
+    if not branch:
+        raise HTTPException(status_code=404, detail="Branch not found")
+    if db.scalar(select(Branch.id).where(Branch.name == payload.name, Branch.id != branch_id)):
+        raise HTTPException(status_code=400, detail="Branch already exists")
+
+    for field, value in payload.model_dump().items():
+        setattr(branch, field, value)
+    record(db, "branch.updated", "branch", branch_id, payload.model_dump())
+    db.commit()
+    db.refresh(branch)
+    return branch
@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.events import broker, format_event
+from app.core.rbac import get_current_user
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+def stream_branch(
+    user_id: int | None = None,
+    branch_id: int | None = None,
+    x_user_id: int | None = Header(None, alias="X-User-Id"),
+) -> int:
+    # EventSource cannot send headers, so the identity may also come as query parameters.
+    # The session is closed right away so long-lived streams do not pin pooled connections.
+    with SessionLocal() as db:
+        user = get_current_user(x_user_id or user_id, db)
+    if branch_id is not None and branch_id != user.branch_id and user.role != "Super Admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return branch_id if branch_id is not None else user.branch_id
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+    branch_id: int = Depends(stream_branch),
+):
+    async def stream():
+        queue = broker.subscribe(last_event_id or request.query_params.get("last_event_id"))
+        try:
+            yield f"retry: {int(settings.bootstrap_retry_seconds * 1000)}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.event_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["data"].get("branch_id", branch_id) != branch_id:
+                    continue
+                yield format_event(event)
+        finally:
+            broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
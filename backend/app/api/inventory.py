@@ -0,0 +1,170 @@
+from datetime import date, datetime, timedelta
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db
+from app.core.http_cache import conditional
+from app.core.rbac import branch_db, current_branch, require_roles
+from app.models.forecast import MedicineForecast
+from app.models.medicine import Medicine
+from app.models.purchase import Purchase
+from app.models.purchase_item import PurchaseItem
+from app.models.sale_item import SaleItem
+from app.models.supplier import Supplier
+from app.schemas.inventory import MedicineForecastRead, ReorderSuggestion, ReorderSuggestions, SupplierReorder
+
+router = APIRouter(prefix="/inventory", tags=["inventory"])
+
+
+def _latest_costs(db: Session, medicine_ids: list[int]) -> dict[int, float]:
+    if not medicine_ids:
+        return {}
+    rows = db.execute(
+        select(PurchaseItem.medicine_id, PurchaseItem.unit_cost)
+        .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+        .where(PurchaseItem.medicine_id.in_(medicine_ids))
+        .order_by(PurchaseItem.medicine_id, Purchase.purchased_at.desc())
+        .distinct(PurchaseItem.medicine_id)
+    ).all()
+    return {medicine_id: float(unit_cost) for medicine_id, unit_cost in rows}
+
+
+@router.get(
+    "/reorder-suggestions",
+    response_model=ReorderSuggestions,
+    dependencies=[
+        Depends(require_roles(["Admin", "Pharmacist", "Inventory"])),
+        Depends(conditional("medicines", "suppliers", "sale_items", "purchases", "purchase_items", daily=True)),
+    ],
+)
+def reorder_suggestions(
+    window_days: int = Query(28, ge=7, le=365),
+    lead_time_days: int = Query(7, ge=0, le=180),
+    cover_days: int = Query(14, ge=1, le=365),
+    supplier_id: int | None = None,
+    db: Session = Depends(branch_db(get_read_db)),
+    branch_id: int = Depends(current_branch),
+):
+    import numpy as np
+
+    from app.core.reorder import ReorderPolicy, demand_matrix, suggest
+
+    policy = ReorderPolicy(window_days=window_days, lead_time_days=lead_time_days, cover_days=cover_days)
+    medicines = select(Medicine.id, Medicine.name, Medicine.stock_qty, Medicine.supplier_id, Medicine.unit_price).where(
+        Medicine.branch_id == branch_id
+    )
+    if supplier_id is not None:
+        medicines = medicines.where(Medicine.supplier_id == supplier_id)
+    catalog = db.execute(medicines.order_by(Medicine.id)).all()
+    generated_at = datetime.utcnow()
+    if not catalog:
+        return ReorderSuggestions(
+            generated_at=generated_at,
+            window_days=window_days,
+            lead_time_days=lead_time_days,
+            cover_days=cover_days,
+            suppliers=[],
+        )
+
+    start = date.today() - timedelta(days=window_days - 1)
+    day = (cast(SaleItem.sold_at, Date) - start).label("day")
+    daily = db.execute(
+        select(SaleItem.medicine_id, day, func.sum(SaleItem.quantity))
+        .where(
+            SaleItem.sold_at >= datetime.combine(start, datetime.min.time()),
+            SaleItem.medicine_id.in_(select(Medicine.id).where(Medicine.branch_id == branch_id)),
+        )
+        .group_by(SaleItem.medicine_id, day)
+    ).all()
+
+    ids, names, stock, suppliers, prices = zip(*catalog)
+    medicine_ids = np.asarray(ids, dtype=np.int64)
+    sales = np.asarray(daily, dtype=np.int64).reshape(-1, 3)
+    demand = demand_matrix(medicine_ids, sales[:, 0], sales[:, 1], sales[:, 2], window_days)
+    result = suggest(np.asarray(stock, dtype=np.float64), demand, policy)
+
+    selected = np.flatnonzero(result["suggested_qty"] > 0)
+    selected = selected[np.argsort(result["days_of_cover"][selected], kind="stable")]
+    costs = _latest_costs(db, [ids[index] for index in selected])
+    supplier_names = dict(db.execute(select(Supplier.id, Supplier.name)).all())
+
+    grouped: dict[int | None, SupplierReorder] = {}
+    for index in selected.tolist():
+        quantity = int(result["suggested_qty"][index])
+        cover = float(result["days_of_cover"][index])
+        unit_cost = costs.get(ids[index], float(prices[index]))
+        group = grouped.setdefault(
+            suppliers[index],
+            SupplierReorder(
+                supplier_id=suppliers[index],
+                supplier_name=supplier_names.get(suppliers[index]),
+                estimated_cost=0.0,
+                items=[],
+            ),
+        )
+        group.items.append(
+            ReorderSuggestion(
+                medicine_id=ids[index],
+                name=names[index],
+                stock_qty=stock[index],
+                average_daily_demand=round(float(result["average_daily_demand"][index]), 3),
+                days_of_cover=round(cover, 1) if np.isfinite(cover) else None,
+                reorder_point=int(result["reorder_point"][index]),
+                suggested_qty=quantity,
+                estimated_cost=round(quantity * unit_cost, 2),
+            )
+        )
+        group.estimated_cost = round(group.estimated_cost + quantity * unit_cost, 2)
+
+    return ReorderSuggestions(
+        generated_at=generated_at,
+        window_days=window_days,
+        lead_time_days=lead_time_days,
+        cover_days=cover_days,
+        suppliers=sorted(grouped.values(), key=lambda group: group.estimated_cost, reverse=True),
+    )
+
+
+@router.get(
+    "/forecast",
+    response_model=list[MedicineForecastRead],
+    dependencies=[
+        Depends(require_roles(["Admin", "Pharmacist", "Inventory"])),
+        Depends(conditional("medicine_forecasts", "medicines")),
+    ],
+)
+def list_forecasts(
+    supplier_id: int | None = None,
+    medicine_id: int | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(branch_db(get_read_db)),
+    branch_id: int = Depends(current_branch),
+):
+    query = (
+        select(MedicineForecast, Medicine.name, Medicine.supplier_id)
+        .join(Medicine, Medicine.id == MedicineForecast.medicine_id)
+        .where(Medicine.branch_id == branch_id)
+        .order_by(MedicineForecast.medicine_id)
+        .limit(limit)
+        .offset(offset)
+    )
+    if supplier_id is not None:
+        query = query.where(Medicine.supplier_id == supplier_id)
+    if medicine_id is not None:
+        query = query.where(MedicineForecast.medicine_id == medicine_id)
+
+    return [
+        MedicineForecastRead(
+            medicine_id=forecast.medicine_id,
+            name=name,
+            supplier_id=medicine_supplier_id,
+            fitted_at=forecast.fitted_at,
+            rmse=forecast.rmse,
+            horizon_total=round(sum(forecast.daily_forecast), 2),
+            daily_forecast=forecast.daily_forecast,
+        )
+        for forecast, name, medicine_supplier_id in db.execute(query).all()
+    ]
@@ -1,13 +1,33 @@
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.rbac import require_roles
+from app.api import service
+from app.core import barcodes, prices
+from app.core.audit import record
+from app.core.cache import cached
+from app.core.database import get_db, get_readonly_db
+from app.core.events import publish, publish_stock
+from app.core.http_cache import conditional
+from app.core.money import from_cents, to_cents
+from app.core.rbac import branch_db, current_branch, require_roles
+from app.core.statements import MEDICINE_BARCODE_CONFLICT, MEDICINE_CONFLICT
 from app.models.medicine import Medicine
 from app.models.purchase_item import PurchaseItem
 from app.models.sale_item import SaleItem
-from app.schemas.medicine import MedicineCreate, MedicineRead, MedicineUpdate
+from app.schemas.medicine import (
+    BarcodeMatches,
+    BarcodeResolve,
+    MedicineCreate,
+    MedicineRead,
+    MedicineUpdate,
+    PriceAt,
+    PriceCreate,
+    PriceRead,
+    StockTake,
+    StockTakeReport,
+)
 
 router = APIRouter(prefix="/medicines", tags=["medicines"])
 
@@ -15,82 +35,229 @@ router = APIRouter(prefix="/medicines", tags=["medicines"])
 @router.get(
     "",
     response_model=list[MedicineRead],
+    dependencies=[
+        Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"])),
+        Depends(conditional("medicines")),
+    ],
+)
+def list_medicines(db: Session = Depends(branch_db(get_readonly_db)), branch_id: int = Depends(current_branch)):
+    return service.list_medicines(db, branch_id)
+
+
+@router.get(
+    "/by-barcode/{code}",
+    response_model=MedicineRead,
     dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"]))],
 )
-def list_medicines(db: Session = Depends(get_db)):
-    return db.query(Medicine).order_by(Medicine.name.asc()).all()
+def get_medicine_by_barcode(code: str, branch_id: int = Depends(current_branch)):
+    medicine = barcodes.index.get(branch_id, code.strip())
+    if not medicine:
+        raise HTTPException(status_code=404, detail="Medicine not found")
+    return medicine
+
+
+@router.post(
+    "/by-barcode",
+    response_model=BarcodeMatches,
+    dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"]))],
+)
+def resolve_barcodes(payload: BarcodeResolve, branch_id: int = Depends(current_branch)):
+    codes = list(dict.fromkeys(code.strip() for code in payload.codes))
+    items = barcodes.index.resolve(branch_id, codes)
+    return BarcodeMatches(items=items, missing=[code for code in codes if code not in items])
 
 
 @router.get(
     "/{medicine_id}",
     response_model=MedicineRead,
-    dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"]))],
+    dependencies=[
+        Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"])),
+        Depends(conditional("medicines")),
+    ],
 )
-def get_medicine(medicine_id: int, db: Session = Depends(get_db)):
-    medicine = db.get(Medicine, medicine_id)
+def get_medicine(
+    medicine_id: int,
+    db: Session = Depends(branch_db(get_readonly_db)),
+    branch_id: int = Depends(current_branch),
+):
+    medicine = _medicine(medicine_id, branch_id, db)
     if not medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
     return medicine
 
 
+@cached(
+    "medicine",
+    key=lambda medicine_id, branch_id, db: f"{branch_id}:{medicine_id}",
+    tags=lambda medicine_id, branch_id, db: ["medicines", f"medicines:{medicine_id}"],
+)
+def _medicine(medicine_id: int, branch_id: int, db: Session) -> MedicineRead | None:
+    medicine = _branch_medicine(db, branch_id, medicine_id)
+    return MedicineRead.model_validate(medicine) if medicine else None
+
+
+def _branch_medicine(db: Session, branch_id: int, medicine_id: int) -> Medicine | None:
+    medicine = db.get(Medicine, medicine_id)
+    return medicine if medicine and medicine.branch_id == branch_id else None
+
+
 @router.post(
     "",
     response_model=MedicineRead,
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
 )
-def create_medicine(payload: MedicineCreate, db: Session = Depends(get_db)):
-    exists = db.query(Medicine).filter(Medicine.name == payload.name).first()
-    if exists:
-        raise HTTPException(status_code=400, detail="Medicine already exists")
-
-    med = Medicine(**payload.model_dump())
-    db.add(med)
+def create_medicine(payload: MedicineCreate, db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
+    try:
+        med = service.create_medicine(db, branch_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     db.commit()
     db.refresh(med)
     return med
 
 
+@router.post(
+    "/stock-take",
+    response_model=StockTakeReport,
+    dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
+)
+def stock_take(payload: StockTake, db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
+    try:
+        report = service.stock_take(db, branch_id, payload.counts, payload.dry_run)
+    except service.MedicineNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if payload.dry_run:
+        db.rollback()
+    else:
+        db.commit()
+    return report
+
+
 @router.put(
     "/{medicine_id}",
     response_model=MedicineRead,
     dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
 )
-def update_medicine(medicine_id: int, payload: MedicineUpdate, db: Session = Depends(get_db)):
-    medicine = db.get(Medicine, medicine_id)
+def update_medicine(
+    medicine_id: int,
+    payload: MedicineUpdate,
+    db: Session = Depends(get_db),
+    branch_id: int = Depends(current_branch),
+):
+    medicine = _branch_medicine(db, branch_id, medicine_id)
     if not medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
 
-    duplicate = (
-        db.query(Medicine)
-        .filter(or_(Medicine.name == payload.name, Medicine.batch_number == payload.batch_number), Medicine.id != medicine_id)
-        .first()
-    )
-    if duplicate:
+    params = {"branch_id": branch_id, "medicine_id": medicine_id}
+    if db.scalar(MEDICINE_CONFLICT, {**params, "name": payload.name, "batch_number": payload.batch_number}):
         raise HTTPException(status_code=400, detail="Medicine with same name or batch already exists")
+    if payload.barcode and db.scalar(MEDICINE_BARCODE_CONFLICT, {**params, "barcode": payload.barcode}):
+        raise HTTPException(status_code=400, detail="Barcode already in use")
 
-    for field, value in payload.model_dump().items():
+    values = payload.model_dump()
+    values["unit_price"] = from_cents(to_cents(payload.unit_price))
+    changes = {
+        field: [str(getattr(medicine, field)), str(value)]
+        for field, value in values.items()
+        if getattr(medicine, field) != value
+    }
+    if "unit_price" in changes:
+        try:
+            service.set_price(db, medicine, values["unit_price"])
+        except service.PriceConflict as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+    for field, value in values.items():
         setattr(medicine, field, value)
+    publish_stock(db, [medicine])
+    record(db, "medicine.updated", "medicine", medicine_id, changes)
     db.commit()
     db.refresh(medicine)
     return medicine
 
 
+@router.get(
+    "/{medicine_id}/prices",
+    response_model=list[PriceRead],
+    dependencies=[
+        Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"])),
+        Depends(conditional("medicine_prices", "medicines")),
+    ],
+)
+def list_prices(
+    medicine_id: int,
+    db: Session = Depends(branch_db(get_readonly_db)),
+    branch_id: int = Depends(current_branch),
+):
+    if not _branch_medicine(db, branch_id, medicine_id):
+        raise HTTPException(status_code=404, detail="Medicine not found")
+    return service.price_history(db, medicine_id)
+
+
+@router.post(
+    "/{medicine_id}/prices",
+    response_model=PriceRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
+)
+def set_price(
+    medicine_id: int,
+    payload: PriceCreate,
+    db: Session = Depends(get_db),
+    branch_id: int = Depends(current_branch),
+):
+    medicine = _branch_medicine(db, branch_id, medicine_id)
+    if not medicine:
+        raise HTTPException(status_code=404, detail="Medicine not found")
+    try:
+        price = service.set_price(db, medicine, payload.unit_price, payload.effective_from)
+    except service.PriceConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    publish_stock(db, [medicine])
+    db.commit()
+    db.refresh(price)
+    return price
+
+
+@router.get(
+    "/{medicine_id}/price",
+    response_model=PriceAt,
+    dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"]))],
+)
+def get_price(
+    medicine_id: int,
+    at: datetime | None = None,
+    db: Session = Depends(branch_db(get_readonly_db)),
+    branch_id: int = Depends(current_branch),
+):
+    if at is None:
+        at = datetime.utcnow()
+    elif at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    unit_price = prices.cache.resolve(db, branch_id, [medicine_id], at).get(medicine_id)
+    if unit_price is None:
+        raise HTTPException(status_code=404, detail="Medicine not found")
+    return PriceAt(medicine_id=medicine_id, at=at, unit_price=unit_price)
+
+
 @router.patch(
     "/{medicine_id}/stock",
     response_model=MedicineRead,
     dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
 )
-def update_stock(medicine_id: int, delta: int, db: Session = Depends(get_db)):
-    med = db.query(Medicine).filter(Medicine.id == medicine_id).first()
-    if not med:
-        raise HTTPException(status_code=404, detail="Medicine not found")
-
-    new_qty = med.stock_qty + delta
-    if new_qty < 0:
-        raise HTTPException(status_code=400, detail="Stock cannot be negative")
+def update_stock(medicine_id: int, delta: int, db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
+    try:
+        med = service.adjust_stock(db, branch_id, [(medicine_id, delta)])[medicine_id]
+    except service.MedicineNotFound as exc:
+        raise HTTPException(status_code=404, detail="Medicine not found") from exc
+    except service.InsufficientStock as exc:
+        raise HTTPException(status_code=400, detail="Stock cannot be negative") from exc
 
-    med.stock_qty = new_qty
+    record(db, "medicine.stock_adjusted", "medicine", medicine_id, {"delta": delta, "stock_qty": med.stock_qty})
     db.commit()
     db.refresh(med)
     return med
@@ -101,8 +268,8 @@ def update_stock(medicine_id: int, delta: int, db: Session = Depends(get_db)):
     status_code=status.HTTP_204_NO_CONTENT,
     dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
 )
-def delete_medicine(medicine_id: int, db: Session = Depends(get_db)):
-    medicine = db.get(Medicine, medicine_id)
+def delete_medicine(medicine_id: int, db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
+    medicine = _branch_medicine(db, branch_id, medicine_id)
     if not medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
 
@@ -112,5 +279,7 @@ def delete_medicine(medicine_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Cannot delete medicine linked to sales or purchases")
 
     db.delete(medicine)
+    publish(db, "medicine.deleted", {"id": medicine_id, "branch_id": branch_id})
+    record(db, "medicine.deleted", "medicine", medicine_id, {"name": medicine.name, "stock_qty": medicine.stock_qty})
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
-from app.core.database import get_db
-from app.core.rbac import require_roles
-from app.models.medicine import Medicine
+from app.api import service
+from app.core import supplier_stats
+from app.core.audit import record
+from app.core.database import get_db, get_read_db, get_readonly_db, row_columns
+from app.core.http_cache import conditional
+from app.core.money import from_cents, to_cents
+from app.core.rbac import branch_db, current_branch, require_roles
 from app.models.purchase import Purchase
 from app.models.purchase_item import PurchaseItem
 from app.schemas.purchase import PurchaseCreate, PurchaseRead, PurchaseUpdate
@@ -11,22 +16,53 @@ from app.schemas.purchase import PurchaseCreate, PurchaseRead, PurchaseUpdate
 router = APIRouter(prefix="/purchases", tags=["purchases"])
 
 
+def _branch_purchase(db: Session, branch_id: int, purchase_id: int) -> Purchase | None:
+    return (
+        db.query(Purchase)
+        .options(joinedload(Purchase.items))
+        .filter(Purchase.id == purchase_id, Purchase.branch_id == branch_id)
+        .first()
+    )
+
+
 @router.get(
     "",
     response_model=list[PurchaseRead],
-    dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
+    dependencies=[
+        Depends(require_roles(["Admin", "Pharmacist", "Inventory"])),
+        Depends(conditional("purchases", "purchase_items")),
+    ],
 )
-def list_purchases(db: Session = Depends(get_db)):
-    return db.query(Purchase).options(joinedload(Purchase.items)).order_by(Purchase.purchased_at.desc()).all()
+def list_purchases(db: Session = Depends(branch_db(get_read_db)), branch_id: int = Depends(current_branch)):
+    purchases = db.execute(
+        select(*row_columns(Purchase)).where(Purchase.branch_id == branch_id).order_by(Purchase.purchased_at.desc())
+    ).all()
+    items: dict[int, list] = {}
+    rows = db.execute(
+        select(*row_columns(PurchaseItem))
+        .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+        .where(Purchase.branch_id == branch_id)
+        .order_by(PurchaseItem.id)
+    )
+    for item in rows:
+        items.setdefault(item.purchase_id, []).append(item)
+    return [{**purchase._mapping, "items": items.get(purchase.id, [])} for purchase in purchases]
 
 
 @router.get(
     "/{purchase_id}",
     response_model=PurchaseRead,
-    dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
+    dependencies=[
+        Depends(require_roles(["Admin", "Pharmacist", "Inventory"])),
+        Depends(conditional("purchases", "purchase_items")),
+    ],
 )
-def get_purchase(purchase_id: int, db: Session = Depends(get_db)):
-    purchase = db.query(Purchase).options(joinedload(Purchase.items)).filter(Purchase.id == purchase_id).first()
+def get_purchase(
+    purchase_id: int,
+    db: Session = Depends(branch_db(get_readonly_db)),
+    branch_id: int = Depends(current_branch),
+):
+    purchase = _branch_purchase(db, branch_id, purchase_id)
     if not purchase:
         raise HTTPException(status_code=404, detail="Purchase not found")
     return purchase
@@ -38,7 +74,7 @@ def get_purchase(purchase_id: int, db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
 )
-def create_purchase(payload: PurchaseCreate, db: Session = Depends(get_db)):
+def create_purchase(payload: PurchaseCreate, db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
     if not payload.items:
         raise HTTPException(status_code=400, detail="Purchase must include at least one item")
 
@@ -46,32 +82,47 @@ def create_purchase(payload: PurchaseCreate, db: Session = Depends(get_db)):
         supplier_id=payload.supplier_id,
         invoice_number=payload.invoice_number,
         note=payload.note,
+        branch_id=branch_id,
     )
     db.add(purchase)
 
-    total_amount = 0.0
-    for raw_item in payload.items:
-        med = db.get(Medicine, raw_item.medicine_id)
-        if not med:
-            raise HTTPException(status_code=400, detail=f"Medicine {raw_item.medicine_id} not found")
+    try:
+        medicines = service.adjust_stock(db, branch_id, [(item.medicine_id, item.quantity) for item in payload.items])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-        med.stock_qty += raw_item.quantity
+    total_cents = 0
+    for raw_item in payload.items:
+        med = medicines[raw_item.medicine_id]
         if payload.supplier_id and med.supplier_id != payload.supplier_id:
             med.supplier_id = payload.supplier_id
 
-        line_total = raw_item.unit_cost * raw_item.quantity
-        total_amount += line_total
+        cost_cents = to_cents(raw_item.unit_cost)
+        line_cents = cost_cents * raw_item.quantity
+        total_cents += line_cents
 
         purchase.items.append(
             PurchaseItem(
                 medicine_id=med.id,
                 quantity=raw_item.quantity,
-                unit_cost=raw_item.unit_cost,
-                line_total=line_total,
+                unit_cost=from_cents(cost_cents),
+                line_total=from_cents(line_cents),
             )
         )
 
-    purchase.total_amount = round(total_amount, 2)
+    purchase.total_amount = from_cents(total_cents)
+    db.flush()
+    supplier_stats.add_purchases(db, [purchase])
+    record(
+        db,
+        "purchase.created",
+        "purchase",
+        purchase.id,
+        {
+            "total_amount": str(purchase.total_amount),
+            "items": [[item.medicine_id, item.quantity] for item in payload.items],
+        },
+    )
     db.commit()
     db.refresh(purchase)
     return purchase
@@ -82,14 +133,23 @@ def create_purchase(payload: PurchaseCreate, db: Session = Depends(get_db)):
     response_model=PurchaseRead,
     dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
 )
-def update_purchase(purchase_id: int, payload: PurchaseUpdate, db: Session = Depends(get_db)):
-    purchase = db.query(Purchase).options(joinedload(Purchase.items)).filter(Purchase.id == purchase_id).first()
+def update_purchase(
+    purchase_id: int,
+    payload: PurchaseUpdate,
+    db: Session = Depends(get_db),
+    branch_id: int = Depends(current_branch),
+):
+    purchase = _branch_purchase(db, branch_id, purchase_id)
     if not purchase:
         raise HTTPException(status_code=404, detail="Purchase not found")
 
-    purchase.supplier_id = payload.supplier_id
+    if purchase.supplier_id != payload.supplier_id:
+        supplier_stats.add_purchases(db, [purchase], sign=-1)
+        purchase.supplier_id = payload.supplier_id
+        supplier_stats.add_purchases(db, [purchase])
     purchase.invoice_number = payload.invoice_number
     purchase.note = payload.note
+    record(db, "purchase.updated", "purchase", purchase_id, payload.model_dump())
     db.commit()
     db.refresh(purchase)
     return purchase
@@ -100,25 +160,23 @@ def update_purchase(purchase_id: int, payload: PurchaseUpdate, db: Session = Dep
     status_code=status.HTTP_204_NO_CONTENT,
     dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
 )
-def delete_purchase(purchase_id: int, db: Session = Depends(get_db)):
-    purchase = db.query(Purchase).options(joinedload(Purchase.items)).filter(Purchase.id == purchase_id).first()
+def delete_purchase(purchase_id: int, db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
+    purchase = _branch_purchase(db, branch_id, purchase_id)
     if not purchase:
         raise HTTPException(status_code=404, detail="Purchase not found")
 
-    for item in purchase.items:
-        medicine = db.get(Medicine, item.medicine_id)
-        if not medicine:
-            raise HTTPException(status_code=400, detail=f"Medicine {item.medicine_id} not found")
-        if medicine.stock_qty < item.quantity:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cannot delete purchase; stock for {medicine.name} is lower than purchased quantity",
-            )
-
-    for item in purchase.items:
-        medicine = db.get(Medicine, item.medicine_id)
-        medicine.stock_qty -= item.quantity
-
+    try:
+        service.adjust_stock(db, branch_id, [(item.medicine_id, -item.quantity) for item in purchase.items])
+    except service.InsufficientStock as exc:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot delete purchase; stock for {exc.medicine.name} is lower than purchased quantity",
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    supplier_stats.add_purchases(db, [purchase], sign=-1)
     db.delete(purchase)
+    record(db, "purchase.deleted", "purchase", purchase_id, {"total_amount": str(purchase.total_amount)})
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,361 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import case, func, literal, select, union_all
+from sqlalchemy.orm import Session, undefer
+
+from app.core.audit import record
+from app.core.database import get_db, get_read_db, get_readonly_db
+from app.core.http_cache import conditional
+from app.core.rbac import branch_db, current_branch, require_roles
+from app.jobs.reports import REPORTS
+from app.models.branch import DEFAULT_BRANCH_ID
+from app.models.medicine import Medicine
+from app.models.purchase import Purchase
+from app.models.purchase_item import PurchaseItem
+from app.models.report_job import ReportJob
+from app.models.sale_item import SaleItem
+from app.models.supplier import Supplier
+from app.models.user import User
+from app.schemas.report import (
+    MarginReport,
+    MarginRow,
+    ReportJobCreate,
+    ReportJobRead,
+    ValuationReport,
+    ValuationRow,
+)
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+report_roles = require_roles(["Admin", "Pharmacist", "Inventory"])
+
+
+def _get_job(db: Session, job_id: int, user: User, branch_id: int, *options) -> ReportJob:
+    job = db.query(ReportJob).options(*options).filter(ReportJob.id == job_id).first()
+    if (
+        not job
+        or job.params.get("branch_id", DEFAULT_BRANCH_ID) != branch_id
+        or (job.created_by != user.id and user.role not in {"Admin", "Super Admin"})
+    ):
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+
+@router.post("/jobs", response_model=ReportJobRead, status_code=status.HTTP_202_ACCEPTED)
+def create_report_job(
+    payload: ReportJobCreate,
+    db: Session = Depends(get_db),
+    user: User = Depends(report_roles),
+    branch_id: int = Depends(current_branch),
+):
+    params_model, _ = REPORTS[payload.kind]
+    try:
+        params = params_model.model_validate({**payload.params, "branch_id": branch_id})
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=json.loads(exc.json(include_url=False))) from exc
+
+    job = ReportJob(kind=payload.kind, params=params.model_dump(mode="json"), created_by=user.id)
+    db.add(job)
+    db.flush()
+    record(db, "report_job.created", "report_job", job.id, {"kind": job.kind})
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+@router.get(
+    "/jobs",
+    response_model=list[ReportJobRead],
+    dependencies=[Depends(report_roles), Depends(conditional("report_jobs"))],
+)
+def list_report_jobs(
+    status_filter: str | None = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(branch_db(get_readonly_db)),
+    user: User = Depends(report_roles),
+    branch_id: int = Depends(current_branch),
+):
+    # Jobs queued before branches existed carry no branch_id and belong to the default branch.
+    job_branch = func.coalesce(ReportJob.params["branch_id"].as_integer(), DEFAULT_BRANCH_ID)
+    query = db.query(ReportJob).filter(job_branch == branch_id)
+    if user.role not in {"Admin", "Super Admin"}:
+        query = query.filter(ReportJob.created_by == user.id)
+    if status_filter:
+        query = query.filter(ReportJob.status == status_filter)
+    return query.order_by(ReportJob.id.desc()).limit(limit).all()
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=ReportJobRead,
+    dependencies=[Depends(report_roles), Depends(conditional("report_jobs"))],
+)
+def get_report_job(
+    job_id: int,
+    db: Session = Depends(branch_db(get_readonly_db)),
+    user: User = Depends(report_roles),
+    branch_id: int = Depends(current_branch),
+):
+    return _get_job(db, job_id, user, branch_id)
+
+
+@router.get("/jobs/{job_id}/download")
+def download_report(
+    job_id: int,
+    file_format: str = Query("csv", alias="format", pattern="^(csv|json)$"),
+    db: Session = Depends(branch_db(get_readonly_db)),
+    user: User = Depends(report_roles),
+    branch_id: int = Depends(current_branch),
+):
+    job = _get_job(db, job_id, user, branch_id, undefer(ReportJob.result))
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Report job is {job.status}")
+
+    filename = f"{job.kind}-{job.id}.{file_format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if file_format == "json":
+        rows = [dict(zip(job.result["columns"], row)) for row in job.result["rows"]]
+        return StreamingResponse(iter([json.dumps(rows)]), media_type="application/json", headers=headers)
+
+    def lines():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(job.result["columns"])
+        for offset in range(0, len(job.result["rows"]), 1000):
+            writer.writerows(job.result["rows"][offset : offset + 1000])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(lines(), media_type="text/csv", headers=headers)
+
+
+def _money(value) -> float:
+    return round(float(value or 0), 2)
+
+
+@router.get(
+    "/valuation",
+    response_model=ValuationReport,
+    dependencies=[Depends(report_roles), Depends(conditional("medicines", "suppliers", "purchases", "purchase_items"))],
+)
+def stock_valuation(
+    group_by: str = Query("medicine", pattern="^(medicine|supplier)$"),
+    supplier_id: int | None = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(branch_db(get_read_db)),
+    branch_id: int = Depends(current_branch),
+):
+    by_medicine = {"partition_by": PurchaseItem.medicine_id}
+    costs = (
+        select(
+            PurchaseItem.medicine_id,
+            (
+                func.sum(PurchaseItem.line_total).over(**by_medicine)
+                / func.nullif(func.sum(PurchaseItem.quantity).over(**by_medicine), 0)
+            ).label("average_cost"),
+            PurchaseItem.unit_cost.label("last_cost"),
+        )
+        .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+        .where(Purchase.branch_id == branch_id)
+        .order_by(PurchaseItem.medicine_id, Purchase.purchased_at.desc(), PurchaseItem.id.desc())
+        .distinct(PurchaseItem.medicine_id)
+        .subquery()
+    )
+    cost_value = func.coalesce(Medicine.stock_qty * costs.c.average_cost, 0)
+    retail_value = Medicine.stock_qty * Medicine.unit_price
+    uncosted = case((costs.c.average_cost.is_(None), Medicine.stock_qty), else_=0)
+
+    if group_by == "medicine":
+        columns = [
+            Medicine.id.label("medicine_id"),
+            Medicine.name.label("name"),
+            Medicine.stock_qty.label("stock_qty"),
+            costs.c.average_cost,
+            costs.c.last_cost,
+            cost_value.label("cost_value"),
+            retail_value.label("retail_value"),
+            uncosted.label("uncosted_qty"),
+            func.sum(cost_value).over().label("total_cost_value"),
+            func.sum(retail_value).over().label("total_retail_value"),
+        ]
+        group = []
+    else:
+        columns = [
+            func.sum(Medicine.stock_qty).label("stock_qty"),
+            func.sum(cost_value).label("cost_value"),
+            func.sum(retail_value).label("retail_value"),
+            func.sum(uncosted).label("uncosted_qty"),
+            func.sum(func.sum(cost_value)).over().label("total_cost_value"),
+            func.sum(func.sum(retail_value)).over().label("total_retail_value"),
+        ]
+        group = [Medicine.supplier_id, Supplier.name]
+
+    query = (
+        select(Medicine.supplier_id, Supplier.name.label("supplier_name"), *columns)
+        .outerjoin(costs, costs.c.medicine_id == Medicine.id)
+        .outerjoin(Supplier, Supplier.id == Medicine.supplier_id)
+        .where(Medicine.branch_id == branch_id)
+        .order_by(func.sum(cost_value).desc() if group else cost_value.desc())
+        .limit(limit)
+    )
+    if supplier_id is not None:
+        query = query.where(Medicine.supplier_id == supplier_id)
+    if group:
+        query = query.group_by(*group)
+    rows = db.execute(query).mappings().all()
+
+    return ValuationReport(
+        generated_at=datetime.utcnow(),
+        group_by=group_by,
+        cost_value=_money(rows[0]["total_cost_value"]) if rows else 0.0,
+        retail_value=_money(rows[0]["total_retail_value"]) if rows else 0.0,
+        rows=[
+            ValuationRow(
+                medicine_id=row.get("medicine_id"),
+                name=row.get("name"),
+                supplier_id=row["supplier_id"],
+                supplier_name=row["supplier_name"],
+                stock_qty=row["stock_qty"] or 0,
+                average_cost=round(float(row["average_cost"]), 4) if row.get("average_cost") is not None else None,
+                last_cost=float(row["last_cost"]) if row.get("last_cost") is not None else None,
+                cost_value=_money(row["cost_value"]),
+                retail_value=_money(row["retail_value"]),
+                uncosted_qty=row["uncosted_qty"] or 0,
+            )
+            for row in rows
+        ],
+    )
+
+
+@router.get(
+    "/margin",
+    response_model=MarginReport,
+    dependencies=[
+        Depends(report_roles),
+        Depends(conditional("medicines", "suppliers", "purchases", "purchase_items", "sale_items", daily=True)),
+    ],
+)
+def gross_margin(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    group_by: str = Query("medicine", pattern="^(medicine|supplier|none)$"),
+    period: str | None = Query(None, pattern="^(day|week|month)$"),
+    supplier_id: int | None = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(branch_db(get_read_db)),
+    branch_id: int = Depends(current_branch),
+):
+    end = datetime.combine(date_to or date.today() + timedelta(days=1), datetime.min.time())
+    start = datetime.combine(date_from, datetime.min.time()) if date_from else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+
+    purchases = (
+        select(
+            PurchaseItem.medicine_id,
+            Purchase.purchased_at.label("at"),
+            literal(0).label("kind"),
+            PurchaseItem.quantity,
+            PurchaseItem.line_total.label("amount"),
+        )
+        .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+        .where(Purchase.branch_id == branch_id, Purchase.purchased_at < end)
+    )
+    sales = select(
+        SaleItem.medicine_id,
+        SaleItem.sold_at,
+        literal(1),
+        SaleItem.quantity,
+        SaleItem.line_total,
+    ).where(SaleItem.sold_at >= start, SaleItem.sold_at < end)
+    branch_medicines = select(Medicine.id).where(Medicine.branch_id == branch_id)
+    if supplier_id is not None:
+        branch_medicines = branch_medicines.where(Medicine.supplier_id == supplier_id)
+        purchases = purchases.where(PurchaseItem.medicine_id.in_(branch_medicines))
+    sales = sales.where(SaleItem.medicine_id.in_(branch_medicines))
+    events = union_all(purchases, sales).subquery()
+
+    # Each sale is costed at the weighted average of every purchase of that medicine made before it.
+    is_purchase = events.c.kind == 0
+    history = {
+        "partition_by": events.c.medicine_id,
+        "order_by": (events.c.at, events.c.kind),
+        "rows": (None, 0),
+    }
+    costed = select(
+        events.c.medicine_id,
+        events.c.at,
+        events.c.kind,
+        events.c.quantity,
+        events.c.amount,
+        (
+            func.sum(events.c.amount).filter(is_purchase).over(**history)
+            / func.nullif(func.sum(events.c.quantity).filter(is_purchase).over(**history), 0)
+        ).label("average_cost"),
+    ).subquery()
+
+    revenue = func.sum(costed.c.amount)
+    cost = func.coalesce(func.sum(costed.c.quantity * costed.c.average_cost), 0)
+    keys = []
+    if period:
+        keys.append(func.date_trunc(period, costed.c.at).label("period"))
+    if group_by == "medicine":
+        keys += [Medicine.id.label("medicine_id"), Medicine.name.label("name"), Medicine.supplier_id, Supplier.name.label("supplier_name")]
+    elif group_by == "supplier":
+        keys += [Medicine.supplier_id, Supplier.name.label("supplier_name")]
+
+    query = (
+        select(
+            *keys,
+            func.sum(costed.c.quantity).label("quantity"),
+            revenue.label("revenue"),
+            cost.label("cost"),
+            func.sum(case((costed.c.average_cost.is_(None), costed.c.quantity), else_=0)).label("uncosted_qty"),
+            func.sum(revenue).over().label("total_revenue"),
+            func.sum(cost).over().label("total_cost"),
+        )
+        .join(Medicine, Medicine.id == costed.c.medicine_id)
+        .outerjoin(Supplier, Supplier.id == Medicine.supplier_id)
+        .where(costed.c.kind == 1)
+        .order_by(*([keys[0]] if period else []), revenue.desc())
+        .limit(limit)
+    )
+    if keys:
+        query = query.group_by(*keys)
+    rows = db.execute(query).mappings().all()
+
+    total_revenue = _money(rows[0]["total_revenue"]) if rows else 0.0
+    total_cost = _money(rows[0]["total_cost"]) if rows else 0.0
+    return MarginReport(
+        date_from=start,
+        date_to=end,
+        group_by=group_by,
+        period=period,
+        revenue=total_revenue,
+        cost=total_cost,
+        margin=round(total_revenue - total_cost, 2),
+        rows=[
+            MarginRow(
+                period=row.get("period"),
+                medicine_id=row.get("medicine_id"),
+                name=row.get("name"),
+                supplier_id=row.get("supplier_id"),
+                supplier_name=row.get("supplier_name"),
+                quantity=row["quantity"],
+                revenue=_money(row["revenue"]),
+                cost=_money(row["cost"]),
+                margin=_money(row["revenue"] - row["cost"]),
+                margin_pct=round(float((row["revenue"] - row["cost"]) / row["revenue"] * 100), 2) if row["revenue"] else None,
+                uncosted_qty=row["uncosted_qty"],
+            )
+            for row in rows
+        ],
+    )
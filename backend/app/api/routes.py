@@ -1,8 +1,11 @@
-﻿from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.api import service
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.rbac import branch_db, current_branch, get_current_user, require_roles
+from app.models.user import User
+from app.schemas import medicine, sale, supplier
 from app.schemas.pharmacy import (
     DashboardStats,
     MedicineCreate,
@@ -14,60 +17,96 @@ from app.schemas.pharmacy import (
     SupplierRead,
 )
 
-router = APIRouter(prefix="/api", tags=["pharmacy"])
+# Pre-RBAC payload shapes, served from /api/legacy only when LEGACY_ROUTES_ENABLED is set.
+router = APIRouter(prefix="/legacy", tags=["legacy"])
 
+READERS = ["Admin", "Pharmacist", "Inventory", "Cashier"]
+STOCK_WRITERS = ["Admin", "Pharmacist", "Inventory"]
+SELLERS = ["Admin", "Cashier", "Pharmacist"]
 
-@router.get("/medicines", response_model=list[MedicineRead])
-def get_medicines(db: Session = Depends(get_db)):
-    return service.list_medicines(db)
 
-
-@router.post("/medicines", response_model=MedicineRead)
-def post_medicine(payload: MedicineCreate, db: Session = Depends(get_db)):
-    try:
-        return service.create_medicine(db, payload)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+@router.get("/medicines", response_model=list[MedicineRead], dependencies=[Depends(require_roles(READERS))])
+def get_medicines(db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
+    return service.list_medicines(db, branch_id)
 
 
-@router.patch("/medicines/{medicine_id}/stock", response_model=MedicineRead)
-def patch_medicine_stock(medicine_id: int, payload: MedicineStockAdjust, db: Session = Depends(get_db)):
+@router.post("/medicines", response_model=MedicineRead, dependencies=[Depends(require_roles(STOCK_WRITERS))])
+def post_medicine(payload: MedicineCreate, db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
     try:
-        med = service.update_medicine_stock(db, medicine_id, payload)
+        item = service.create_medicine(db, branch_id, medicine.MedicineCreate.model_validate(payload.model_dump()))
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    db.commit()
+    db.refresh(item)
+    return item
 
-    if not med:
-        raise HTTPException(status_code=404, detail="Medicine not found")
+
+@router.patch(
+    "/medicines/{medicine_id}/stock",
+    response_model=MedicineRead,
+    dependencies=[Depends(require_roles(STOCK_WRITERS))],
+)
+def patch_medicine_stock(
+    medicine_id: int,
+    payload: MedicineStockAdjust,
+    db: Session = Depends(get_db),
+    branch_id: int = Depends(current_branch),
+):
+    try:
+        med = service.adjust_stock(db, branch_id, [(medicine_id, payload.delta)])[medicine_id]
+    except service.MedicineNotFound as exc:
+        raise HTTPException(status_code=404, detail="Medicine not found") from exc
+    except service.InsufficientStock as exc:
+        raise HTTPException(status_code=400, detail="Stock cannot be negative") from exc
+    db.commit()
+    db.refresh(med)
     return med
 
 
-@router.get("/suppliers", response_model=list[SupplierRead])
+@router.get("/suppliers", response_model=list[SupplierRead], dependencies=[Depends(require_roles(READERS))])
 def get_suppliers(db: Session = Depends(get_db)):
     return service.list_suppliers(db)
 
 
-@router.post("/suppliers", response_model=SupplierRead)
+@router.post("/suppliers", response_model=SupplierRead, dependencies=[Depends(require_roles(STOCK_WRITERS))])
 def post_supplier(payload: SupplierCreate, db: Session = Depends(get_db)):
     try:
-        return service.create_supplier(db, payload)
-    except Exception as exc:
+        item = service.create_supplier(db, supplier.SupplierCreate.model_validate(payload.model_dump()))
+    except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    db.commit()
+    db.refresh(item)
+    return item
 
 
-@router.get("/sales", response_model=list[SaleRead])
-def get_sales(db: Session = Depends(get_db)):
-    return service.list_sales(db)
+@router.get("/sales", response_model=list[SaleRead], dependencies=[Depends(require_roles(SELLERS))])
+def get_sales(db: Session = Depends(branch_db(get_read_db)), branch_id: int = Depends(current_branch)):
+    return service.list_sales(db, branch_id)
 
 
-@router.post("/sales", response_model=SaleRead)
-def post_sale(payload: SaleCreate, db: Session = Depends(get_db)):
+@router.post("/sales", response_model=SaleRead, dependencies=[Depends(require_roles(SELLERS))])
+def post_sale(
+    payload: SaleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    branch_id: int = Depends(current_branch),
+):
     try:
-        return service.create_sale(db, payload)
+        payloads = [sale.SaleCreate.model_validate(payload.model_dump())]
+        item = service.create_sales(db, branch_id, payloads, current_user.id)[0]
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-
-
-@router.get("/dashboard", response_model=DashboardStats)
-def get_dashboard(db: Session = Depends(get_db)):
-    return service.get_dashboard_stats(db)
+    db.commit()
+    db.refresh(item)
+    return item
+
+
+@router.get("/dashboard", response_model=DashboardStats, dependencies=[Depends(require_roles(READERS))])
+def get_dashboard(db: Session = Depends(branch_db(get_read_db)), branch_id: int = Depends(current_branch)):
+    stats = service.dashboard_stats(db, branch_id)
+    return DashboardStats(
+        total_medicines=stats.medicine_count,
+        low_stock_count=stats.low_stock_count,
+        total_suppliers=stats.supplier_count,
+        total_sales_amount=stats.total_sales,
+    )
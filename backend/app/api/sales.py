@@ -1,43 +1,149 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy.orm import Session, joinedload
-
-from app.core.database import get_db
-from app.core.rbac import get_current_user, require_roles
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.api import service
+from app.core.audit import record
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db, get_read_db, get_readonly_db
+from app.core.http_cache import conditional
+from app.core.rbac import branch_db, current_branch, get_current_user, require_roles
+from app.core.receipts import Receipt, ReceiptLine, document
 from app.models.medicine import Medicine
-from app.models.sale import Sale
+from app.models.sale import Sale, sale_code
 from app.models.sale_item import SaleItem
 from app.models.user import User
-from app.schemas.sale import SaleCreate, SaleRead, SaleUpdate
+from app.schemas.sale import SaleBatchCreate, SaleCreate, SaleRead, SaleUpdate
 
 router = APIRouter(prefix="/sales", tags=["sales"])
 
+RECEIPT_MEDIA_TYPES = {"html": "text/html; charset=utf-8", "text": "text/plain; charset=utf-8"}
+MAX_RECEIPT_DAYS = 31
+
+
+def _receipt_query(branch_id: int):
+    # Sale, seller and line names in one joined query; receipts are cut from consecutive rows of a sale.
+    return (
+        select(
+            Sale.id,
+            Sale.sold_at,
+            Sale.customer_name,
+            Sale.total_amount,
+            func.coalesce(User.name, User.username).label("seller"),
+            Medicine.name.label("medicine_name"),
+            SaleItem.quantity,
+            SaleItem.unit_price,
+            SaleItem.line_total,
+        )
+        .join(SaleItem, and_(SaleItem.sale_id == Sale.id, SaleItem.sold_at == Sale.sold_at))
+        .join(Medicine, Medicine.id == SaleItem.medicine_id)
+        .outerjoin(User, User.id == Sale.user_id)
+        .where(Sale.branch_id == branch_id)
+        .order_by(Sale.sold_at, Sale.id, SaleItem.id)
+    )
+
+
+def _receipts(rows):
+    for _, sale_rows in groupby(rows, key=lambda row: row.id):
+        sale_rows = list(sale_rows)
+        first = sale_rows[0]
+        yield Receipt(
+            code=sale_code(first.id, first.sold_at),
+            sold_at=first.sold_at,
+            seller=first.seller,
+            customer=first.customer_name,
+            total=first.total_amount,
+            lines=[ReceiptLine(row.medicine_name, row.quantity, row.unit_price, row.line_total) for row in sale_rows],
+        )
+
+
+@router.get("/receipts", dependencies=[Depends(require_roles(["Admin", "Cashier", "Pharmacist"]))])
+def print_receipts(
+    date_from: datetime,
+    date_to: datetime | None = None,
+    file_format: str = Query("html", alias="format", pattern="^(html|text)$"),
+    branch_id: int = Depends(current_branch),
+):
+    date_to = date_to or date_from + timedelta(days=1)
+    if not timedelta(0) < date_to - date_from <= timedelta(days=MAX_RECEIPT_DAYS):
+        raise HTTPException(status_code=400, detail=f"Choose a range of at most {MAX_RECEIPT_DAYS} days")
+
+    def stream():
+        # The request's sessions are closed before the body streams, so the document reads through its own.
+        with SessionLocal(info={"read_only": True, "branch_id": branch_id}) as db:
+            query = _receipt_query(branch_id).where(Sale.sold_at >= date_from, Sale.sold_at < date_to)
+            rows = db.execute(query.execution_options(yield_per=500))
+            title = f"Receipts {date_from:%Y-%m-%d} to {date_to:%Y-%m-%d}"
+            yield from document(_receipts(rows), file_format, settings.receipt_pharmacy_name, title)
+
+    return StreamingResponse(stream(), media_type=RECEIPT_MEDIA_TYPES[file_format])
+
 
 @router.get(
     "",
     response_model=list[SaleRead],
-    dependencies=[Depends(require_roles(["Admin", "Cashier", "Pharmacist"]))],
+    dependencies=[
+        Depends(require_roles(["Admin", "Cashier", "Pharmacist"])),
+        Depends(conditional("sales", "sale_items", "users")),
+    ],
 )
-def list_sales(db: Session = Depends(get_db)):
-    return (
+def list_sales(
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    db: Session = Depends(branch_db(get_read_db)),
+    branch_id: int = Depends(current_branch),
+):
+    date_from, date_to = service.sales_window(date_from, date_to)
+    query = (
         db.query(Sale)
-        .options(joinedload(Sale.seller), joinedload(Sale.items))
-        .order_by(Sale.sold_at.desc())
-        .all()
+        .options(joinedload(Sale.seller), selectinload(Sale.items))
+        .filter(Sale.branch_id == branch_id, Sale.sold_at >= date_from)
     )
+    if date_to:
+        query = query.filter(Sale.sold_at < date_to)
+    return query.order_by(Sale.sold_at.desc()).all()
 
 
 @router.get(
     "/{sale_id}",
     response_model=SaleRead,
-    dependencies=[Depends(require_roles(["Admin", "Cashier", "Pharmacist"]))],
+    dependencies=[
+        Depends(require_roles(["Admin", "Cashier", "Pharmacist"])),
+        Depends(conditional("sales", "sale_items", "users")),
+    ],
 )
-def get_sale(sale_id: int, db: Session = Depends(get_db)):
-    sale = db.query(Sale).options(joinedload(Sale.seller), joinedload(Sale.items)).filter(Sale.id == sale_id).first()
+def get_sale(sale_id: int, db: Session = Depends(branch_db(get_readonly_db)), branch_id: int = Depends(current_branch)):
+    sale = (
+        db.query(Sale)
+        .options(joinedload(Sale.seller), selectinload(Sale.items))
+        .filter(Sale.id == sale_id, Sale.sold_at == service.sale_sold_at(db, sale_id), Sale.branch_id == branch_id)
+        .first()
+    )
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
     return sale
 
 
+@router.get("/{sale_id}/receipt", dependencies=[Depends(require_roles(["Admin", "Cashier", "Pharmacist"]))])
+def print_receipt(
+    sale_id: int,
+    file_format: str = Query("html", alias="format", pattern="^(html|text)$"),
+    db: Session = Depends(branch_db(get_readonly_db)),
+    branch_id: int = Depends(current_branch),
+):
+    sold_at = service.sale_sold_at(db, sale_id)
+    receipts = list(_receipts(db.execute(_receipt_query(branch_id).where(Sale.id == sale_id, Sale.sold_at == sold_at))))
+    if not receipts:
+        raise HTTPException(status_code=404, detail="Sale not found")
+    body = "".join(document(receipts, file_format, settings.receipt_pharmacy_name, f"Receipt {receipts[0].code}"))
+    response_class = HTMLResponse if file_format == "html" else PlainTextResponse
+    return response_class(body)
+
+
 @router.post(
     "",
     response_model=SaleRead,
@@ -48,50 +154,67 @@ def create_sale(
     payload: SaleCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    branch_id: int = Depends(current_branch),
 ):
-    if not payload.items:
-        raise HTTPException(status_code=400, detail="Sale must include at least one item")
-
-    sale = Sale(customer_name=payload.customer_name, user_id=current_user.id)
-    db.add(sale)
-
-    total_amount = 0.0
-    for raw_item in payload.items:
-        med = db.get(Medicine, raw_item.medicine_id)
-        if not med:
-            raise HTTPException(status_code=400, detail=f"Medicine {raw_item.medicine_id} not found")
-        if med.stock_qty < raw_item.quantity:
-            raise HTTPException(status_code=400, detail=f"Insufficient stock for {med.name}")
-
-        med.stock_qty -= raw_item.quantity
-        line_total = med.unit_price * raw_item.quantity
-        total_amount += line_total
-
-        sale.items.append(
-            SaleItem(
-                medicine_id=med.id,
-                quantity=raw_item.quantity,
-                unit_price=med.unit_price,
-                line_total=line_total,
-            )
-        )
-
-    sale.total_amount = round(total_amount, 2)
+    try:
+        sale = service.create_sales(db, branch_id, [payload], current_user.id)[0]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     db.commit()
     db.refresh(sale)
     return sale
 
 
+@router.post(
+    "/batch",
+    response_model=list[SaleRead],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_roles(["Admin", "Cashier", "Pharmacist"]))],
+)
+def create_sales(
+    payload: SaleBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    branch_id: int = Depends(current_branch),
+):
+    try:
+        sales = service.create_sales(db, branch_id, payload.sales, current_user.id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    ids = [sale.id for sale in sales]
+    # The sold_at bounds let Postgres prune the query to the current partition.
+    first, last = min(sale.sold_at for sale in sales), max(sale.sold_at for sale in sales)
+    db.commit()
+    loaded = {
+        sale.id: sale
+        for sale in db.query(Sale)
+        .options(joinedload(Sale.seller), selectinload(Sale.items))
+        .filter(Sale.id.in_(ids), Sale.sold_at.between(first, last))
+    }
+    return [loaded[sale_id] for sale_id in ids]
+
+
 @router.patch(
     "/{sale_id}",
     response_model=SaleRead,
     dependencies=[Depends(require_roles(["Admin", "Cashier", "Pharmacist"]))],
 )
-def update_sale(sale_id: int, payload: SaleUpdate, db: Session = Depends(get_db)):
-    sale = db.query(Sale).options(joinedload(Sale.seller), joinedload(Sale.items)).filter(Sale.id == sale_id).first()
+def update_sale(
+    sale_id: int,
+    payload: SaleUpdate,
+    db: Session = Depends(get_db),
+    branch_id: int = Depends(current_branch),
+):
+    sale = (
+        db.query(Sale)
+        .options(joinedload(Sale.seller), joinedload(Sale.items))
+        .filter(Sale.id == sale_id, Sale.sold_at == service.sale_sold_at(db, sale_id), Sale.branch_id == branch_id)
+        .first()
+    )
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
 
+    record(db, "sale.updated", "sale", sale_id, {"customer_name": [sale.customer_name, payload.customer_name]})
     sale.customer_name = payload.customer_name
     db.commit()
     db.refresh(sale)
@@ -103,17 +226,19 @@ def update_sale(sale_id: int, payload: SaleUpdate, db: Session = Depends(get_db)
     status_code=status.HTTP_204_NO_CONTENT,
     dependencies=[Depends(require_roles(["Admin"]))],
 )
-def delete_sale(sale_id: int, db: Session = Depends(get_db)):
-    sale = db.query(Sale).options(joinedload(Sale.items)).filter(Sale.id == sale_id).first()
+def delete_sale(sale_id: int, db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
+    sale = (
+        db.query(Sale)
+        .options(joinedload(Sale.items))
+        .filter(Sale.id == sale_id, Sale.sold_at == service.sale_sold_at(db, sale_id), Sale.branch_id == branch_id)
+        .first()
+    )
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
 
-    for item in sale.items:
-        medicine = db.get(Medicine, item.medicine_id)
-        if not medicine:
-            raise HTTPException(status_code=400, detail=f"Medicine {item.medicine_id} not found")
-        medicine.stock_qty += item.quantity
-
-    db.delete(sale)
+    try:
+        service.delete_sales(db, branch_id, [sale])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
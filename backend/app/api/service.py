@@ -1,103 +1,322 @@
-﻿from sqlalchemy import func, select
-from sqlalchemy.orm import Session
-
-from app.models import Medicine, Sale, SaleItem, Supplier
-from app.schemas.pharmacy import (
-    DashboardStats,
-    MedicineCreate,
-    MedicineRead,
-    MedicineStockAdjust,
-    SaleCreate,
-    SaleRead,
-    SupplierCreate,
-    SupplierRead,
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import Integer, column, delete, func, insert, select, update, values
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, selectinload
+
+from app.core import prices, supplier_stats
+from app.core.audit import record
+from app.core.cache import cached, invalidate_on_commit
+from app.core.database import row_columns
+from app.core.events import publish, publish_stock, publish_stock_levels
+from app.core.money import from_cents, to_cents
+from app.core.statements import (
+    MEDICINE_ID_BY_BARCODE,
+    MEDICINE_ID_BY_NAME,
+    MEDICINES_BY_IDS,
+    MEDICINES_BY_IDS_FOR_UPDATE,
+    SALE_SOLD_AT,
+    SUPPLIER_ID_BY_NAME,
 )
+from app.models import Medicine, MedicinePrice, Sale, SaleItem, SaleKey, Supplier
+from app.schemas.dashboard import DashboardStats
+from app.schemas.medicine import MedicineCreate, StockCount, StockTakeLine, StockTakeReport
+from app.schemas.sale import SaleCreate
+from app.schemas.supplier import SupplierCreate
+
+
+SALES_LIST_DAYS = 30
+
+
+class MedicineNotFound(ValueError):
+    def __init__(self, medicine_id: int):
+        super().__init__(f"Medicine {medicine_id} not found")
+        self.medicine_id = medicine_id
+
+
+class PriceConflict(ValueError):
+    pass
+
+
+class InsufficientStock(ValueError):
+    def __init__(self, medicine: Medicine):
+        super().__init__(f"Insufficient stock for {medicine.name}")
+        self.medicine = medicine
 
 
-def list_medicines(db: Session) -> list[Medicine]:
-    return list(db.scalars(select(Medicine).order_by(Medicine.name)).all())
+def list_medicines(db: Session, branch_id: int) -> list[Row]:
+    return list(
+        db.execute(select(*row_columns(Medicine)).where(Medicine.branch_id == branch_id).order_by(Medicine.name)).all()
+    )
+
+
+def create_medicine(db: Session, branch_id: int, payload: MedicineCreate) -> Medicine:
+    if db.scalar(MEDICINE_ID_BY_NAME, {"branch_id": branch_id, "name": payload.name}):
+        raise ValueError("Medicine already exists")
+    if payload.barcode and db.scalar(MEDICINE_ID_BY_BARCODE, {"branch_id": branch_id, "barcode": payload.barcode}):
+        raise ValueError("Barcode already in use")
+    medicine = Medicine(**payload.model_dump(), branch_id=branch_id)
+    db.add(medicine)
+    db.flush()
+    db.add(MedicinePrice(medicine_id=medicine.id, unit_price=medicine.unit_price, effective_from=datetime.utcnow()))
+    publish_stock(db, [medicine])
+    record(db, "medicine.created", "medicine", medicine.id, {"name": medicine.name, "stock_qty": medicine.stock_qty})
+    return medicine
+
+
+def price_history(db: Session, medicine_id: int) -> list[Row]:
+    return list(
+        db.execute(
+            select(*row_columns(MedicinePrice))
+            .where(MedicinePrice.medicine_id == medicine_id)
+            .order_by(MedicinePrice.effective_from.desc())
+        ).all()
+    )
 
 
-def create_medicine(db: Session, payload: MedicineCreate) -> Medicine:
-    item = Medicine(**payload.model_dump())
-    db.add(item)
-    db.commit()
-    db.refresh(item)
-    return item
+def set_price(
+    db: Session, medicine: Medicine, unit_price: Decimal | float, effective_from: datetime | None = None
+) -> MedicinePrice:
+    """Record a price for ``medicine`` from ``effective_from`` on, now by default; history is never rewritten."""
+    now = datetime.utcnow()
+    effective_from = effective_from or now
+    if effective_from < now:
+        raise ValueError("Prices cannot be backdated")
+    exists = select(MedicinePrice.id).where(
+        MedicinePrice.medicine_id == medicine.id, MedicinePrice.effective_from == effective_from
+    )
+    if db.scalar(exists):
+        raise PriceConflict("A price already starts at that time")
+    price = MedicinePrice(
+        medicine_id=medicine.id,
+        unit_price=from_cents(to_cents(unit_price)),
+        effective_from=effective_from,
+        created_by=db.info.get("user_id"),
+    )
+    db.add(price)
+    if effective_from == now:
+        medicine.unit_price = price.unit_price
+    db.flush()
+    invalidate_on_commit(db, {"medicine_prices", f"prices:{medicine.id}"})
+    record(
+        db,
+        "medicine.price_set",
+        "medicine",
+        medicine.id,
+        {"unit_price": str(price.unit_price), "effective_from": effective_from.isoformat()},
+    )
+    return price
 
 
-def update_medicine_stock(db: Session, medicine_id: int, payload: MedicineStockAdjust) -> Medicine | None:
-    med = db.get(Medicine, medicine_id)
-    if not med:
-        return None
-    new_stock = med.stock_qty + payload.delta
-    if new_stock < 0:
-        raise ValueError("Stock cannot be negative")
-    med.stock_qty = new_stock
-    db.commit()
-    db.refresh(med)
-    return med
+def get_medicines(db: Session, branch_id: int, ids: Iterable[int], lock: bool = False) -> dict[int, Medicine]:
+    ids = sorted(set(ids))
+    if not ids:
+        return {}
+    query = MEDICINES_BY_IDS_FOR_UPDATE if lock else MEDICINES_BY_IDS
+    medicines = {medicine.id: medicine for medicine in db.scalars(query, {"branch_id": branch_id, "ids": ids})}
+    missing = next((medicine_id for medicine_id in ids if medicine_id not in medicines), None)
+    if missing is not None:
+        raise MedicineNotFound(missing)
+    return medicines
 
 
-def list_suppliers(db: Session) -> list[Supplier]:
-    return list(db.scalars(select(Supplier).order_by(Supplier.name)).all())
+def adjust_stock(db: Session, branch_id: int, adjustments: Iterable[tuple[int, int]]) -> dict[int, Medicine]:
+    deltas = Counter()
+    for medicine_id, delta in adjustments:
+        deltas[medicine_id] += delta
+    medicines = get_medicines(db, branch_id, deltas, lock=True)
+    for medicine_id, delta in deltas.items():
+        medicine = medicines[medicine_id]
+        if medicine.stock_qty + delta < 0:
+            raise InsufficientStock(medicine)
+    for medicine_id, delta in deltas.items():
+        medicines[medicine_id].stock_qty += delta
+    publish_stock(db, medicines.values())
+    return medicines
+
+
+def stock_take(db: Session, branch_id: int, counts: list[StockCount], dry_run: bool = False) -> StockTakeReport:
+    counted = {count.medicine_id: count.counted_qty for count in counts}
+    if len(counted) != len(counts):
+        raise ValueError("Each medicine may be counted only once")
+    ids = sorted(counted)
+    query = (
+        select(Medicine.id, Medicine.name, Medicine.stock_qty, Medicine.unit_price)
+        .where(Medicine.branch_id == branch_id, Medicine.id.in_(ids))
+        .order_by(Medicine.id)
+    )
+    rows = db.execute(query if dry_run else query.with_for_update()).all()
+    if len(rows) != len(ids):
+        found = {row.id for row in rows}
+        raise MedicineNotFound(next(medicine_id for medicine_id in ids if medicine_id not in found))
+
+    lines = [
+        StockTakeLine(
+            medicine_id=row.id,
+            name=row.name,
+            expected_qty=row.stock_qty,
+            counted_qty=counted[row.id],
+            variance=counted[row.id] - row.stock_qty,
+            variance_value=float(from_cents(to_cents(row.unit_price) * (counted[row.id] - row.stock_qty))),
+        )
+        for row in rows
+        if counted[row.id] != row.stock_qty
+    ]
+    report = StockTakeReport(
+        dry_run=dry_run,
+        counted=len(rows),
+        changed=len(lines),
+        total_variance=sum(line.variance for line in lines),
+        total_variance_value=float(
+            from_cents(sum(to_cents(row.unit_price) * (counted[row.id] - row.stock_qty) for row in rows))
+        ),
+        lines=lines,
+    )
+    if dry_run or not lines:
+        return report
+
+    levels = values(column("id", Integer), column("qty", Integer), name="counts").data(
+        [(line.medicine_id, line.counted_qty) for line in lines]
+    )
+    db.execute(
+        update(Medicine)
+        .where(Medicine.id == levels.c.id, Medicine.branch_id == branch_id)
+        .values(stock_qty=levels.c.qty)
+        .execution_options(synchronize_session=False)
+    )
+    # The UPDATE bypasses the unit of work, so cache tags and events are raised here instead of by flush hooks.
+    invalidate_on_commit(db, {"medicines", *(f"medicines:{line.medicine_id}" for line in lines)})
+    publish_stock_levels(db, branch_id, {line.medicine_id: line.counted_qty for line in lines})
+    record(
+        db,
+        "medicine.stock_take",
+        "medicine",
+        details={
+            "changed": report.changed,
+            "total_variance": report.total_variance,
+            "lines": [[line.medicine_id, line.expected_qty, line.counted_qty] for line in lines],
+        },
+    )
+    return report
+
+
+def list_suppliers(db: Session) -> list[Row]:
+    return list(db.execute(select(*row_columns(Supplier)).order_by(Supplier.name)).all())
 
 
 def create_supplier(db: Session, payload: SupplierCreate) -> Supplier:
+    if db.scalar(SUPPLIER_ID_BY_NAME, {"name": payload.name}):
+        raise ValueError("Supplier already exists")
     supplier = Supplier(**payload.model_dump())
     db.add(supplier)
-    db.commit()
-    db.refresh(supplier)
+    db.flush()
+    record(db, "supplier.created", "supplier", supplier.id, {"name": supplier.name})
     return supplier
 
 
-def list_sales(db: Session) -> list[Sale]:
-    return list(db.scalars(select(Sale).order_by(Sale.sold_at.desc())).all())
+def sale_sold_at(db: Session, sale_id: int) -> datetime | None:
+    """The partition key of ``sale_id``, so by-id queries on sales can be pruned to one partition."""
+    return db.scalar(SALE_SOLD_AT, {"sale_id": sale_id})
+
 
+def sales_window(date_from: datetime | None, date_to: datetime | None) -> tuple[datetime, datetime | None]:
+    """Bound sales listings to ``SALES_LIST_DAYS`` before ``date_to`` (or now) unless a start is given."""
+    return date_from or (date_to or datetime.utcnow()) - timedelta(days=SALES_LIST_DAYS), date_to
 
-def create_sale(db: Session, payload: SaleCreate) -> Sale:
-    if not payload.items:
-        raise ValueError("Sale must include at least one item")
 
-    sale = Sale(customer_name=payload.customer_name)
-    db.add(sale)
+def list_sales(
+    db: Session, branch_id: int, date_from: datetime | None = None, date_to: datetime | None = None
+) -> list[Sale]:
+    date_from, date_to = sales_window(date_from, date_to)
+    query = select(Sale).options(selectinload(Sale.items)).where(Sale.branch_id == branch_id, Sale.sold_at >= date_from)
+    if date_to:
+        query = query.where(Sale.sold_at < date_to)
+    return list(db.scalars(query.order_by(Sale.sold_at.desc())).all())
 
-    total_amount = 0.0
-    for raw_item in payload.items:
-        med = db.get(Medicine, raw_item.medicine_id)
-        if not med:
-            raise ValueError(f"Medicine {raw_item.medicine_id} not found")
-        if med.stock_qty < raw_item.quantity:
-            raise ValueError(f"Insufficient stock for {med.name}")
 
-        med.stock_qty -= raw_item.quantity
-        line_total = med.unit_price * raw_item.quantity
-        total_amount += line_total
+def create_sales(db: Session, branch_id: int, payloads: list[SaleCreate], user_id: int | None = None) -> list[Sale]:
+    for payload in payloads:
+        if not payload.items:
+            raise ValueError("Sale must include at least one item")
 
-        sale.items.append(
-            SaleItem(
-                medicine_id=med.id,
-                quantity=raw_item.quantity,
-                unit_price=med.unit_price,
-                line_total=line_total,
+    medicines = adjust_stock(
+        db, branch_id, ((item.medicine_id, -item.quantity) for payload in payloads for item in payload.items)
+    )
+
+    unit_prices = prices.cache.resolve(db, branch_id, medicines, datetime.utcnow())
+    sales = []
+    for payload in payloads:
+        sale = Sale(customer_name=payload.customer_name, user_id=user_id, branch_id=branch_id)
+        total_cents = 0
+        for raw_item in payload.items:
+            med = medicines[raw_item.medicine_id]
+            unit_price = unit_prices[med.id]
+            line_cents = to_cents(unit_price) * raw_item.quantity
+            total_cents += line_cents
+            sale.items.append(
+                SaleItem(
+                    medicine_id=med.id,
+                    quantity=raw_item.quantity,
+                    unit_price=unit_price,
+                    line_total=from_cents(line_cents),
+                )
             )
+        sale.total_amount = from_cents(total_cents)
+        sales.append(sale)
+
+    db.add_all(sales)
+    db.flush()
+    db.execute(insert(SaleKey), [{"sale_id": sale.id, "sold_at": sale.sold_at} for sale in sales])
+    supplier_stats.add_sales(db, sales)
+    for sale in sales:
+        publish(
+            db,
+            "sale.created",
+            {"id": sale.id, "branch_id": branch_id, "total_amount": sale.total_amount, "items": len(sale.items)},
         )
+        record(db, "sale.created", "sale", sale.id, {"total_amount": str(sale.total_amount), "items": len(sale.items)})
+    return sales
 
-    sale.total_amount = round(total_amount, 2)
-    db.commit()
-    db.refresh(sale)
-    return sale
+
+def delete_sales(db: Session, branch_id: int, sales: list[Sale]) -> None:
+    adjust_stock(db, branch_id, ((item.medicine_id, item.quantity) for sale in sales for item in sale.items))
+    supplier_stats.add_sales(db, sales, sign=-1)
+    db.execute(delete(SaleKey).where(SaleKey.sale_id.in_([sale.id for sale in sales])))
+    for sale in sales:
+        db.delete(sale)
+        publish(db, "sale.deleted", {"id": sale.id, "branch_id": branch_id})
+        record(
+            db,
+            "sale.deleted",
+            "sale",
+            sale.id,
+            {
+                "total_amount": str(sale.total_amount),
+                "items": [[item.medicine_id, item.quantity] for item in sale.items],
+            },
+        )
 
 
-def get_dashboard_stats(db: Session) -> DashboardStats:
-    total_medicines = db.scalar(select(func.count(Medicine.id))) or 0
-    low_stock_count = db.scalar(select(func.count(Medicine.id)).where(Medicine.stock_qty <= 10)) or 0
-    total_suppliers = db.scalar(select(func.count(Supplier.id))) or 0
-    total_sales_amount = db.scalar(select(func.coalesce(func.sum(Sale.total_amount), 0.0))) or 0.0
+@cached(
+    "dashboard",
+    key=lambda db, branch_id: branch_id,
+    tags=lambda db, branch_id: ["medicines", "suppliers", "sales"],
+)
+def dashboard_stats(db: Session, branch_id: int) -> DashboardStats:
+    medicine_count, low_stock_count = db.execute(
+        select(func.count(Medicine.id), func.count(Medicine.id).filter(Medicine.stock_qty <= 10)).where(
+            Medicine.branch_id == branch_id
+        )
+    ).one()
+    supplier_count = db.scalar(select(func.count(Supplier.id)))
+    total_sales = db.scalar(select(func.coalesce(func.sum(Sale.total_amount), 0)).where(Sale.branch_id == branch_id))
 
     return DashboardStats(
-        total_medicines=total_medicines,
+        medicine_count=medicine_count,
+        supplier_count=supplier_count,
         low_stock_count=low_stock_count,
-        total_suppliers=total_suppliers,
-        total_sales_amount=round(float(total_sales_amount), 2),
+        total_sales=total_sales,
     )
@@ -1,37 +1,276 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import Numeric, cast, func, select
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.rbac import require_roles
+from app.api import service
+from app.core.audit import record
+from app.core.cache import cached
+from app.core.database import get_db, get_read_db, get_readonly_db, shard_engine, shard_engines
+from app.core.http_cache import conditional
+from app.core.partitions import add_months, month_start
+from app.core.rbac import branch_db, current_branch, require_roles
+from app.core.statements import SUPPLIER_CONFLICT
 from app.models.medicine import Medicine
+from app.models.medicine_sales_month import MedicineSalesMonth
 from app.models.purchase import Purchase
 from app.models.supplier import Supplier
-from app.schemas.supplier import SupplierCreate, SupplierRead, SupplierUpdate
+from app.models.supplier_purchase_month import SupplierPurchaseMonth
+from app.schemas.supplier import (
+    MonthlyCost,
+    SupplierAnalytics,
+    SupplierCreate,
+    SupplierMedicine,
+    SupplierMonth,
+    SupplierRank,
+    SupplierRanking,
+    SupplierRead,
+    SupplierTotals,
+    SupplierUpdate,
+)
 
 router = APIRouter(prefix="/suppliers", tags=["suppliers"])
 
+analytics_roles = require_roles(["Admin", "Pharmacist", "Inventory"])
+analytics_cache = conditional("suppliers", "purchases", "purchase_items", "sale_items", daily=True)
+RANKING_ORDER = ("spend", "quantity", "sell_through")
+
 
 @router.get(
     "",
     response_model=list[SupplierRead],
-    dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"]))],
+    dependencies=[
+        Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"])),
+        Depends(conditional("suppliers")),
+    ],
+)
+def list_suppliers(db: Session = Depends(get_readonly_db)):
+    return service.list_suppliers(db)
+
+
+def _window(months: int) -> tuple[date, int]:
+    today = date.today()
+    start = add_months(month_start(today), 1 - months)
+    return start, (today - start).days + 1
+
+
+def _supplier_medicines(branch_id: int, start: date):
+    purchased = (
+        select(
+            SupplierPurchaseMonth.supplier_id,
+            SupplierPurchaseMonth.medicine_id,
+            func.sum(SupplierPurchaseMonth.lines).label("lines"),
+            func.sum(SupplierPurchaseMonth.quantity).label("quantity"),
+            func.sum(SupplierPurchaseMonth.spend).label("spend"),
+        )
+        .where(SupplierPurchaseMonth.branch_id == branch_id, SupplierPurchaseMonth.month >= start)
+        .group_by(SupplierPurchaseMonth.supplier_id, SupplierPurchaseMonth.medicine_id)
+        .having(func.sum(SupplierPurchaseMonth.quantity) > 0)
+        .cte("purchased")
+    )
+    sold = (
+        select(MedicineSalesMonth.medicine_id, func.sum(MedicineSalesMonth.quantity).label("quantity"))
+        .where(MedicineSalesMonth.month >= start, MedicineSalesMonth.medicine_id.in_(select(purchased.c.medicine_id)))
+        .group_by(MedicineSalesMonth.medicine_id)
+        .subquery("sold")
+    )
+    # Sales are not traced back to a delivery, so a medicine's sales are shared out by purchased quantity.
+    medicine_quantity = func.sum(purchased.c.quantity).over(partition_by=purchased.c.medicine_id)
+    sold_estimate = cast(func.coalesce(sold.c.quantity, 0), Numeric) * purchased.c.quantity / medicine_quantity
+    return (
+        select(purchased, sold_estimate.label("sold_estimate"))
+        .outerjoin(sold, sold.c.medicine_id == purchased.c.medicine_id)
+        .subquery("supplier_medicines")
+    )
+
+
+def _totals(rows, days: int) -> list:
+    quantity = func.sum(rows.c.quantity)
+    sold = func.sum(rows.c.sold_estimate)
+    return [
+        func.sum(rows.c.lines).label("lines"),
+        quantity.label("quantity"),
+        func.sum(rows.c.spend).label("spend"),
+        (func.sum(rows.c.spend) / quantity).label("average_cost"),
+        sold.label("sold_estimate"),
+        (func.sum(func.least(rows.c.sold_estimate, rows.c.quantity)) / quantity).label("sell_through"),
+        (days * quantity / func.nullif(sold, 0)).label("days_to_sell"),
+    ]
+
+
+def _summary_bind(db: Session, branch_id: int) -> dict:
+    # The summaries live on the branch's shard, but these statements lead with a shared table or bare columns,
+    # which the session would send to its own bind.
+    return {"bind": shard_engine(branch_id) or db.get_bind()}
+
+
+def _totals_fields(row) -> dict:
+    return {
+        "lines": row.lines or 0,
+        "quantity": row.quantity or 0,
+        "spend": round(float(row.spend or 0), 2),
+        "average_cost": round(float(row.average_cost), 4) if row.average_cost is not None else None,
+        "sold_estimate": round(float(row.sold_estimate or 0), 2),
+        "sell_through": round(float(row.sell_through), 4) if row.sell_through is not None else None,
+        "days_to_sell": round(float(row.days_to_sell), 1) if row.days_to_sell is not None else None,
+    }
+
+
+@router.get(
+    "/analytics",
+    response_model=SupplierRanking,
+    dependencies=[Depends(analytics_roles), Depends(analytics_cache)],
 )
-def list_suppliers(db: Session = Depends(get_db)):
-    return db.query(Supplier).order_by(Supplier.name.asc()).all()
+def rank_suppliers(
+    months: int = Query(12, ge=1, le=60),
+    sort: str = Query("spend", pattern=f"^({'|'.join(RANKING_ORDER)})$"),
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(branch_db(get_read_db)),
+    branch_id: int = Depends(current_branch),
+):
+    start, days = _window(months)
+    rows = _supplier_medicines(branch_id, start)
+    totals = _totals(rows, days)
+    order = {column.name: column.element for column in totals}[sort].desc().nulls_last()
+    query = (
+        select(
+            func.rank().over(order_by=order).label("rank"),
+            rows.c.supplier_id,
+            Supplier.name,
+            func.count().label("medicines"),
+            *totals,
+        )
+        .join(Supplier, Supplier.id == rows.c.supplier_id)
+        .group_by(rows.c.supplier_id, Supplier.name)
+        .order_by(order, rows.c.supplier_id)
+        .limit(limit)
+    )
+    return SupplierRanking(
+        date_from=start,
+        sort=sort,
+        rows=[
+            SupplierRank(
+                rank=row.rank,
+                supplier_id=row.supplier_id,
+                name=row.name,
+                medicines=row.medicines,
+                **_totals_fields(row),
+            )
+            for row in db.execute(query, bind_arguments=_summary_bind(db, branch_id)).all()
+        ],
+    )
+
+
+@router.get(
+    "/{supplier_id}/analytics",
+    response_model=SupplierAnalytics,
+    dependencies=[Depends(analytics_roles), Depends(analytics_cache)],
+)
+def supplier_analytics(
+    supplier_id: int,
+    months: int = Query(12, ge=1, le=60),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(branch_db(get_read_db)),
+    branch_id: int = Depends(current_branch),
+):
+    supplier = db.get(Supplier, supplier_id)
+    if not supplier:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+
+    start, days = _window(months)
+    rows = _supplier_medicines(branch_id, start)
+    totals = _totals(rows, days)
+    bind = _summary_bind(db, branch_id)
+    summary = db.execute(select(*totals).where(rows.c.supplier_id == supplier_id), bind_arguments=bind).one()
+    medicine_rows = db.execute(
+        select(rows.c.medicine_id, Medicine.name, *totals)
+        .join(Medicine, Medicine.id == rows.c.medicine_id)
+        .where(rows.c.supplier_id == supplier_id)
+        .group_by(rows.c.medicine_id, Medicine.name)
+        .order_by(func.sum(rows.c.spend).desc(), rows.c.medicine_id)
+        .limit(limit),
+        bind_arguments=bind,
+    ).all()
+    month_rows = db.execute(
+        select(
+            SupplierPurchaseMonth.month,
+            SupplierPurchaseMonth.medicine_id,
+            SupplierPurchaseMonth.lines,
+            SupplierPurchaseMonth.quantity,
+            SupplierPurchaseMonth.spend,
+        )
+        .where(
+            SupplierPurchaseMonth.branch_id == branch_id,
+            SupplierPurchaseMonth.supplier_id == supplier_id,
+            SupplierPurchaseMonth.month >= start,
+            SupplierPurchaseMonth.quantity > 0,
+        )
+        .order_by(SupplierPurchaseMonth.month)
+    ).all()
+
+    spend_by_month: dict[date, SupplierMonth] = {}
+    costs: dict[int, list[MonthlyCost]] = {}
+    for row in month_rows:
+        month = spend_by_month.setdefault(row.month, SupplierMonth(month=row.month, lines=0, quantity=0, spend=0))
+        month.lines += row.lines
+        month.quantity += row.quantity
+        month.spend = round(month.spend + float(row.spend), 2)
+        costs.setdefault(row.medicine_id, []).append(
+            MonthlyCost(month=row.month, quantity=row.quantity, average_cost=round(float(row.spend / row.quantity), 4))
+        )
+
+    medicines = []
+    for row in medicine_rows:
+        series = costs.get(row.medicine_id, [])
+        first_cost = series[0].average_cost if series else None
+        last_cost = series[-1].average_cost if series else None
+        medicines.append(
+            SupplierMedicine(
+                medicine_id=row.medicine_id,
+                name=row.name,
+                first_cost=first_cost,
+                last_cost=last_cost,
+                cost_change_pct=round((last_cost - first_cost) / first_cost * 100, 2) if first_cost else None,
+                costs=series,
+                **_totals_fields(row),
+            )
+        )
+    return SupplierAnalytics(
+        supplier_id=supplier.id,
+        name=supplier.name,
+        date_from=start,
+        totals=SupplierTotals(**_totals_fields(summary)),
+        spend_by_month=list(spend_by_month.values()),
+        medicines=medicines,
+    )
 
 
 @router.get(
     "/{supplier_id}",
     response_model=SupplierRead,
-    dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"]))],
+    dependencies=[
+        Depends(require_roles(["Admin", "Pharmacist", "Inventory", "Cashier"])),
+        Depends(conditional("suppliers")),
+    ],
 )
-def get_supplier(supplier_id: int, db: Session = Depends(get_db)):
-    supplier = db.get(Supplier, supplier_id)
+def get_supplier(supplier_id: int, db: Session = Depends(get_readonly_db)):
+    supplier = _supplier(supplier_id, db)
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
     return supplier
 
 
+@cached(
+    "supplier",
+    key=lambda supplier_id, db: supplier_id,
+    tags=lambda supplier_id, db: ["suppliers", f"suppliers:{supplier_id}"],
+)
+def _supplier(supplier_id: int, db: Session) -> SupplierRead | None:
+    supplier = db.get(Supplier, supplier_id)
+    return SupplierRead.model_validate(supplier) if supplier else None
+
+
 @router.post(
     "",
     response_model=SupplierRead,
@@ -39,12 +278,10 @@ def get_supplier(supplier_id: int, db: Session = Depends(get_db)):
     dependencies=[Depends(require_roles(["Admin", "Pharmacist", "Inventory"]))],
 )
 def create_supplier(payload: SupplierCreate, db: Session = Depends(get_db)):
-    exists = db.query(Supplier).filter(Supplier.name == payload.name).first()
-    if exists:
-        raise HTTPException(status_code=400, detail="Supplier already exists")
-
-    supplier = Supplier(**payload.model_dump())
-    db.add(supplier)
+    try:
+        supplier = service.create_supplier(db, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     db.commit()
     db.refresh(supplier)
     return supplier
@@ -60,13 +297,13 @@ def update_supplier(supplier_id: int, payload: SupplierUpdate, db: Session = Dep
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
 
-    exists = db.query(Supplier).filter(Supplier.name == payload.name, Supplier.id != supplier_id).first()
-    if exists:
+    if db.scalar(SUPPLIER_CONFLICT, {"name": payload.name, "supplier_id": supplier_id}):
         raise HTTPException(status_code=400, detail="Supplier already exists")
 
     supplier.name = payload.name
     supplier.phone = payload.phone
     supplier.address = payload.address
+    record(db, "supplier.updated", "supplier", supplier_id, payload.model_dump())
     db.commit()
     db.refresh(supplier)
     return supplier
@@ -84,9 +321,19 @@ def delete_supplier(supplier_id: int, db: Session = Depends(get_db)):
 
     linked_medicines = db.query(Medicine.id).filter(Medicine.supplier_id == supplier_id).first()
     linked_purchases = db.query(Purchase.id).filter(Purchase.supplier_id == supplier_id).first()
+    for shard in shard_engines:
+        # Sharded branches reference the shard's copy of the supplier, which the delete below also removes.
+        with shard.connect() as connection:
+            linked_medicines = linked_medicines or connection.scalar(
+                select(Medicine.id).where(Medicine.supplier_id == supplier_id).limit(1)
+            )
+            linked_purchases = linked_purchases or connection.scalar(
+                select(Purchase.id).where(Purchase.supplier_id == supplier_id).limit(1)
+            )
     if linked_medicines or linked_purchases:
         raise HTTPException(status_code=400, detail="Cannot delete supplier linked to medicines or purchases")
 
     db.delete(supplier)
+    record(db, "supplier.deleted", "supplier", supplier_id, {"name": supplier.name})
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Response, status
+
+from app.core import audit
+from app.core import prices, statements
+from app.core.cache import cache
+from app.core.ratelimit import limiter
+from app.core.rbac import require_roles
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/cache", dependencies=[Depends(require_roles(["Admin"]))])
+def cache_metrics():
+    return cache.metrics()
+
+
+@router.get("/audit", dependencies=[Depends(require_roles(["Admin"]))])
+def audit_metrics():
+    return audit.writer.metrics()
+
+
+@router.get("/statements", dependencies=[Depends(require_roles(["Admin"]))])
+def statement_metrics():
+    return statements.stats.metrics()
+
+
+@router.get("/prices", dependencies=[Depends(require_roles(["Admin"]))])
+def price_metrics():
+    return prices.cache.metrics()
+
+
+@router.get("/ratelimit", dependencies=[Depends(require_roles(["Admin"]))])
+def ratelimit_metrics():
+    return limiter.metrics()
+
+
+@router.delete("/cache", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_roles(["Super Admin"]))])
+def clear_cache():
+    cache.clear()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
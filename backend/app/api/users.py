@@ -1,20 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
+from app.core.audit import record
 from app.core.config import settings
-from app.core.database import get_db
-from app.core.rbac import require_roles
+from app.core.database import get_db, get_readonly_db, row_columns
+from app.core.http_cache import conditional
+from app.core.rbac import current_branch, require_roles
 from app.core.security import hash_password
+from app.models.branch import Branch
 from app.models.user import User
 from app.schemas.user import UserCreate, UserPasswordReset, UserRead, UserStatusUpdate, UserUpdate
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
-@router.get("", response_model=list[UserRead], dependencies=[Depends(require_roles(["Super Admin"]))])
-def list_users(db: Session = Depends(get_db)):
-    return list(db.scalars(select(User).order_by(User.name.asc())).all())
+@router.get(
+    "",
+    response_model=list[UserRead],
+    dependencies=[Depends(require_roles(["Super Admin"])), Depends(conditional("users"))],
+)
+def list_users(db: Session = Depends(get_readonly_db), branch_id: int | None = Query(None)):
+    query = select(*row_columns(User)).order_by(User.name.asc())
+    if branch_id is not None:
+        query = query.where(User.branch_id == branch_id)
+    return list(db.execute(query).all())
+
+
+def _check_branch(db: Session, branch_id: int) -> int:
+    if not db.get(Branch, branch_id):
+        raise HTTPException(status_code=400, detail="Branch not found")
+    return branch_id
 
 
 @router.post(
@@ -23,7 +39,7 @@ def list_users(db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(require_roles(["Super Admin"]))],
 )
-def create_user(payload: UserCreate, db: Session = Depends(get_db)):
+def create_user(payload: UserCreate, db: Session = Depends(get_db), branch_id: int = Depends(current_branch)):
     username = (payload.username or payload.email or "").strip()
     if not username:
         raise HTTPException(status_code=400, detail="Username or email is required")
@@ -46,10 +62,15 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db)):
         name=payload.name.strip(),
         email=email,
         role=payload.role.strip(),
+        branch_id=_check_branch(db, payload.branch_id) if payload.branch_id is not None else branch_id,
         password_hash=hash_password(password),
         active=payload.active if payload.active is not None else True,
     )
     db.add(user)
+    db.flush()
+    record(
+        db, "user.created", "user", user.id, {"username": user.username, "role": user.role, "branch_id": user.branch_id}
+    )
     db.commit()
     db.refresh(user)
     return user
@@ -71,9 +92,18 @@ def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db)
         if existing:
             raise HTTPException(status_code=400, detail="Email already in use")
 
+    record(
+        db,
+        "user.updated",
+        "user",
+        user_id,
+        {"email": [user.email, email], "role": [user.role, payload.role.strip()], "branch_id": payload.branch_id},
+    )
     user.name = payload.name.strip()
     user.email = email
     user.role = payload.role.strip()
+    if payload.branch_id is not None:
+        user.branch_id = _check_branch(db, payload.branch_id)
     db.commit()
     db.refresh(user)
     return user
@@ -90,6 +120,7 @@ def update_status(user_id: int, payload: UserStatusUpdate, db: Session = Depends
         raise HTTPException(status_code=404, detail="User not found")
 
     user.active = payload.active
+    record(db, "user.status_changed", "user", user_id, {"active": payload.active})
     db.commit()
     db.refresh(user)
     return user
@@ -106,6 +137,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
 
     db.delete(user)
+    record(db, "user.deleted", "user", user_id, {"username": user.username})
     db.commit()
     return None
 
@@ -124,5 +156,6 @@ def reset_password(user_id: int, payload: UserPasswordReset, db: Session = Depen
         raise HTTPException(status_code=400, detail="Password is required")
 
     user.password_hash = hash_password(new_password)
+    record(db, "user.password_reset", "user", user_id)
     db.commit()
     return {"message": "Password reset"}
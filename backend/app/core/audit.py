@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """Buffers audit entries in memory and writes them in batches from a background thread."""
+
+    def __init__(self, queue_size: int, batch_size: int, flush_seconds: float, spill_path: Path):
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.spill_path = spill_path
+        # Guards the thread handle, the counters and the spill file; requests write inline when the queue is full.
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._spill_pending = spill_path.exists()
+        self.written = 0
+        self.overflowed = 0
+        self.spilled = 0
+        self.dropped = 0
+
+    def enqueue(self, entries: list[dict]) -> None:
+        if self._stop.is_set():
+            self._write(entries)
+            return
+        self._start()
+        for index, entry in enumerate(entries):
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                # Back-pressure instead of loss: a writer that cannot keep up slows requests down.
+                with self._lock:
+                    self.overflowed += len(entries) - index
+                self._write(entries[index:])
+                return
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        # Whatever the thread did not get to is written here, so a clean shutdown loses nothing.
+        self._drain()
+        self._replay()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "overflowed": self.overflowed,
+                "spilled": self.spilled,
+                "dropped": self.dropped,
+            }
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=self.flush_seconds)]
+            except queue.Empty:
+                self._replay()
+                continue
+            # Wait up to one flush interval for a batch to fill, then write whatever arrived.
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if self._write(batch):
+                self._replay()
+
+    def _drain(self) -> None:
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: list[dict]) -> bool:
+        for attempt in range(settings.audit_write_attempts):
+            if attempt:
+                time.sleep(settings.audit_retry_seconds * 2 ** (attempt - 1))
+            try:
+                # executemany on an INSERT is sent as multi-row VALUES statements by SQLAlchemy.
+                with engine.begin() as connection:
+                    connection.execute(insert(AuditLog), batch)
+            except Exception:
+                logger.exception("Writing %s audit entries failed (attempt %s)", len(batch), attempt + 1)
+                continue
+            with self._lock:
+                self.written += len(batch)
+            return True
+        self._spill(batch)
+        return False
+
+    def _spill(self, batch: list[dict]) -> None:
+        # Kept on local disk until the database is back; the flusher replays the file after its next good write.
+        lines = "".join(json.dumps(entry, default=str) + "\n" for entry in batch)
+        with self._lock:
+            try:
+                with self.spill_path.open("a", encoding="utf-8") as spill:
+                    spill.write(lines)
+            except OSError:
+                logger.exception("Spilling %s audit entries to %s failed; they are lost", len(batch), self.spill_path)
+                self.dropped += len(batch)
+                return
+            self.spilled += len(batch)
+            self._spill_pending = True
+
+    def _replay(self) -> None:
+        with self._lock:
+            if not self._spill_pending:
+                return
+            self._spill_pending = False
+            # Workers may share the file; the rename hands its contents to exactly one of them.
+            claimed = self.spill_path.with_name(f"{self.spill_path.name}.{os.getpid()}")
+            try:
+                os.replace(self.spill_path, claimed)
+            except FileNotFoundError:
+                return
+        entries = [json.loads(line) for line in claimed.read_text(encoding="utf-8").splitlines() if line]
+        claimed.unlink()
+        for entry in entries:
+            entry["at"] = datetime.fromisoformat(entry["at"])
+        for start in range(0, len(entries), self.batch_size):
+            self._write(entries[start : start + self.batch_size])
+        logger.info("Replayed %s spilled audit entries", len(entries))
+
+
+def record(
+    db: Session,
+    action: str,
+    entity: str,
+    entity_id: int | None = None,
+    details: dict | None = None,
+    user_id: int | None = None,
+) -> None:
+    """Queue an audit entry that is written only if ``db`` commits."""
+    db.info.setdefault("audit", []).append(
+        {
+            "at": datetime.utcnow(),
+            "user_id": user_id if user_id is not None else db.info.get("user_id"),
+            "branch_id": db.info.get("branch_id"),
+            "action": action,
+            "entity": entity,
+            "entity_id": entity_id,
+            "details": details,
+        }
+    )
+
+
+def _enqueue_committed(session: Session) -> None:
+    entries = session.info.pop("audit", None)
+    if entries:
+        writer.enqueue(entries)
+
+
+def _discard_entries(session: Session, previous_transaction) -> None:
+    session.info.pop("audit", None)
+
+
+def install_session_hooks(session_factory) -> None:
+    event.listen(session_factory, "after_commit", _enqueue_committed)
+    event.listen(session_factory, "after_soft_rollback", _discard_entries)
+
+
+writer = AuditWriter(
+    settings.audit_queue_size, settings.audit_batch_size, settings.audit_flush_seconds, Path(settings.audit_spill_path)
+)
+install_session_hooks(SessionLocal)
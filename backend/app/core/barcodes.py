@@ -0,0 +1,114 @@
+import logging
+import threading
+from collections.abc import Iterable
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal, shard_engine
+from app.models.medicine import Medicine
+from app.schemas.medicine import MedicineRead
+
+logger = logging.getLogger(__name__)
+
+
+class BarcodeIndex:
+    """Per-worker map of ``(branch_id, barcode)`` to medicines.
+
+    A branch is loaded whole on its first scan, so unknown codes are answered without a query too. Other
+    workers' writes arrive as cache invalidations, after which only the touched rows are re-read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes: dict[tuple[int, str], MedicineRead] = {}
+        self._by_id: dict[tuple[int, int], str] = {}
+        self._loaded: set[int] = set()
+
+    def resolve(self, branch_id: int, codes: Iterable[str]) -> dict[str, MedicineRead]:
+        with self._lock:
+            loaded = branch_id in self._loaded
+        if not loaded:
+            self._load(branch_id)
+        found = {}
+        with self._lock:
+            for code in codes:
+                medicine = self._codes.get((branch_id, code))
+                if medicine is not None:
+                    found[code] = medicine
+        return found
+
+    def get(self, branch_id: int, code: str) -> MedicineRead | None:
+        return self.resolve(branch_id, (code,)).get(code)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._codes.clear()
+            self._by_id.clear()
+            self._loaded.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"branches": len(self._loaded), "codes": len(self._codes)}
+
+    def _load(self, branch_id: int) -> None:
+        with SessionLocal(info={"branch_id": branch_id}) as db:
+            rows = db.scalars(select(Medicine).where(Medicine.branch_id == branch_id, Medicine.barcode.is_not(None)))
+            medicines = [MedicineRead.model_validate(row) for row in rows]
+        with self._lock:
+            for medicine in medicines:
+                self._put(branch_id, medicine)
+            self._loaded.add(branch_id)
+
+    def refresh(self, medicine_ids: set[int]) -> None:
+        with self._lock:
+            loaded = set(self._loaded)
+        if not loaded:
+            return
+        # Branches on the same database share one query.
+        groups: dict[object, list[int]] = {}
+        for branch_id in loaded:
+            groups.setdefault(shard_engine(branch_id), []).append(branch_id)
+        for branches in groups.values():
+            with SessionLocal(info={"branch_id": branches[0]}) as db:
+                rows = db.scalars(select(Medicine).where(Medicine.branch_id.in_(branches), Medicine.id.in_(medicine_ids)))
+                current = {(row.branch_id, row.id): MedicineRead.model_validate(row) for row in rows}
+            with self._lock:
+                for branch_id in branches:
+                    for medicine_id in medicine_ids:
+                        self._drop(branch_id, medicine_id)
+                for (branch_id, _), medicine in current.items():
+                    if branch_id in self._loaded and medicine.barcode:
+                        self._put(branch_id, medicine)
+
+    def _put(self, branch_id: int, medicine: MedicineRead) -> None:
+        self._codes[(branch_id, medicine.barcode)] = medicine
+        self._by_id[(branch_id, medicine.id)] = medicine.barcode
+
+    def _drop(self, branch_id: int, medicine_id: int) -> None:
+        code = self._by_id.pop((branch_id, medicine_id), None)
+        if code is not None:
+            self._codes.pop((branch_id, code), None)
+
+
+def _on_event(event: dict) -> None:
+    if event["type"].endswith("cache.invalidate"):
+        tags = event["data"]["tags"]
+        if "medicines" not in tags:
+            return
+        ids = {int(tag.partition(":")[2]) for tag in tags if tag.startswith("medicines:")}
+        if ids:
+            index.refresh(ids)
+        else:
+            # Large writes only send table tags; reload branches on their next scan.
+            index.clear()
+    elif event["type"] == "resync":
+        index.clear()
+
+
+def start_listener() -> None:
+    from app.core.events import broker
+
+    broker.add_listener(_on_event)
+
+
+index = BarcodeIndex()
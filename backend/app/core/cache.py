@@ -0,0 +1,376 @@
+import functools
+import logging
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SHARDED_TABLES, SessionLocal, shard_engine
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+MAX_TRACKED_INVALIDATIONS = 100_000
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[str, int] = {}
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+
+class LocalTier:
+    def __init__(self, max_entries: int, ttl: float, stats: CacheStats):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, object, frozenset[str]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires, value, _ = entry
+            if expires < time.monotonic():
+                self._drop(key)
+                self.stats.incr("local_expired")
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, tags: frozenset[str], ttl: float | None = None) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.stats.incr("local_evicted")
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, set()):
+                    if key in self._entries:
+                        self._drop(key)
+                        removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: str) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class CacheBackend(ABC):
+    """Shared tier used by every worker; values are pickled bytes."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl: float) -> None: ...
+
+    @abstractmethod
+    def invalidate(self, tags: Iterable[str]) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+class InProcessBackend(CacheBackend):
+    """Stand-in for a shared cache server when running a single process or tests."""
+
+    def __init__(self):
+        self._tier = LocalTier(max_entries=1_000_000, ttl=settings.cache_shared_ttl_seconds, stats=CacheStats())
+
+    def get(self, key: str) -> bytes | None:
+        value = self._tier.get(key)
+        return None if value is MISSING else value
+
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl: float) -> None:
+        self._tier.set(key, value, frozenset(tags), ttl)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        self._tier.invalidate(tags)
+
+    def clear(self) -> None:
+        self._tier.clear()
+
+
+class RedisBackend(CacheBackend):
+    def __init__(self, url: str, prefix: str = "pms:cache:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, tags: Iterable[str], ttl: float) -> None:
+        pipeline = self.client.pipeline()
+        pipeline.set(self.prefix + key, value, px=int(ttl * 1000))
+        for tag in tags:
+            pipeline.sadd(f"{self.prefix}tag:{tag}", self.prefix + key)
+        pipeline.execute()
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = self.client.smembers(tag_key)
+            self.client.delete(tag_key, *keys)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_backend(url: str) -> CacheBackend | None:
+    if not url:
+        return None
+    if url == "memory://":
+        return InProcessBackend()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend {url!r}")
+
+
+class Cache:
+    def __init__(self, local: LocalTier, shared: CacheBackend | None, stats: CacheStats, enabled: bool = True):
+        self.local = local
+        self.shared = shared
+        self.stats = stats
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._floor = 0
+        self._invalidated: dict[str, int] = {}
+
+    def generation(self) -> int:
+        """Position to pass to ``is_current`` once a value read from the database is ready to be stored."""
+        with self._lock:
+            return self._sequence
+
+    def is_current(self, generation: int, tags: Iterable[str]) -> bool:
+        """False if any of ``tags`` was invalidated after ``generation``, so the value may already be stale."""
+        with self._lock:
+            if generation < self._floor:
+                return False
+            return all(self._invalidated.get(tag, 0) <= generation for tag in tags)
+
+    def _bump(self, tags: Iterable[str] | None) -> None:
+        with self._lock:
+            self._sequence += 1
+            if tags is None or len(self._invalidated) > MAX_TRACKED_INVALIDATIONS:
+                # Forgetting per-tag positions is safe as long as every fill started before now is refused.
+                self._invalidated.clear()
+                self._floor = self._sequence
+                return
+            for tag in tags:
+                self._invalidated[tag] = self._sequence
+
+    def get(self, key: str):
+        if not self.enabled:
+            return MISSING
+        value = self.local.get(key)
+        if value is not MISSING:
+            self.stats.incr("local_hits")
+            return value
+        self.stats.incr("local_misses")
+        if self.shared is None:
+            return MISSING
+        try:
+            raw = self.shared.get(key)
+        except Exception:
+            logger.exception("Shared cache read failed")
+            self.stats.incr("shared_errors")
+            return MISSING
+        if raw is None:
+            self.stats.incr("shared_misses")
+            return MISSING
+        self.stats.incr("shared_hits")
+        value, tags = pickle.loads(raw)
+        self.local.set(key, value, tags)
+        return value
+
+    def set(self, key: str, value, tags: Iterable[str] = (), ttl: float | None = None) -> None:
+        if not self.enabled:
+            return
+        tags = frozenset(tags)
+        self.local.set(key, value, tags, ttl)
+        if self.shared is None:
+            return
+        try:
+            self.shared.set(key, pickle.dumps((value, tags)), tags, ttl or settings.cache_shared_ttl_seconds)
+        except Exception:
+            logger.exception("Shared cache write failed")
+            self.stats.incr("shared_errors")
+
+    def invalidate(self, tags: Iterable[str], shared: bool = True) -> None:
+        tags = set(tags)
+        if not tags:
+            return
+        self._bump(tags)
+        self.stats.incr("invalidated", self.local.invalidate(tags))
+        if shared and self.shared is not None:
+            try:
+                self.shared.invalidate(tags)
+            except Exception:
+                logger.exception("Shared cache invalidation failed")
+                self.stats.incr("shared_errors")
+
+    def clear_local(self) -> None:
+        self._bump(None)
+        self.local.clear()
+
+    def clear(self) -> None:
+        self.clear_local()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def metrics(self) -> dict:
+        counters = self.stats.snapshot()
+        lookups = counters.get("local_hits", 0) + counters.get("local_misses", 0)
+        hits = counters.get("local_hits", 0) + counters.get("shared_hits", 0)
+        return {
+            "enabled": self.enabled,
+            "local_entries": len(self.local),
+            "local_max_entries": self.local.max_entries,
+            "shared_backend": type(self.shared).__name__ if self.shared is not None else None,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            **counters,
+        }
+
+
+def cached(namespace: str, key: Callable[..., object], tags: Callable[..., Iterable[str]], ttl: float | None = None):
+    """Cache a read function; ``key`` and ``tags`` receive the same arguments as the function."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            cache_key = f"{namespace}:{key(*args, **kwargs)}"
+            value = cache.get(cache_key)
+            if value is not MISSING:
+                return value
+            entry_tags = frozenset(tags(*args, **kwargs))
+            # An invalidation that lands while the function runs may describe a write the result predates.
+            generation = cache.generation()
+            value = function(*args, **kwargs)
+            if value is not None and cache.is_current(generation, entry_tags):
+                cache.set(cache_key, value, entry_tags, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+MAX_NOTIFIED_TAGS = 200
+
+
+def row_tags(instance) -> set[str]:
+    state = inspect(instance)
+    table = state.mapper.local_table.name
+    identity = state.identity or state.mapper.primary_key_from_instance(instance)
+    return {table, f"{table}:{identity[0]}"} if identity and identity[0] is not None else {table}
+
+
+def _collect_tags(session: Session, flush_context) -> None:
+    tags = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        tags |= row_tags(instance)
+    if tags:
+        invalidate_on_commit(session, tags)
+
+
+def invalidate_on_commit(session: Session, tags: set[str]) -> None:
+    """Invalidate ``tags`` everywhere once ``session`` commits; needed for writes that bypass the ORM."""
+    from app.core.events import INTERNAL_PREFIX, NOTIFY_SQL, notify_params
+
+    session.info.setdefault("cache_tags", set()).update(tags)
+    if len(tags) > MAX_NOTIFIED_TAGS:
+        # Every entry also carries its table tag, so table tags alone keep the notification small.
+        tags = {tag for tag in tags if ":" not in tag}
+    # Sent inside the transaction of each database written to, so other workers only hear about committed changes.
+    params = notify_params(f"{INTERNAL_PREFIX}cache.invalidate", {"tags": sorted(tags)})
+    shard = shard_engine(session.info.get("branch_id"))
+    tables = {tag.partition(":")[0] for tag in tags}
+    binds = {shard if shard is not None and table in SHARDED_TABLES else session.bind for table in tables}
+    for bind in binds:
+        session.connection(bind_arguments={"bind": bind}).execute(NOTIFY_SQL, params)
+
+
+def _invalidate_committed(session: Session) -> None:
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        cache.invalidate(tags)
+
+
+def _discard_tags(session: Session, previous_transaction) -> None:
+    session.info.pop("cache_tags", None)
+
+
+def _on_event(event: dict) -> None:
+    if event["type"].endswith("cache.invalidate"):
+        # The writing worker already cleared the shared tier after its commit.
+        cache.invalidate(event["data"]["tags"], shared=False)
+    elif event["type"] == "resync":
+        # Invalidations may have been missed while the listener was reconnecting.
+        cache.clear_local()
+
+
+def install_session_hooks(session_factory) -> None:
+    event.listen(session_factory, "after_flush", _collect_tags)
+    event.listen(session_factory, "after_commit", _invalidate_committed)
+    event.listen(session_factory, "after_soft_rollback", _discard_tags)
+
+
+def start_invalidation_listener() -> None:
+    from app.core.events import broker
+
+    if cache.enabled:
+        broker.add_listener(_on_event)
+
+
+stats = CacheStats()
+cache = Cache(
+    LocalTier(settings.cache_local_max_entries, settings.cache_local_ttl_seconds, stats),
+    create_backend(settings.cache_shared_url),
+    stats,
+    enabled=settings.cache_enabled,
+)
+install_session_hooks(SessionLocal)
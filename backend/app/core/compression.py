@@ -0,0 +1,122 @@
+import gzip
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+def _accepted(header: str) -> set[str]:
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in {"q=0", "q=0.0", "q=0.00", "q=0.000"}:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = _accepted(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        body = bytearray()
+        passthrough = False
+        stream = None
+
+        async def wrapped_send(message: Message) -> None:
+            nonlocal start, passthrough, stream
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                headers = Headers(raw=message["headers"])
+                # Server-sent events must reach the client as each event is written, so they are never encoded.
+                if (
+                    "content-encoding" in headers
+                    or headers.get("content-type", "").startswith("text/event-stream")
+                    or message["status"] in {204, 304}
+                ):
+                    passthrough = True
+                    await send(message)
+                return
+
+            more_body = message.get("more_body", False)
+            if stream is None and not more_body:
+                body.extend(message.get("body", b""))
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if len(body) < self.minimum_size:
+                    await send(start)
+                    await send({"type": "http.response.body", "body": bytes(body)})
+                    return
+                if encoding == "br":
+                    compressed = brotli.compress(bytes(body), quality=self.brotli_quality)
+                else:
+                    compressed = gzip.compress(bytes(body), compresslevel=self.gzip_level)
+                self._encode_headers(headers, encoding)
+                headers["Content-Length"] = str(len(compressed))
+                await send(start)
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streamed bodies (CSV exports, printed receipts) are compressed chunk by chunk and flushed after each
+            # one, so the client keeps receiving data as it is produced.
+            if stream is None:
+                stream = self._compressor(encoding)
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                self._encode_headers(headers, encoding)
+                del headers["Content-Length"]
+                await send(start)
+            chunk = stream(message.get("body", b""), more_body)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, wrapped_send)
+
+    def _compressor(self, encoding: str):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+
+            def compress(chunk: bytes, more_body: bool) -> bytes:
+                return compressor.process(chunk) + (compressor.flush() if more_body else compressor.finish())
+
+            return compress
+
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+        def compress(chunk: bytes, more_body: bool) -> bytes:
+            return compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+        return compress
+
+    @staticmethod
+    def _encode_headers(headers: MutableHeaders, encoding: str) -> None:
+        headers["Content-Encoding"] = encoding
+        etag = headers.get("etag")
+        if etag and etag.endswith('"'):
+            # A strong validator must differ between encodings of the same resource.
+            headers["ETag"] = f'{etag[:-1]}-{encoding}"'
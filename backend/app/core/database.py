@@ -1,5 +1,11 @@
-﻿from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+﻿import hashlib
+import threading
+import time
+
+from fastapi import Header
+from sqlalchemy import create_engine, delete, event, inspect, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.core.config import settings
 
@@ -8,8 +14,151 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(settings.database_url, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+def row_columns(model) -> list:
+    """Every mapped column of ``model``, for selects that return plain rows instead of tracked instances."""
+    return [getattr(model, attribute.key) for attribute in model.__mapper__.column_attrs]
+
+
+engine = create_engine(
+    settings.database_url,
+    future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=True,
+    query_cache_size=settings.db_query_cache_size,
+)
+
+# Branch-owned tables of the branches listed in SHARDED_BRANCH_IDS live on one of the shard databases.
+SHARDED_TABLES = frozenset(
+    {
+        "medicines",
+        "medicine_prices",
+        "sales",
+        "sale_items",
+        "sale_keys",
+        "purchases",
+        "purchase_items",
+        "medicine_forecasts",
+        "supplier_purchase_months",
+        "medicine_sales_months",
+    }
+)
+# Sharded tables keep foreign keys to these and shard queries join them, so every shard holds a copy of the
+# primary's rows.
+SHARED_TABLES = ("branches", "users", "suppliers")
+shard_engines = [
+    create_engine(
+        url.strip(),
+        future=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=True,
+        query_cache_size=settings.db_query_cache_size,
+    )
+    for url in settings.shard_database_urls.split(",")
+    if url.strip()
+]
+sharded_branches = frozenset(int(value) for value in settings.sharded_branch_ids.split(",") if value.strip())
+
+
+def shard_engine(branch_id: int | None):
+    if branch_id not in sharded_branches or not shard_engines:
+        return None
+    digest = hashlib.blake2b(str(branch_id).encode(), digest_size=8).digest()
+    return shard_engines[int.from_bytes(digest, "big") % len(shard_engines)]
+
+
+class BranchSession(Session):
+    """Session that sends branch-owned tables to the shard of ``info["branch_id"]``, if it has one."""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if mapper is not None and mapper.local_table.name in SHARDED_TABLES:
+            shard = shard_engine(self.info.get("branch_id"))
+            if shard is not None:
+                return shard
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+SessionLocal = sessionmaker(bind=engine, class_=BranchSession, autoflush=False, autocommit=False)
+
+
+@event.listens_for(BranchSession, "after_begin")
+def _begin_read_only(session: Session, transaction, connection) -> None:
+    mode = session.info.get("read_only")
+    if mode == "deferrable":
+        # Waits for a snapshot that no serializable writer can invalidate, then runs without predicate locks.
+        connection.exec_driver_sql("SET TRANSACTION ISOLATION LEVEL SERIALIZABLE, READ ONLY, DEFERRABLE")
+    elif mode:
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+@event.listens_for(BranchSession, "before_flush")
+def _refuse_read_only_flush(session: Session, flush_context, instances) -> None:
+    if session.info.get("read_only"):
+        raise RuntimeError("Read-only session cannot flush changes")
+
+
+@event.listens_for(BranchSession, "after_flush")
+def _mirror_shared_rows(session: Session, flush_context) -> None:
+    # Copies land on each shard inside this session, so they commit or roll back with the primary's write.
+    if not shard_engines:
+        return
+    statements = []
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        state = inspect(instance)
+        table = state.mapper.local_table
+        if table.name not in SHARED_TABLES or session.get_bind(state.mapper) is not engine:
+            continue
+        identity = state.mapper.primary_key_from_instance(instance)
+        keys = {column.name: value for column, value in zip(table.primary_key, identity)}
+        if None in keys.values():
+            continue
+        if instance in session.deleted:
+            statements.append(delete(table).where(*(table.c[name] == value for name, value in keys.items())))
+            continue
+        # Server defaults that were not loaded back are left to the shard's own defaults.
+        values = {
+            column.name: state.dict[prop.key]
+            for prop in state.mapper.column_attrs
+            for column in prop.columns
+            if prop.key in state.dict
+        }
+        statement = insert(table).values({**values, **keys})
+        statements.append(
+            statement.on_conflict_do_update(index_elements=list(keys), set_=values)
+            if values
+            else statement.on_conflict_do_nothing()
+        )
+    for shard in shard_engines:
+        connection = session.connection(bind_arguments={"bind": shard})
+        for statement in statements:
+            connection.execute(statement)
+
+
+read_engine = (
+    create_engine(
+        settings.read_database_url,
+        future=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=True,
+        query_cache_size=settings.db_query_cache_size,
+    )
+    if settings.read_database_url
+    else None
+)
+ReadSessionLocal = sessionmaker(bind=read_engine or engine, class_=BranchSession, autoflush=False, autocommit=False)
+
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_lock = threading.Lock()
+_recent_writers: dict[str, float] = {}
+_replica_state = {"checked_at": 0.0, "healthy": False}
 
 
 def get_db():
@@ -18,3 +167,74 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def mark_write(writer: str | None) -> None:
+    if not writer or read_engine is None:
+        return
+    now = time.monotonic()
+    with _lock:
+        _recent_writers[writer] = now + settings.read_your_writes_seconds
+        if len(_recent_writers) > 10_000:
+            for key, expires in list(_recent_writers.items()):
+                if expires < now:
+                    del _recent_writers[key]
+
+
+def _pinned_to_primary(writer: str | None) -> bool:
+    if not writer:
+        return False
+    with _lock:
+        expires = _recent_writers.get(writer)
+    return expires is not None and expires > time.monotonic()
+
+
+def replica_available() -> bool:
+    if read_engine is None:
+        return False
+    now = time.monotonic()
+    with _lock:
+        if now - _replica_state["checked_at"] < settings.replica_check_seconds:
+            return _replica_state["healthy"]
+        # Claim the probe so concurrent callers keep the last verdict instead of all probing at once.
+        _replica_state["checked_at"] = now
+    try:
+        with read_engine.connect() as connection:
+            lag = float(connection.scalar(REPLICA_LAG_SQL))
+        healthy = lag <= settings.replica_max_lag_seconds
+    except Exception:
+        healthy = False
+    with _lock:
+        _replica_state["healthy"] = healthy
+    return healthy
+
+
+def get_readonly_db():
+    """Primary session whose transactions are ``READ ONLY``, for GET handlers that must see the latest writes."""
+    db = SessionLocal(info={"read_only": True})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(x_user_id: str | None = Header(None, alias="X-User-Id")):
+    factory = ReadSessionLocal if replica_available() and not _pinned_to_primary(x_user_id) else SessionLocal
+    db = factory(info={"read_only": True})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def warm_pool(size: int | None = None) -> None:
+    connections = []
+    try:
+        for pool_engine in filter(None, (engine, read_engine)):
+            for _ in range(size or settings.db_pool_size):
+                connection = pool_engine.connect()
+                connection.exec_driver_sql("SELECT 1")
+                connections.append(connection)
+    finally:
+        for connection in connections:
+            connection.close()
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import engine, shard_engines
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "pms_events"
+SEQUENCE = "pms_event_seq"
+RESYNC = {"id": None, "type": "resync", "data": {}}
+INTERNAL_PREFIX = "internal."
+STOCK_EVENT_ITEMS = 300
+
+NOTIFY_SQL = text(
+    "SELECT pg_notify(:channel, json_build_object("
+    f"'id', nextval('{SEQUENCE}'), 'type', CAST(:type AS text), 'data', CAST(:data AS json))::text)"
+)
+
+
+def notify_params(event_type: str, data: dict) -> dict:
+    return {"channel": CHANNEL, "type": event_type, "data": json.dumps(data, separators=(",", ":"), default=str)}
+
+
+def publish(db: Session, event_type: str, data: dict) -> None:
+    # Delivered by Postgres on commit only, so rolled back changes never reach clients.
+    db.execute(NOTIFY_SQL, notify_params(event_type, data))
+
+
+def publish_stock(db: Session, medicines) -> None:
+    branches: dict[int, dict[int, int]] = {}
+    for medicine in medicines:
+        branches.setdefault(medicine.branch_id, {})[medicine.id] = medicine.stock_qty
+    for branch_id, levels in branches.items():
+        publish_stock_levels(db, branch_id, levels)
+
+
+def publish_stock_levels(db: Session, branch_id: int, levels: dict[int, int]) -> None:
+    items = [[medicine_id, qty] for medicine_id, qty in levels.items()]
+    # NOTIFY payloads are capped at 8000 bytes, so large changes go out in several events.
+    for start in range(0, len(items), STOCK_EVENT_ITEMS):
+        publish(db, "stock.changed", {"branch_id": branch_id, "items": items[start : start + STOCK_EVENT_ITEMS]})
+
+
+class EventBroker:
+    def __init__(self, history_size: int, queue_size: int):
+        self._lock = threading.Lock()
+        self._history: deque[dict] = deque(maxlen=history_size)
+        self._subscribers: dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._queue_size = queue_size
+        self._listeners: list = []
+        self._threads: list[threading.Thread] = []
+
+    def add_listener(self, callback) -> None:
+        # Listeners run on the listener thread for every event, including internal ones clients never see.
+        with self._lock:
+            self._listeners.append(callback)
+        self._start()
+
+    def subscribe(self, last_event_id: str | None = None) -> asyncio.Queue:
+        self._start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        with self._lock:
+            backlog = self._backlog(last_event_id)
+            self._subscribers[queue] = asyncio.get_running_loop()
+        if len(backlog) > self._queue_size:
+            backlog = [RESYNC]
+        for event in backlog:
+            queue.put_nowait(event)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def _backlog(self, last_event_id: str | None) -> list[dict]:
+        if not last_event_id:
+            return []
+        # Notifications arrive in commit order, which is not id order, so resume by position.
+        events = list(self._history)
+        for index in range(len(events) - 1, -1, -1):
+            if str(events[index]["id"]) == last_event_id:
+                return events[index + 1 :]
+        return [RESYNC]
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            # Writes that only touch a shard notify on the shard, so every database gets a listener.
+            for index, bind in enumerate((engine, *shard_engines)):
+                name = "event-listener" if index == 0 else f"event-listener-shard{index - 1}"
+                thread = threading.Thread(target=self._listen, args=(bind,), name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _listen(self, bind) -> None:
+        connected_before = False
+        while True:
+            try:
+                connection = bind.raw_connection()
+                connection.detach()
+                driver_connection = connection.dbapi_connection
+                try:
+                    driver_connection.autocommit = True
+                    with driver_connection.cursor() as cursor:
+                        cursor.execute(f"LISTEN {CHANNEL}")
+                    if connected_before:
+                        with self._lock:
+                            self._history.clear()
+                        self._notify_listeners(RESYNC)
+                        self._broadcast(RESYNC)
+                    connected_before = True
+                    self._consume(driver_connection)
+                finally:
+                    connection.close()
+            except Exception:
+                logger.exception("Event listener lost its connection; reconnecting")
+            time.sleep(settings.bootstrap_retry_seconds)
+
+    def _consume(self, driver_connection) -> None:
+        while True:
+            if select.select([driver_connection], [], [], settings.event_heartbeat_seconds) == ([], [], []):
+                continue
+            driver_connection.poll()
+            while driver_connection.notifies:
+                event = json.loads(driver_connection.notifies.pop(0).payload)
+                self._notify_listeners(event)
+                if event["type"].startswith(INTERNAL_PREFIX):
+                    continue
+                with self._lock:
+                    self._history.append(event)
+                self._broadcast(event)
+
+    def _notify_listeners(self, event: dict) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Event listener callback failed")
+
+    def _broadcast(self, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver, queue, event)
+            except RuntimeError:
+                self.unsubscribe(queue)
+
+
+def _deliver(queue: asyncio.Queue, event: dict) -> None:
+    if queue.full():
+        # A client that cannot keep up gets told to reload instead of silently missing events.
+        while not queue.empty():
+            queue.get_nowait()
+        event = RESYNC
+    queue.put_nowait(event)
+
+
+def format_event(event: dict) -> str:
+    lines = [] if event["id"] is None else [f"id: {event['id']}"]
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event['data'], separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+broker = EventBroker(settings.event_history_size, settings.event_queue_size)
@@ -0,0 +1,63 @@
+from itertools import product
+
+import numpy as np
+
+SEASON_LENGTH = 7
+ALPHAS = (0.1, 0.3, 0.5)
+BETAS = (0.0, 0.05)
+GAMMAS = (0.1, 0.3)
+
+
+def _initial_state(series: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    first = series[:, :SEASON_LENGTH]
+    level = first.mean(axis=1)
+    if series.shape[1] >= 2 * SEASON_LENGTH:
+        trend = (series[:, SEASON_LENGTH : 2 * SEASON_LENGTH].mean(axis=1) - level) / SEASON_LENGTH
+    else:
+        trend = np.zeros(len(series))
+    seasonal = first - level[:, None]
+    return level, trend, seasonal
+
+
+def holt_winters(series: np.ndarray, alpha: float, beta: float, gamma: float):
+    level, trend, seasonal = _initial_state(series)
+    seasonal = seasonal.copy()
+    sse = np.zeros(len(series))
+    for t in range(series.shape[1]):
+        slot = t % SEASON_LENGTH
+        observed = series[:, t]
+        sse += (observed - (level + trend + seasonal[:, slot])) ** 2
+        previous = level
+        level = alpha * (observed - seasonal[:, slot]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous) + (1 - beta) * trend
+        seasonal[:, slot] = gamma * (observed - level) + (1 - gamma) * seasonal[:, slot]
+    return level, trend, seasonal, sse
+
+
+def fit(series: np.ndarray, horizon: int) -> dict[str, np.ndarray]:
+    series = np.asarray(series, dtype=np.float64)
+    if series.shape[1] < SEASON_LENGTH:
+        raise ValueError(f"Need at least {SEASON_LENGTH} days of history")
+
+    best = None
+    for alpha, beta, gamma in product(ALPHAS, BETAS, GAMMAS):
+        level, trend, seasonal, sse = holt_winters(series, alpha, beta, gamma)
+        if best is None:
+            best = {"level": level, "trend": trend, "seasonal": seasonal, "sse": sse}
+            continue
+        better = sse < best["sse"]
+        best["level"] = np.where(better, level, best["level"])
+        best["trend"] = np.where(better, trend, best["trend"])
+        best["seasonal"] = np.where(better[:, None], seasonal, best["seasonal"])
+        best["sse"] = np.where(better, sse, best["sse"])
+
+    steps = np.arange(1, horizon + 1)
+    slots = (series.shape[1] + steps - 1) % SEASON_LENGTH
+    forecast = best["level"][:, None] + best["trend"][:, None] * steps + best["seasonal"][:, slots]
+    return {
+        "level": best["level"],
+        "trend": best["trend"],
+        "seasonal": best["seasonal"],
+        "rmse": np.sqrt(best["sse"] / series.shape[1]),
+        "forecast": np.maximum(forecast, 0),
+    }
@@ -0,0 +1,148 @@
+import hashlib
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import Connection, select, text
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db, shard_engine
+from app.core.rbac import current_branch
+from app.models.table_version import TableVersion
+
+TRACKED_TABLES = (
+    "medicines",
+    "medicine_prices",
+    "suppliers",
+    "sales",
+    "sale_items",
+    "purchases",
+    "purchase_items",
+    "users",
+    "medicine_forecasts",
+    "report_jobs",
+    "branches",
+    "audit_log",
+)
+
+# A statement-level trigger on each tracked table notes the first change to it in a transaction by queueing
+# one row here. The queued row's deferred trigger bumps the counter at commit, so the shared counter row is
+# only locked for the duration of the commit, and bulk writes cost one trigger call per statement, not per row.
+BUMPS_TABLE = "CREATE UNLOGGED TABLE IF NOT EXISTS table_version_bumps (table_name text NOT NULL)"
+NOTE_FUNCTION = """
+CREATE OR REPLACE FUNCTION note_table_change() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('pms.bumped_' || TG_ARGV[0], true) IS DISTINCT FROM 'on' THEN
+        PERFORM set_config('pms.bumped_' || TG_ARGV[0], 'on', true);
+        INSERT INTO table_version_bumps (table_name) VALUES (TG_ARGV[0]);
+    END IF;
+    RETURN NULL;
+END $$
+"""
+BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, version, changed_at) VALUES (NEW.table_name, 1, clock_timestamp())
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = table_versions.version + 1, changed_at = clock_timestamp();
+    DELETE FROM table_version_bumps WHERE table_name = NEW.table_name;
+    RETURN NULL;
+END $$
+"""
+HAS_TRIGGER = text("SELECT 1 FROM pg_trigger WHERE tgrelid = to_regclass(:table) AND tgname = :name")
+
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def ensure_version_triggers(connection: Connection) -> None:
+    connection.execute(text(BUMPS_TABLE))
+    connection.execute(text(NOTE_FUNCTION))
+    connection.execute(text(BUMP_FUNCTION))
+    if not connection.scalar(HAS_TRIGGER, {"table": "table_version_bumps", "name": "bump_table_version"}):
+        connection.execute(
+            text(
+                "CREATE CONSTRAINT TRIGGER bump_table_version AFTER INSERT ON table_version_bumps "
+                "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_table_version()"
+            )
+        )
+    for table in TRACKED_TABLES:
+        if connection.scalar(HAS_TRIGGER, {"table": table, "name": "bump_table_version"}):
+            # Per-row deferred triggers from before the statement-level scheme.
+            connection.execute(text(f"DROP TRIGGER bump_table_version ON {table}"))
+        if not connection.scalar(HAS_TRIGGER, {"table": table, "name": "note_table_change"}):
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER note_table_change AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+                    f"FOR EACH STATEMENT EXECUTE FUNCTION note_table_change('{table}')"
+                )
+            )
+
+
+def _match(header: str, etag: str) -> str | None:
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return etag
+        bare = candidate.removeprefix("W/")
+        for suffix in ENCODING_SUFFIXES:
+            if bare.endswith(f'{suffix}"'):
+                bare = bare[: -len(suffix) - 1] + '"'
+        if bare == etag:
+            return candidate.removeprefix("W/")
+    return None
+
+
+def _not_modified_since(header: str, modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return since is not None and modified.replace(microsecond=0) <= since
+
+
+def conditional(*tables: str, daily: bool = False):
+    def dependency(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_read_db),
+        branch_id: int = Depends(current_branch),
+    ) -> None:
+        # Versions are read before the endpoint queries, so a body is never older than its validator.
+        query = select(TableVersion.table_name, TableVersion.version, TableVersion.changed_at).where(
+            TableVersion.table_name.in_(tables)
+        )
+        rows = db.execute(query).all()
+        shard = shard_engine(branch_id)
+        if shard is not None:
+            with shard.connect() as connection:
+                rows += connection.execute(query).all()
+        versions: dict[str, tuple[int, datetime]] = {}
+        for name, version, changed_at in rows:
+            # Both counters only grow, so their sum changes whenever either database changes.
+            previous, previous_at = versions.get(name, (0, changed_at))
+            versions[name] = (previous + version, max(previous_at, changed_at))
+        parts = [f"{table}:{versions.get(table, (0, None))[0]}" for table in tables]
+        parts.append(request.headers.get("X-User-Id", ""))
+        parts.append(str(branch_id))
+        if daily:
+            parts.append(date.today().isoformat())
+        etag = f'"{hashlib.blake2b(";".join(parts).encode(), digest_size=12).hexdigest()}"'
+
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        modified = max((changed_at for _, changed_at in versions.values()), default=None)
+        if modified is not None and not daily:
+            headers["Last-Modified"] = format_datetime(modified.astimezone(timezone.utc), usegmt=True)
+
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            # Echo the tag the client holds so an encoded representation keeps its own validator.
+            matched = _match(if_none_match, etag)
+            if matched:
+                raise HTTPException(status_code=304, headers={**headers, "ETag": matched})
+        elif "Last-Modified" in headers:
+            if_modified_since = request.headers.get("If-Modified-Since")
+            if if_modified_since and _not_modified_since(if_modified_since, modified):
+                raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from app.core.config import settings
+from app.core.database import engine, shard_engines, warm_pool
+from app.core.partitions import ensure_upcoming_partitions
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+
+
+def bootstrap() -> None:
+    import app.models  # noqa: F401
+    from app.core.schema_sync import ensure_runtime_schema, sync_shared_tables
+    from app.core.seed import ensure_default_admin
+
+    configure_mappers()
+    for bind in (engine, *shard_engines):
+        ensure_runtime_schema(bind)
+    ensure_default_admin()
+    for shard in shard_engines:
+        sync_shared_tables(shard)
+    if settings.db_pool_warmup:
+        warm_pool()
+    _ready.set()
+
+
+def _bootstrap_until_ready() -> None:
+    while not _ready.is_set():
+        try:
+            bootstrap()
+        except Exception:
+            logger.exception("Bootstrap failed; retrying in %s seconds", settings.bootstrap_retry_seconds)
+            time.sleep(settings.bootstrap_retry_seconds)
+
+
+def _maintain_partitions() -> None:
+    while True:
+        time.sleep(settings.partition_maintenance_seconds)
+        try:
+            ensure_upcoming_partitions()
+        except Exception:
+            logger.exception("Partition maintenance failed")
+
+
+def _apply_scheduled_prices() -> None:
+    from app.core import prices
+
+    since = None
+    while True:
+        _ready.wait()
+        now = datetime.utcnow()
+        try:
+            prices.apply_due_prices(since, now)
+            # Overlap the previous window so a price committed just after its start time is still picked up.
+            since = now - timedelta(seconds=settings.price_refresh_seconds)
+        except Exception:
+            logger.exception("Applying scheduled prices failed")
+        time.sleep(settings.price_refresh_seconds)
+
+
+def start_bootstrap() -> None:
+    from app.core import barcodes, prices
+    from app.core.cache import start_invalidation_listener
+
+    start_invalidation_listener()
+    barcodes.start_listener()
+    prices.start_listener()
+    threading.Thread(target=_maintain_partitions, name="partition-maintenance", daemon=True).start()
+    threading.Thread(target=_apply_scheduled_prices, name="scheduled-prices", daemon=True).start()
+    if not settings.bootstrap_in_background:
+        bootstrap()
+        return
+    threading.Thread(target=_bootstrap_until_ready, name="bootstrap", daemon=True).start()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def database_available() -> bool:
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception:
+        return False
+    return True
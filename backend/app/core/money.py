@@ -0,0 +1,11 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+CENTS_PER_UNIT = 100
+
+
+def to_cents(value: Decimal | float | int | str) -> int:
+    return int((Decimal(str(value)) * CENTS_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
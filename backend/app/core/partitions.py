@@ -0,0 +1,215 @@
+import argparse
+import gzip
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import Connection, text
+
+from app.core.config import settings
+from app.core.database import engine, shard_engines
+
+PARTITIONED_TABLES = ("sales", "sale_items")
+ARCHIVE_SCHEMA = "archive"
+SCHEMA_LOCK_KEY = 7_305_001
+
+
+def schema_lock(connection: Connection) -> None:
+    """Serialise schema changes across workers until the surrounding transaction ends."""
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    return bool(
+        connection.scalar(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": table},
+        )
+    )
+
+
+def ensure_partitions(connection: Connection, first: date, last: date) -> list[str]:
+    created = []
+    month = month_start(first)
+    while month <= month_start(last):
+        upper = add_months(month, 1)
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, month)
+            if connection.scalar(text("SELECT to_regclass(:name)"), {"name": name}):
+                continue
+            connection.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+                )
+            )
+            created.append(name)
+        month = upper
+    return created
+
+
+def ensure_upcoming_partitions() -> list[str]:
+    today = datetime.utcnow().date()
+    created = []
+    for bind in (engine, *shard_engines):
+        with bind.begin() as connection:
+            schema_lock(connection)
+            created += ensure_partitions(connection, today, add_months(today, settings.sales_partition_months_ahead))
+    return created
+
+
+def migrate_to_partitioned(connection: Connection) -> None:
+    from app.models.sale import Sale
+    from app.models.sale_item import SaleItem
+
+    if connection.scalar(text("SELECT to_regclass('sales')")) is None or is_partitioned(connection, "sales"):
+        return
+
+    for table in PARTITIONED_TABLES:
+        connection.execute(text(f"ALTER TABLE {table} RENAME TO {table}_legacy"))
+        indexes = connection.scalars(
+            text("SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = to_regclass(:table)"),
+            {"table": f"{table}_legacy"},
+        ).all()
+        for index in indexes:
+            connection.execute(text(f"ALTER INDEX {index} RENAME TO {index}_legacy"))
+
+    Sale.__table__.create(connection)
+    SaleItem.__table__.create(connection)
+
+    bounds = connection.execute(text("SELECT MIN(sold_at), MAX(sold_at) FROM sales_legacy")).one()
+    today = datetime.utcnow().date()
+    first = bounds[0].date() if bounds[0] else today
+    last = max(bounds[1].date() if bounds[1] else today, add_months(today, settings.sales_partition_months_ahead))
+    ensure_partitions(connection, first, last)
+
+    connection.execute(
+        text(
+            "INSERT INTO sales (id, sold_at, customer_name, user_id, total_amount) "
+            "SELECT id, sold_at, customer_name, user_id, total_amount FROM sales_legacy"
+        )
+    )
+    connection.execute(
+        text(
+            "INSERT INTO sale_items (id, sale_id, sold_at, medicine_id, quantity, unit_price, line_total) "
+            "SELECT i.id, i.sale_id, s.sold_at, i.medicine_id, i.quantity, i.unit_price, i.line_total "
+            "FROM sale_items_legacy i JOIN sales_legacy s ON s.id = i.sale_id"
+        )
+    )
+    for table in PARTITIONED_TABLES:
+        connection.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))")
+        )
+    connection.execute(text("DROP TABLE sale_items_legacy"))
+    connection.execute(text("DROP TABLE sales_legacy"))
+
+
+def list_partitions(connection: Connection, table: str) -> list[tuple[str, date]]:
+    names = connection.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+        ),
+        {"table": table},
+    ).all()
+    prefix = f"{table}_p"
+    return [
+        (name, datetime.strptime(name[len(prefix) :], "%Y%m").date())
+        for name in names
+        if name.startswith(prefix) and name[len(prefix) :].isdigit()
+    ]
+
+
+def _detach(connection: Connection, table: str, name: str) -> None:
+    connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    foreign_keys = connection.scalars(
+        text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name) AND contype = 'f'"),
+        {"name": name},
+    ).all()
+    for constraint in foreign_keys:
+        connection.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'))
+
+
+def archive_partitions(before: date, mode: str, directory: Path | None = None) -> list[str]:
+    if mode not in {"csv", "table"}:
+        raise ValueError("mode must be 'csv' or 'table'")
+    cutoff = month_start(before)
+    archived = []
+    for index, bind in enumerate((engine, *shard_engines)):
+        # Shards hold the same month names, so each database gets its own label and export folder.
+        label = f"shard{index - 1}" if index else ""
+        with bind.begin() as connection:
+            schema_lock(connection)
+            months = [month for _, month in list_partitions(connection, "sales") if month < cutoff]
+            if mode == "table":
+                connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            for month in months:
+                for table in reversed(PARTITIONED_TABLES):
+                    name = partition_name(table, month)
+                    if connection.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is None:
+                        continue
+                    _detach(connection, table, name)
+                    if mode == "table":
+                        connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+                    else:
+                        _export_csv(connection, name, (directory or Path("archive")) / label)
+                        connection.execute(text(f"DROP TABLE {name}"))
+                    archived.append(f"{label}:{name}" if label else name)
+            connection.execute(text("DELETE FROM sale_keys WHERE sold_at < :cutoff"), {"cutoff": cutoff})
+    return archived
+
+
+def _export_csv(connection: Connection, name: str, directory: Path) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    with gzip.open(directory / f"{name}.csv.gz", "wt", encoding="utf-8", newline="") as handle:
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true)", handle)
+        finally:
+            cursor.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of sales and sale_items.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="create partitions up to the configured months ahead")
+    ensure.add_argument("--from", dest="first", type=date.fromisoformat, default=None, help="YYYY-MM-DD")
+    commands.add_parser("list", help="list attached partitions")
+    archive = commands.add_parser("archive", help="detach and archive partitions older than a month")
+    archive.add_argument("--before", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    archive.add_argument("--mode", choices=["csv", "table"], default="csv")
+    archive.add_argument("--dir", type=Path, default=Path("archive"))
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        today = datetime.utcnow().date()
+        with engine.begin() as connection:
+            schema_lock(connection)
+            created = ensure_partitions(
+                connection, args.first or today, add_months(today, settings.sales_partition_months_ahead)
+            )
+        print("\n".join(created) or "Partitions already present")
+    elif args.command == "list":
+        with engine.connect() as connection:
+            for table in PARTITIONED_TABLES:
+                for name, _ in list_partitions(connection, table):
+                    print(name)
+    else:
+        archived = archive_partitions(args.before, args.mode, args.dir)
+        print("\n".join(archived) or "Nothing to archive")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import threading
+from collections.abc import Iterable
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_on_commit
+from app.core.database import SessionLocal, engine, shard_engines
+from app.core.statements import EFFECTIVE_PRICES
+
+# Copies prices that came into force in (since, now] onto medicines.unit_price, the list price the catalog shows.
+APPLY_DUE_PRICES = text(
+    "UPDATE medicines m SET unit_price = due.unit_price "
+    "FROM (SELECT DISTINCT ON (medicine_id) medicine_id, unit_price FROM medicine_prices "
+    "WHERE effective_from > :since AND effective_from <= :now ORDER BY medicine_id, effective_from DESC) due "
+    "WHERE m.id = due.medicine_id AND m.unit_price <> due.unit_price "
+    "RETURNING m.id"
+)
+
+
+class PriceCache:
+    """Per-worker map of ``(branch_id, medicine_id)`` to the price in force and the window it holds for.
+
+    A hit needs no query while ``at`` falls inside the window, so a price scheduled for later is picked up once
+    its time comes. Price changes arrive as cache invalidations and drop the affected medicines.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prices: dict[tuple[int, int], tuple[Decimal, datetime | None, datetime | None]] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, db: Session, branch_id: int, ids: Iterable[int], at: datetime) -> dict[int, Decimal]:
+        found, missing = {}, []
+        with self._lock:
+            for medicine_id in set(ids):
+                entry = self._prices.get((branch_id, medicine_id))
+                if entry is not None and (entry[1] is None or entry[1] <= at) and (entry[2] is None or at < entry[2]):
+                    found[medicine_id] = entry[0]
+                else:
+                    missing.append(medicine_id)
+            self.hits += len(found)
+            self.misses += len(missing)
+            generation = self._generation
+        if not missing:
+            return found
+
+        rows = db.execute(EFFECTIVE_PRICES, {"branch_id": branch_id, "ids": missing, "at": at}).all()
+        with self._lock:
+            # An invalidation that raced the query may have made these rows stale; use them without keeping them.
+            keep = generation == self._generation
+            for row in rows:
+                found[row.id] = row.unit_price
+                if keep:
+                    self._prices[(branch_id, row.id)] = (row.unit_price, row.valid_from, row.valid_until)
+        return found
+
+    def drop(self, medicine_ids: set[int]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._prices if key[1] in medicine_ids]:
+                del self._prices[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._prices.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._prices), "hits": self.hits, "misses": self.misses}
+
+
+def apply_due_prices(since: datetime | None, now: datetime) -> int:
+    applied = 0
+    for bind in (engine, *shard_engines):
+        with SessionLocal(bind=bind) as db:
+            ids = db.scalars(APPLY_DUE_PRICES, {"since": since or datetime.min, "now": now}).all()
+            if ids:
+                invalidate_on_commit(db, {"medicines", *(f"medicines:{medicine_id}" for medicine_id in ids)})
+            db.commit()
+        applied += len(ids)
+    return applied
+
+
+def _on_event(event: dict) -> None:
+    if event["type"].endswith("cache.invalidate"):
+        tags = event["data"]["tags"]
+        if "medicine_prices" not in tags:
+            return
+        ids = {int(tag.partition(":")[2]) for tag in tags if tag.startswith("prices:")}
+        if ids:
+            cache.drop(ids)
+        else:
+            cache.clear()
+    elif event["type"] == "resync":
+        cache.clear()
+
+
+def start_listener() -> None:
+    from app.core.events import broker
+
+    broker.add_listener(_on_event)
+
+
+cache = PriceCache()
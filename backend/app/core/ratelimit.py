@@ -0,0 +1,221 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+import anyio
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+HEAVY_PREFIXES = ("/api/reports", "/api/inventory", "/api/audit")
+PRIORITY_ROUTES = {("POST", "/api/sales"), ("POST", "/api/sales/batch")}
+# Health checks must answer under load and event streams stay open for minutes, so neither counts as in flight.
+UNLIMITED_PREFIXES = ("/health", "/api/events")
+
+
+@dataclass(frozen=True)
+class Budget:
+    name: str
+    per_minute: float
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60
+
+
+class BucketStore(ABC):
+    """Keeps token buckets; ``take`` returns 0 when allowed, otherwise seconds until a token is available."""
+
+    blocking = True
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: int) -> float: ...
+
+
+class InProcessStore(BucketStore):
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000):
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisStore(BucketStore):
+    # Refill and take in one round trip so workers sharing a bucket cannot race each other.
+    SCRIPT = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+    def __init__(self, url: str, prefix: str = "pms:ratelimit:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(self.SCRIPT)
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        return float(self._take(keys=[self.prefix + key], args=[rate, burst, time.time()]))
+
+
+def create_store(url: str) -> BucketStore:
+    if not url or url == "memory://":
+        return InProcessStore()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported rate limit store {url!r}")
+
+
+class RateLimiter:
+    def __init__(self, store: BucketStore, budgets: dict[str, Budget], enabled: bool = True):
+        self.store = store
+        self.budgets = budgets
+        self.enabled = enabled
+        self.limited: Counter[str] = Counter()
+        self.in_flight = 0
+        self.shed = 0
+
+    def wait(self, budget: str, key: str, scale: int = 1) -> float:
+        if not self.enabled:
+            return 0.0
+        spec = self.budgets[budget]
+        wait = self.store.take(f"{budget}:{key}", spec.rate * scale, spec.burst * scale)
+        if wait:
+            self.limited[budget] += 1
+        return wait
+
+    def wait_any(self, budget: str, keys: list[tuple[str, int]]) -> float:
+        """Take from each ``(key, scale)`` bucket in turn; the first one that is empty decides the wait."""
+        for key, scale in keys:
+            wait = self.wait(budget, key, scale)
+            if wait:
+                return wait
+        return 0.0
+
+    def check(self, budget: str, key: str) -> None:
+        """Raise 429 when ``key`` has spent its ``budget``; for limits that need request data, such as usernames."""
+        wait = self.wait(budget, key)
+        if wait:
+            raise HTTPException(
+                status_code=429, detail="Too many requests", headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+    def metrics(self) -> dict:
+        return {"in_flight": self.in_flight, "shed": self.shed, "limited": dict(self.limited)}
+
+
+def classify(method: str, path: str) -> str | None:
+    if method == "POST" and path == "/api/auth/login":
+        return "login"
+    if method in {"POST", "PUT", "PATCH", "DELETE"}:
+        return "write"
+    if method == "GET" and path.startswith(HEAVY_PREFIXES):
+        return "heavy"
+    return None
+
+
+def client_ip(scope: Scope, headers: Headers) -> str:
+    if settings.rate_limit_trust_forwarded_for:
+        forwarded = headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """Token buckets per user (or IP) and budget, plus load shedding on the number of requests in flight.
+
+    Sales keep a reserve of ``reserved`` slots above ``max_in_flight`` so checkout keeps working while
+    reports and other traffic are being shed.
+    """
+
+    def __init__(self, app: ASGIApp, max_in_flight: int = 0, reserved: int = 0, retry_after: int = 1):
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.reserved = reserved
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path.startswith(UNLIMITED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        if self.max_in_flight:
+            limit = self.max_in_flight + (self.reserved if (method, path) in PRIORITY_ROUTES else 0)
+            if limiter.in_flight >= limit:
+                limiter.shed += 1
+                response = JSONResponse(
+                    {"detail": "Server busy"}, status_code=503, headers={"Retry-After": str(self.retry_after)}
+                )
+                await response(scope, receive, send)
+                return
+
+        budget = classify(method, path)
+        if budget:
+            headers = Headers(scope=scope)
+            user_id = headers.get("x-user-id")
+            ip = client_ip(scope, headers)
+            keys = [(f"ip:{ip}", 1)]
+            if user_id and budget != "login":
+                # X-User-Id is not verified at this point, so a client rotating it still shares one bucket per
+                # address, sized for several real users behind the same NAT.
+                keys = [(f"user:{user_id}", 1), (f"users:{ip}", settings.rate_limit_users_per_ip)]
+            if limiter.store.blocking:
+                wait = await anyio.to_thread.run_sync(limiter.wait_any, budget, keys)
+            else:
+                wait = limiter.wait_any(budget, keys)
+            if wait:
+                response = JSONResponse(
+                    {"detail": "Too many requests"}, status_code=429, headers={"Retry-After": str(math.ceil(wait))}
+                )
+                await response(scope, receive, send)
+                return
+
+        limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+
+
+limiter = RateLimiter(
+    create_store(settings.rate_limit_store_url),
+    {
+        "login": Budget("login", settings.rate_limit_login_per_minute, settings.rate_limit_login_burst),
+        "write": Budget("write", settings.rate_limit_write_per_minute, settings.rate_limit_write_burst),
+        "heavy": Budget("heavy", settings.rate_limit_heavy_per_minute, settings.rate_limit_heavy_burst),
+    },
+    enabled=settings.rate_limit_enabled,
+)
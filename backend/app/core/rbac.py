@@ -1,12 +1,22 @@
-from collections.abc import Iterable
+import functools
+from collections.abc import Callable, Iterable
 
 from fastapi import Depends, Header, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core.cache import cached
 from app.core.database import get_db
+from app.core.statements import USER_STATE
+from app.models.branch import Branch
 from app.models.user import User
 
 
+@cached("user", key=lambda user_id, db: user_id, tags=lambda user_id, db: ["users", f"users:{user_id}"])
+def _user_state(user_id: int, db: Session) -> dict | None:
+    row = db.execute(USER_STATE, {"user_id": user_id}).mappings().first()
+    return dict(row) if row else None
+
+
 def get_current_user(
     x_user_id: int | None = Header(None, alias="X-User-Id"),
     db: Session = Depends(get_db),
@@ -14,10 +24,44 @@ def get_current_user(
     if not x_user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing user identity")
 
-    user = db.get(User, x_user_id)
-    if not user or not user.active:
+    state = _user_state(x_user_id, db)
+    if not state or not state["active"]:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or inactive user")
-    return user
+
+    # Attach the cached row without a SELECT; the password hash is left unloaded and fetched on demand.
+    user = User(**state)
+    make_transient_to_detached(user)
+    db.info["user_id"] = user.id
+    return db.merge(user, load=False)
+
+
+def current_branch(
+    x_branch_id: int | None = Header(None, alias="X-Branch-Id"),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> int:
+    branch_id = user.branch_id
+    if x_branch_id is not None and x_branch_id != branch_id:
+        # Only a Super Admin may act on behalf of another branch.
+        if user.role != "Super Admin":
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+        if not db.get(Branch, x_branch_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Branch not found")
+        branch_id = x_branch_id
+    # Tagging the session routes branch-owned tables to the branch's shard, when it has one.
+    db.info["branch_id"] = branch_id
+    return branch_id
+
+
+@functools.cache
+def branch_db(session_dependency: Callable) -> Callable:
+    """Session from ``session_dependency`` tagged with the current branch, for routes that read off ``get_db``."""
+
+    def dependency(db: Session = Depends(session_dependency), branch_id: int = Depends(current_branch)) -> Session:
+        db.info["branch_id"] = branch_id
+        return db
+
+    return dependency
 
 
 def require_roles(roles: Iterable[str]):
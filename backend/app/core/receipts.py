@@ -0,0 +1,142 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from html import escape
+from string import Formatter
+
+
+class CompiledTemplate:
+    """A ``str.format``-style template parsed once into literal text and field names."""
+
+    def __init__(self, source: str):
+        self.parts = [(literal, name) for literal, name, _, _ in Formatter().parse(source)]
+
+    def render(self, values: dict[str, str]) -> str:
+        return "".join(literal + (values[name] if name is not None else "") for literal, name in self.parts)
+
+
+TEMPLATES = {
+    "html_head": """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8" />
+<title>{title}</title>
+<style>
+body {{ font-family: Arial, sans-serif; color: #111; margin: 24px; }}
+.receipt {{ max-width: 700px; margin: 0 auto 24px; border: 1px solid #ddd; padding: 16px; page-break-after: always; }}
+.receipt h1 {{ font-size: 18px; margin: 0 0 6px; }}
+.meta {{ font-size: 13px; line-height: 1.5; }}
+table {{ width: 100%; border-collapse: collapse; margin-top: 12px; font-size: 13px; }}
+th, td {{ border-bottom: 1px solid #eee; padding: 8px 4px; text-align: left; }}
+.num {{ text-align: right; }}
+.total {{ margin-top: 14px; text-align: right; font-size: 15px; font-weight: 700; }}
+.footer {{ margin-top: 18px; font-size: 12px; color: #444; }}
+@media print {{ body {{ margin: 0; }} .receipt {{ border: 0; max-width: none; margin: 0; }} }}
+</style>
+</head>
+<body>
+""",
+    "html_receipt": """<div class="receipt">
+<h1>{pharmacy} - Sales Receipt</h1>
+<div class="meta">
+<div><strong>Receipt:</strong> {code}</div>
+<div><strong>Date:</strong> {sold_at}</div>
+<div><strong>Seller:</strong> {seller}</div>
+<div><strong>Customer:</strong> {customer}</div>
+</div>
+<table>
+<thead><tr><th>Medicine</th><th class="num">Qty</th><th class="num">Unit Price</th><th class="num">Line Total</th></tr></thead>
+<tbody>
+{lines}</tbody>
+</table>
+<div class="total">Total: {total}</div>
+<div class="footer">Thank you.</div>
+</div>
+""",
+    "html_line": """<tr><td>{name}</td><td class="num">{quantity}</td><td class="num">{unit_price}</td><td class="num">{line_total}</td></tr>
+""",
+    "html_tail": """</body>
+</html>
+""",
+    "text_head": "",
+    "text_receipt": """{pharmacy}
+Receipt:  {code}
+Date:     {sold_at}
+Seller:   {seller}
+Customer: {customer}
+----------------------------------------
+{lines}----------------------------------------
+{total_line}
+Thank you.
+
+""",
+    "text_line": "{name}\n  {quantity} x {unit_price} = {line_total}\n",
+    "text_tail": "",
+}
+
+
+@lru_cache(maxsize=None)
+def template(name: str) -> CompiledTemplate:
+    return CompiledTemplate(TEMPLATES[name])
+
+
+@dataclass
+class ReceiptLine:
+    name: str
+    quantity: int
+    unit_price: Decimal
+    line_total: Decimal
+
+
+@dataclass
+class Receipt:
+    code: str
+    sold_at: datetime
+    seller: str | None
+    customer: str | None
+    total: Decimal
+    lines: list[ReceiptLine] = field(default_factory=list)
+
+
+def money(value: Decimal) -> str:
+    return f"{value:,.2f} ETB"
+
+
+def render(receipt: Receipt, kind: str, pharmacy: str) -> str:
+    quote = escape if kind == "html" else str
+    line_template = template(f"{kind}_line")
+    lines = "".join(
+        line_template.render(
+            {
+                "name": quote(line.name),
+                "quantity": str(line.quantity),
+                "unit_price": money(line.unit_price),
+                "line_total": money(line.line_total),
+            }
+        )
+        for line in receipt.lines
+    )
+    total = money(receipt.total)
+    return template(f"{kind}_receipt").render(
+        {
+            "pharmacy": quote(pharmacy),
+            "code": quote(receipt.code),
+            "sold_at": receipt.sold_at.strftime("%Y-%m-%d %H:%M UTC"),
+            "seller": quote(receipt.seller or "Unknown"),
+            "customer": quote(receipt.customer or "Walk-in customer"),
+            "lines": lines,
+            "total": total,
+            "total_line": f"{'TOTAL':<10}{total:>30}",
+        }
+    )
+
+
+def document(receipts: Iterable[Receipt], kind: str, pharmacy: str, title: str) -> Iterator[str]:
+    """Yield one printable document, a receipt at a time, so large reprints stream."""
+    quote = escape if kind == "html" else str
+    yield template(f"{kind}_head").render({"title": quote(title)})
+    for receipt in receipts:
+        yield render(receipt, kind, pharmacy)
+    yield template(f"{kind}_tail").render({})
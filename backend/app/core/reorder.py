@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+SERVICE_LEVEL_Z = 1.65
+
+
+@dataclass(frozen=True)
+class ReorderPolicy:
+    window_days: int = 28
+    lead_time_days: int = 7
+    cover_days: int = 14
+    service_level_z: float = SERVICE_LEVEL_Z
+
+
+def demand_matrix(
+    medicine_ids: np.ndarray,
+    sale_medicine_ids: np.ndarray,
+    sale_days: np.ndarray,
+    sale_quantities: np.ndarray,
+    days: int,
+) -> np.ndarray:
+    rows = np.searchsorted(medicine_ids, sale_medicine_ids)
+    known = (rows < len(medicine_ids)) & (medicine_ids[np.minimum(rows, len(medicine_ids) - 1)] == sale_medicine_ids)
+    known &= (sale_days >= 0) & (sale_days < days)
+    flat = rows[known] * days + sale_days[known]
+    counts = np.bincount(flat, weights=sale_quantities[known], minlength=len(medicine_ids) * days)
+    return counts.reshape(len(medicine_ids), days)
+
+
+def suggest(stock: np.ndarray, demand: np.ndarray, policy: ReorderPolicy) -> dict[str, np.ndarray]:
+    window = demand[:, -policy.window_days :]
+    average = window.mean(axis=1)
+    deviation = window.std(axis=1)
+    safety_stock = policy.service_level_z * deviation * np.sqrt(policy.lead_time_days)
+    reorder_point = average * policy.lead_time_days + safety_stock
+    target = average * (policy.lead_time_days + policy.cover_days) + safety_stock
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_of_cover = np.where(average > 0, stock / average, np.inf)
+    suggested = np.where(stock <= reorder_point, np.ceil(np.maximum(target - stock, 0)), 0).astype(np.int64)
+    return {
+        "average_daily_demand": average,
+        "days_of_cover": days_of_cover,
+        "reorder_point": np.ceil(reorder_point).astype(np.int64),
+        "suggested_qty": suggested,
+    }
@@ -1,17 +1,132 @@
-from sqlalchemy import text
+from datetime import datetime
 
-from app.core.database import engine
+from sqlalchemy import Engine, select, text
+from sqlalchemy.dialects.postgresql import insert
 
+from app.core.config import settings
+from app.core.database import SHARED_TABLES, Base, engine
+from app.core.events import SEQUENCE
+from app.core.http_cache import ensure_version_triggers
+from app.core.partitions import add_months, ensure_partitions, migrate_to_partitioned, schema_lock
+from app.core.supplier_stats import ensure_built
+from app.models.branch import DEFAULT_BRANCH_ID
 
-def ensure_runtime_schema() -> None:
-    with engine.begin() as connection:
+MONEY_COLUMNS = (
+    ("medicines", "unit_price"),
+    ("sales", "total_amount"),
+    ("sale_items", "unit_price"),
+    ("sale_items", "line_total"),
+    ("purchases", "total_amount"),
+    ("purchase_items", "unit_cost"),
+    ("purchase_items", "line_total"),
+)
+
+BRANCH_TABLES = ("medicines", "sales", "purchases", "users")
+SYNC_BATCH = 1_000
+
+
+def ensure_runtime_schema(bind: Engine = engine) -> None:
+    with bind.begin() as connection:
+        # Workers starting together would otherwise race between their existence checks and the DDL below.
+        schema_lock(connection)
+        Base.metadata.create_all(bind=connection)
         connection.execute(text("ALTER TABLE sales ADD COLUMN IF NOT EXISTS user_id INTEGER"))
+        connection.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE}"))
+        migrate_to_partitioned(connection)
+        # Sales written outside the API (imports, generated data) get their id -> sold_at entries here.
+        connection.execute(
+            text(
+                "INSERT INTO sale_keys (sale_id, sold_at) SELECT id, sold_at FROM sales "
+                "WHERE id > (SELECT COALESCE(MAX(sale_id), 0) FROM sale_keys) ON CONFLICT DO NOTHING"
+            )
+        )
+        connection.execute(
+            text("INSERT INTO branches (id, name) VALUES (:id, :name) ON CONFLICT DO NOTHING"),
+            {"id": DEFAULT_BRANCH_ID, "name": settings.default_branch_name},
+        )
+        connection.execute(
+            text("SELECT setval(pg_get_serial_sequence('branches', 'id'), (SELECT max(id) FROM branches))")
+        )
+        for table in BRANCH_TABLES:
+            # A constant default is stored in the catalog, so existing rows join the default branch without a rewrite.
+            connection.execute(
+                text(
+                    f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS branch_id INTEGER NOT NULL "
+                    f"DEFAULT {DEFAULT_BRANCH_ID} REFERENCES branches(id)"
+                )
+            )
+        connection.execute(text("ALTER TABLE medicines DROP CONSTRAINT IF EXISTS medicines_name_key"))
         connection.execute(
             text(
                 "DO $$ BEGIN "
-                "IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'fk_sales_user_id') THEN "
+                "IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_medicines_branch_id_name') THEN "
+                "ALTER TABLE medicines ADD CONSTRAINT uq_medicines_branch_id_name UNIQUE (branch_id, name); "
+                "END IF; "
+                "END $$;"
+            )
+        )
+        connection.execute(text("ALTER TABLE medicines ADD COLUMN IF NOT EXISTS barcode VARCHAR(64)"))
+        connection.execute(
+            text(
+                "DO $$ BEGIN "
+                "IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_medicines_branch_id_barcode') THEN "
+                "ALTER TABLE medicines ADD CONSTRAINT uq_medicines_branch_id_barcode UNIQUE (branch_id, barcode); "
+                "END IF; "
+                "END $$;"
+            )
+        )
+        connection.execute(
+            text(
+                "DO $$ BEGIN "
+                "IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = 'sales'::regclass "
+                "AND confrelid = 'users'::regclass AND contype = 'f') THEN "
                 "ALTER TABLE sales ADD CONSTRAINT fk_sales_user_id FOREIGN KEY(user_id) REFERENCES users(id); "
                 "END IF; "
                 "END $$;"
             )
         )
+        for table, column in MONEY_COLUMNS:
+            data_type = connection.scalar(
+                text(
+                    "SELECT data_type FROM information_schema.columns "
+                    "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"
+                ),
+                {"table": table, "column": column},
+            )
+            if data_type == "double precision":
+                connection.execute(
+                    text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE NUMERIC(12, 2) USING round({column}::numeric, 2)")
+                )
+        connection.execute(text("ALTER TABLE medicine_forecasts DROP COLUMN IF EXISTS last_sale_item_id"))
+        # Medicines that predate price history get their current price as an opening entry.
+        connection.execute(
+            text(
+                "INSERT INTO medicine_prices (medicine_id, unit_price, effective_from, created_at) "
+                "SELECT m.id, m.unit_price, '1970-01-01', now() FROM medicines m "
+                "WHERE NOT EXISTS (SELECT 1 FROM medicine_prices p WHERE p.medicine_id = m.id)"
+            )
+        )
+        ensure_built(connection)
+        today = datetime.utcnow().date()
+        ensure_partitions(connection, today, add_months(today, settings.sales_partition_months_ahead))
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        ensure_version_triggers(connection)
+
+
+def sync_shared_tables(shard: Engine) -> None:
+    """Copy the primary's branches, users and suppliers onto ``shard``, including rows written outside the ORM."""
+    with engine.connect() as source, shard.begin() as target:
+        schema_lock(target)
+        for name in SHARED_TABLES:
+            table = Base.metadata.tables[name]
+            rows = [dict(row) for row in source.execute(select(table).order_by(*table.primary_key)).mappings()]
+            for start in range(0, len(rows), SYNC_BATCH):
+                statement = insert(table).values(rows[start : start + SYNC_BATCH])
+                target.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=list(table.primary_key),
+                        set_={column.name: statement.excluded[column.name] for column in table.columns},
+                    )
+                )
@@ -0,0 +1,132 @@
+import threading
+from collections import Counter
+
+from sqlalchemy import Engine, bindparam, event, func, or_, select, true
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+from app.core.database import engine, read_engine, shard_engines
+from app.models.medicine import Medicine
+from app.models.medicine_price import MedicinePrice
+from app.models.sale_key import SaleKey
+from app.models.supplier import Supplier
+from app.models.user import User
+
+# Hot-path statements are built once at import and run with bound parameters. Requests then skip building
+# the construct, and the engine finds its compiled SQL under a cache key it has already seen.
+
+USER_COLUMNS = ("id", "username", "name", "email", "role", "branch_id", "active", "created_at")
+
+USER_STATE = select(*(User.__table__.c[column] for column in USER_COLUMNS)).where(User.id == bindparam("user_id"))
+USER_BY_LOGIN = select(User).where(or_(User.username == bindparam("login"), User.email == bindparam("login"))).limit(1)
+
+MEDICINE_ID_BY_NAME = select(Medicine.id).where(
+    Medicine.branch_id == bindparam("branch_id"), Medicine.name == bindparam("name")
+)
+MEDICINE_ID_BY_BARCODE = select(Medicine.id).where(
+    Medicine.branch_id == bindparam("branch_id"), Medicine.barcode == bindparam("barcode")
+)
+MEDICINE_CONFLICT = (
+    select(Medicine.id)
+    .where(
+        Medicine.branch_id == bindparam("branch_id"),
+        or_(Medicine.name == bindparam("name"), Medicine.batch_number == bindparam("batch_number")),
+        Medicine.id != bindparam("medicine_id"),
+    )
+    .limit(1)
+)
+MEDICINE_BARCODE_CONFLICT = (
+    select(Medicine.id)
+    .where(
+        Medicine.branch_id == bindparam("branch_id"),
+        Medicine.barcode == bindparam("barcode"),
+        Medicine.id != bindparam("medicine_id"),
+    )
+    .limit(1)
+)
+MEDICINES_BY_IDS = (
+    select(Medicine)
+    .where(Medicine.branch_id == bindparam("branch_id"), Medicine.id.in_(bindparam("ids", expanding=True)))
+    .order_by(Medicine.id)
+)
+# Rows are locked in id order so concurrent writers touching overlapping medicines cannot deadlock.
+MEDICINES_BY_IDS_FOR_UPDATE = MEDICINES_BY_IDS.with_for_update()
+
+_price_at = (
+    select(MedicinePrice.unit_price, MedicinePrice.effective_from)
+    .where(MedicinePrice.medicine_id == Medicine.id, MedicinePrice.effective_from <= bindparam("at"))
+    .order_by(MedicinePrice.effective_from.desc())
+    .limit(1)
+    .lateral("price_at")
+)
+_next_change = (
+    select(func.min(MedicinePrice.effective_from))
+    .where(MedicinePrice.medicine_id == Medicine.id, MedicinePrice.effective_from > bindparam("at"))
+    .scalar_subquery()
+)
+# Price in force at :at for each medicine, with the window it holds for; medicines without history fall back to
+# their unit_price.
+EFFECTIVE_PRICES = (
+    select(
+        Medicine.id,
+        func.coalesce(_price_at.c.unit_price, Medicine.unit_price).label("unit_price"),
+        _price_at.c.effective_from.label("valid_from"),
+        _next_change.label("valid_until"),
+    )
+    .outerjoin(_price_at, true())
+    .where(Medicine.branch_id == bindparam("branch_id"), Medicine.id.in_(bindparam("ids", expanding=True)))
+)
+
+SALE_SOLD_AT = select(SaleKey.sold_at).where(SaleKey.sale_id == bindparam("sale_id"))
+
+SUPPLIER_ID_BY_NAME = select(Supplier.id).where(Supplier.name == bindparam("name"))
+SUPPLIER_CONFLICT = (
+    select(Supplier.id).where(Supplier.name == bindparam("name"), Supplier.id != bindparam("supplier_id")).limit(1)
+)
+
+
+class CompileStats:
+    """Counts compiled-cache hits and misses for every statement each tracked engine executes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._binds: dict[str, Engine] = {}
+        self.counts: dict[str, Counter[str]] = {}
+
+    def track(self, name: str, bind: Engine) -> None:
+        counts = self.counts[name] = Counter()
+        self._binds[name] = bind
+
+        # Request threads execute concurrently, and Counter increments are not atomic.
+        def record(conn, cursor, statement, parameters, context, executemany) -> None:
+            if context is None or not hasattr(context, "cache_hit"):
+                return
+            outcome = {CACHE_HIT: "hits", CACHE_MISS: "misses"}.get(context.cache_hit, "uncached")
+            with self._lock:
+                counts[outcome] += 1
+
+        event.listen(bind, "after_cursor_execute", record)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            counts = {name: dict(values) for name, values in self.counts.items()}
+        result = {}
+        for name, bind in self._binds.items():
+            hits, misses = counts[name].get("hits", 0), counts[name].get("misses", 0)
+            compiled_cache = bind._compiled_cache
+            result[name] = {
+                "hits": hits,
+                "misses": misses,
+                "uncached": counts[name].get("uncached", 0),
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+                "cache_entries": len(compiled_cache) if compiled_cache is not None else 0,
+                "cache_size": compiled_cache.capacity if compiled_cache is not None else 0,
+            }
+        return result
+
+
+stats = CompileStats()
+stats.track("primary", engine)
+if read_engine is not None:
+    stats.track("replica", read_engine)
+for _index, _bind in enumerate(shard_engines):
+    stats.track(f"shard{_index}", _bind)
@@ -0,0 +1,136 @@
+import argparse
+from collections import defaultdict
+from collections.abc import Iterable
+
+from sqlalchemy import Connection, Date, cast, delete, exists, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.database import engine, shard_engines
+from app.core.money import from_cents, to_cents
+from app.core.partitions import month_start
+from app.models import MedicineSalesMonth, Purchase, PurchaseItem, Sale, SaleItem, SupplierPurchaseMonth
+
+# Summaries are changed by deltas inside the writing transaction, so they are exact as soon as the write commits
+# and a request only touches the handful of (medicine, month) rows it affects.
+
+
+def add_purchases(db: Session, purchases: Iterable[Purchase], sign: int = 1) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) flushed purchases from ``supplier_purchase_months``."""
+    totals = defaultdict(lambda: [0, 0, 0])
+    for purchase in purchases:
+        if purchase.supplier_id is None:
+            continue
+        month = month_start(purchase.purchased_at.date())
+        for item in purchase.items:
+            row = totals[(purchase.branch_id, purchase.supplier_id, item.medicine_id, month)]
+            row[0] += sign
+            row[1] += sign * item.quantity
+            row[2] += sign * to_cents(item.line_total)
+    _apply(
+        db,
+        SupplierPurchaseMonth,
+        [
+            {
+                "branch_id": branch_id,
+                "supplier_id": supplier_id,
+                "medicine_id": medicine_id,
+                "month": month,
+                "lines": lines,
+                "quantity": quantity,
+                "spend": from_cents(spend),
+            }
+            for (branch_id, supplier_id, medicine_id, month), (lines, quantity, spend) in sorted(totals.items())
+        ],
+        ("lines", "quantity", "spend"),
+    )
+
+
+def add_sales(db: Session, sales: Iterable[Sale], sign: int = 1) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) flushed sales from ``medicine_sales_months``."""
+    totals = defaultdict(lambda: [0, 0])
+    for sale in sales:
+        month = month_start(sale.sold_at.date())
+        for item in sale.items:
+            row = totals[(item.medicine_id, month)]
+            row[0] += sign * item.quantity
+            row[1] += sign * to_cents(item.line_total)
+    _apply(
+        db,
+        MedicineSalesMonth,
+        [
+            {"medicine_id": medicine_id, "month": month, "quantity": quantity, "revenue": from_cents(revenue)}
+            for (medicine_id, month), (quantity, revenue) in sorted(totals.items())
+        ],
+        ("quantity", "revenue"),
+    )
+
+
+def _apply(db: Session, model, rows: list[dict], columns: tuple[str, ...]) -> None:
+    if not rows:
+        return
+    # Rows arrive sorted by key, so concurrent writers lock shared summary rows in the same order.
+    statement = insert(model).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[column.name for column in model.__table__.primary_key],
+            set_={column: getattr(model, column) + statement.excluded[column] for column in columns},
+        )
+    )
+
+
+def rebuild(connection: Connection) -> None:
+    """Recompute both summaries from the purchase and sale history on ``connection``'s database."""
+    # Writers queue behind this lock and apply their deltas once the rebuilt rows are committed.
+    connection.execute(
+        text("LOCK TABLE supplier_purchase_months, medicine_sales_months IN SHARE ROW EXCLUSIVE MODE")
+    )
+    connection.execute(delete(SupplierPurchaseMonth))
+    connection.execute(delete(MedicineSalesMonth))
+
+    purchase_month = cast(func.date_trunc("month", Purchase.purchased_at), Date)
+    connection.execute(
+        insert(SupplierPurchaseMonth).from_select(
+            ["branch_id", "supplier_id", "medicine_id", "month", "lines", "quantity", "spend"],
+            select(
+                Purchase.branch_id,
+                Purchase.supplier_id,
+                PurchaseItem.medicine_id,
+                purchase_month,
+                func.count(),
+                func.sum(PurchaseItem.quantity),
+                func.sum(PurchaseItem.line_total),
+            )
+            .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+            .where(Purchase.supplier_id.is_not(None))
+            .group_by(Purchase.branch_id, Purchase.supplier_id, PurchaseItem.medicine_id, purchase_month),
+        )
+    )
+    sale_month = cast(func.date_trunc("month", SaleItem.sold_at), Date)
+    connection.execute(
+        insert(MedicineSalesMonth).from_select(
+            ["medicine_id", "month", "quantity", "revenue"],
+            select(SaleItem.medicine_id, sale_month, func.sum(SaleItem.quantity), func.sum(SaleItem.line_total))
+            .group_by(SaleItem.medicine_id, sale_month),
+        )
+    )
+
+
+def ensure_built(connection: Connection) -> None:
+    if not connection.scalar(select(exists().select_from(MedicineSalesMonth))) and not connection.scalar(
+        select(exists().select_from(SupplierPurchaseMonth))
+    ):
+        rebuild(connection)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the supplier and sales monthly summaries from history.")
+    parser.parse_args()
+    for bind in (engine, *shard_engines):
+        with bind.begin() as connection:
+            rebuild(connection)
+    print("Rebuilt supplier_purchase_months and medicine_sales_months")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import Date, Integer, any_, bindparam, cast, exists, func, select, union
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
+from app.core.config import settings
+from app.core.database import engine, shard_engines
+from app.core.forecasting import fit
+from app.core.reorder import demand_matrix
+from app.models import Medicine, MedicineForecast, SaleItem
+
+logger = logging.getLogger(__name__)
+
+UPSERT_BATCH = 1_000
+
+
+def stale_medicine_ids(connection, full: bool) -> list[int]:
+    if full:
+        return connection.scalars(select(Medicine.id).order_by(Medicine.id)).all()
+    unfitted = select(Medicine.id).where(~exists().where(MedicineForecast.medicine_id == Medicine.id))
+    last_run = connection.scalar(select(func.max(MedicineForecast.fitted_at)))
+    if last_run is None:
+        return sorted(connection.scalars(unfitted).all())
+    # Sale item ids are drawn before commit, so a sale committing late can land below an id watermark. sold_at
+    # is stamped in the same transaction, so re-reading a commit lag's worth before the last run catches it.
+    since = last_run - timedelta(seconds=settings.forecast_commit_lag_seconds)
+    changed = select(SaleItem.medicine_id).where(SaleItem.sold_at > since)
+    return sorted(connection.scalars(union(unfitted, changed)).all())
+
+
+def load_history(connection, medicine_ids: list[int], start: date, days: int) -> np.ndarray:
+    day = (cast(SaleItem.sold_at, Date) - start).label("day")
+    rows = connection.execute(
+        select(SaleItem.medicine_id, day, func.sum(SaleItem.quantity))
+        .where(
+            SaleItem.sold_at >= datetime.combine(start, datetime.min.time()),
+            SaleItem.medicine_id == any_(bindparam("medicine_ids", medicine_ids, type_=ARRAY(Integer))),
+        )
+        .group_by(SaleItem.medicine_id, day)
+    ).all()
+    sales = np.asarray(rows, dtype=np.int64).reshape(-1, 3)
+    return demand_matrix(np.asarray(medicine_ids, dtype=np.int64), sales[:, 0], sales[:, 1], sales[:, 2], days)
+
+
+def run(full: bool = False, workers: int | None = None) -> int:
+    # Every shard holds its own branches' medicines, sales and forecasts.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(run_bind(bind, pool, full) for bind in (engine, *shard_engines))
+
+
+def run_bind(bind, pool: ProcessPoolExecutor, full: bool = False) -> int:
+    history_days = settings.forecast_history_days
+    horizon = settings.forecast_horizon_days
+    start = date.today() - timedelta(days=history_days)
+    # Taken before the read, so the next run's window covers every sale this snapshot could have missed.
+    fitted_at = datetime.utcnow()
+
+    with bind.connect() as connection:
+        medicine_ids = stale_medicine_ids(connection, full)
+        if not medicine_ids:
+            return 0
+        history = load_history(connection, medicine_ids, start, history_days)
+
+    chunk = settings.forecast_chunk_size
+    bounds = range(0, len(medicine_ids), chunk)
+    futures = [pool.submit(fit, history[offset : offset + chunk], horizon) for offset in bounds]
+    results = [future.result() for future in futures]
+
+    rows = []
+    for offset, result in zip(bounds, results):
+        for index in range(len(result["level"])):
+            rows.append(
+                {
+                    "medicine_id": medicine_ids[offset + index],
+                    "fitted_at": fitted_at,
+                    "history_days": history_days,
+                    "level": float(result["level"][index]),
+                    "trend": float(result["trend"][index]),
+                    "seasonal": result["seasonal"][index].round(4).tolist(),
+                    "rmse": float(result["rmse"][index]),
+                    "daily_forecast": result["forecast"][index].round(3).tolist(),
+                }
+            )
+
+    with bind.begin() as connection:
+        for offset in range(0, len(rows), UPSERT_BATCH):
+            statement = insert(MedicineForecast).values(rows[offset : offset + UPSERT_BATCH])
+            connection.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[MedicineForecast.medicine_id],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in (
+                            "fitted_at",
+                            "history_days",
+                            "level",
+                            "trend",
+                            "seasonal",
+                            "rmse",
+                            "daily_forecast",
+                        )
+                    },
+                )
+            )
+    logger.info("Fitted demand forecasts for %s medicines", len(rows))
+    return len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit demand forecasts for medicines with new sales.")
+    parser.add_argument("--full", action="store_true", help="refit the whole catalog")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    print(f"Fitted {run(full=args.full, workers=args.workers)} medicines")
+
+
+if __name__ == "__main__":
+    main()
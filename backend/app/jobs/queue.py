@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import Connection, case, select, update
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import ReportJob
+
+
+def claim(connection: Connection, worker_id: str):
+    # SKIP LOCKED lets any number of workers poll the same table without blocking each other.
+    next_job = (
+        select(ReportJob.id)
+        .where(ReportJob.status == "queued")
+        .order_by(ReportJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    now = datetime.utcnow()
+    return connection.execute(
+        update(ReportJob)
+        .where(ReportJob.id == next_job)
+        .values(
+            status="running",
+            progress=0,
+            attempts=ReportJob.attempts + 1,
+            started_at=now,
+            heartbeat_at=now,
+            locked_by=worker_id,
+        )
+        .returning(ReportJob.id, ReportJob.kind, ReportJob.params)
+    ).first()
+
+
+def report_progress(job_id: int, worker_id: str, progress: int) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job_id, ReportJob.locked_by == worker_id, ReportJob.status == "running")
+            .values(progress=progress, heartbeat_at=datetime.utcnow())
+        )
+
+
+def heartbeat(job_id: int, worker_id: str) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job_id, ReportJob.locked_by == worker_id, ReportJob.status == "running")
+            .values(heartbeat_at=datetime.utcnow())
+        )
+
+
+def release(worker_prefix: str) -> int:
+    """Put the running jobs of workers named ``worker_prefix:*`` back in the queue without using up an attempt."""
+    with engine.begin() as connection:
+        return connection.execute(
+            update(ReportJob)
+            .where(ReportJob.status == "running", ReportJob.locked_by.startswith(f"{worker_prefix}:"))
+            .values(status="queued", attempts=ReportJob.attempts - 1, locked_by=None)
+        ).rowcount
+
+
+def finish(job_id: int, worker_id: str, result: dict | None = None, error: str | None = None) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job_id, ReportJob.locked_by == worker_id)
+            .values(
+                status="failed" if error else "done",
+                progress=ReportJob.progress if error else 100,
+                result=result,
+                error=error,
+                finished_at=datetime.utcnow(),
+            )
+        )
+
+
+def requeue_stale() -> int:
+    # Jobs whose worker stopped heartbeating are retried until they run out of attempts.
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.report_job_timeout_seconds)
+    exhausted = ReportJob.attempts >= settings.report_max_attempts
+    with engine.begin() as connection:
+        return connection.execute(
+            update(ReportJob)
+            .where(ReportJob.status == "running", ReportJob.heartbeat_at < cutoff)
+            .values(
+                status=case((exhausted, "failed"), else_="queued"),
+                error=case((exhausted, "Worker stopped responding"), else_=None),
+                finished_at=case((exhausted, datetime.utcnow()), else_=None),
+                locked_by=None,
+            )
+        ).rowcount
@@ -0,0 +1,149 @@
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Connection, cast, func, select
+
+from app.core.partitions import add_months, month_start
+from app.models import Medicine, Purchase, PurchaseItem, Sale, Supplier
+from app.schemas.report import SalesByPeriodParams, StockValuationParams, SupplierPurchasesParams
+
+VALUATION_BATCH = 5_000
+
+Progress = Callable[[int], None]
+
+
+def _value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _rows(rows) -> list[list]:
+    return [[_value(value) for value in row] for row in rows]
+
+
+def _window(connection: Connection, column, branch, params) -> tuple[datetime, datetime] | None:
+    first, last = connection.execute(select(func.min(column), func.max(column)).where(branch == params.branch_id)).one()
+    if first is None:
+        return None
+    start = datetime.combine(params.date_from, datetime.min.time()) if params.date_from else first
+    end = datetime.combine(params.date_to, datetime.min.time()) if params.date_to else last + timedelta(microseconds=1)
+    return start, end
+
+
+def sales_by_period(connection: Connection, params: SalesByPeriodParams, progress: Progress) -> dict:
+    columns = ["period", "sales", "revenue"]
+    window = _window(connection, Sale.sold_at, Sale.branch_id, params)
+    if window is None:
+        return {"columns": columns, "rows": []}
+    start, end = window
+
+    # One month per query keeps each scan inside a single sales partition and gives real progress.
+    # Weeks straddling a month boundary come back twice and are merged below.
+    months = []
+    month = month_start(start.date())
+    while datetime.combine(month, datetime.min.time()) < end:
+        months.append(month)
+        month = add_months(month, 1)
+
+    bucket = func.date_trunc(params.period, Sale.sold_at).label("period")
+    totals: dict[datetime, list] = {}
+    for index, month in enumerate(months, start=1):
+        lower = max(start, datetime.combine(month, datetime.min.time()))
+        upper = min(end, datetime.combine(add_months(month, 1), datetime.min.time()))
+        rows = connection.execute(
+            select(bucket, func.count(Sale.id), func.sum(Sale.total_amount))
+            .where(Sale.branch_id == params.branch_id, Sale.sold_at >= lower, Sale.sold_at < upper)
+            .group_by(bucket)
+        ).all()
+        for period, count, revenue in rows:
+            current = totals.setdefault(period, [period, 0, Decimal(0)])
+            current[1] += count
+            current[2] += revenue
+        progress(index * 100 // len(months))
+    return {"columns": columns, "rows": _rows(sorted(totals.values()))}
+
+
+def supplier_purchases(connection: Connection, params: SupplierPurchasesParams, progress: Progress) -> dict:
+    columns = ["supplier_id", "supplier", "purchases", "units", "total_amount", "first_purchase", "last_purchase"]
+    window = _window(connection, Purchase.purchased_at, Purchase.branch_id, params)
+    if window is None:
+        return {"columns": columns, "rows": []}
+    start, end = window
+
+    units = (
+        select(PurchaseItem.purchase_id, func.sum(PurchaseItem.quantity).label("units"))
+        .group_by(PurchaseItem.purchase_id)
+        .subquery()
+    )
+    rows = connection.execute(
+        select(
+            Purchase.supplier_id,
+            func.coalesce(Supplier.name, "Unassigned"),
+            func.count(Purchase.id),
+            cast(func.coalesce(func.sum(units.c.units), 0), BigInteger),
+            func.sum(Purchase.total_amount),
+            func.min(Purchase.purchased_at),
+            func.max(Purchase.purchased_at),
+        )
+        .outerjoin(Supplier, Supplier.id == Purchase.supplier_id)
+        .outerjoin(units, units.c.purchase_id == Purchase.id)
+        .where(Purchase.branch_id == params.branch_id, Purchase.purchased_at >= start, Purchase.purchased_at < end)
+        .group_by(Purchase.supplier_id, Supplier.name)
+        .order_by(func.sum(Purchase.total_amount).desc())
+    ).all()
+    progress(100)
+    return {"columns": columns, "rows": _rows(rows)}
+
+
+def stock_valuation(connection: Connection, params: StockValuationParams, progress: Progress) -> dict:
+    columns = ["medicine_id", "name", "supplier", "stock_qty", "unit_price", "retail_value", "last_cost", "cost_value"]
+    last_cost = (
+        select(PurchaseItem.unit_cost)
+        .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+        .where(PurchaseItem.medicine_id == Medicine.id)
+        .order_by(Purchase.purchased_at.desc())
+        .limit(1)
+        .correlate(Medicine)
+        .scalar_subquery()
+    )
+    filters = [Medicine.branch_id == params.branch_id]
+    if params.supplier_id is not None:
+        filters.append(Medicine.supplier_id == params.supplier_id)
+    total = connection.scalar(select(func.count(Medicine.id)).where(*filters)) or 0
+
+    rows, last_id = [], 0
+    while True:
+        batch = connection.execute(
+            select(
+                Medicine.id,
+                Medicine.name,
+                func.coalesce(Supplier.name, "Unassigned"),
+                Medicine.stock_qty,
+                Medicine.unit_price,
+                last_cost,
+            )
+            .outerjoin(Supplier, Supplier.id == Medicine.supplier_id)
+            .where(Medicine.id > last_id, *filters)
+            .order_by(Medicine.id)
+            .limit(VALUATION_BATCH)
+        ).all()
+        if not batch:
+            break
+        for medicine_id, name, supplier, stock_qty, unit_price, cost in batch:
+            cost_value = stock_qty * cost if cost is not None else None
+            rows.append([medicine_id, name, supplier, stock_qty, unit_price, stock_qty * unit_price, cost, cost_value])
+        last_id = batch[-1][0]
+        progress(min(99, len(rows) * 100 // max(total, 1)))
+    progress(100)
+    return {"columns": columns, "rows": _rows(rows)}
+
+
+REPORTS = {
+    "sales_by_period": (SalesByPeriodParams, sales_by_period),
+    "supplier_purchases": (SupplierPurchasesParams, supplier_purchases),
+    "stock_valuation": (StockValuationParams, stock_valuation),
+}
@@ -1,28 +1,66 @@
-﻿from fastapi import FastAPI
+﻿from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api import auth, dashboard, medicines, purchases, sales, suppliers, users
+from app.api import (
+    audit,
+    auth,
+    branches,
+    dashboard,
+    events,
+    inventory,
+    medicines,
+    purchases,
+    reports,
+    routes,
+    sales,
+    suppliers,
+    system,
+    users,
+)
+from app.core import audit as audit_log
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.database import Base, engine
-from app.core.schema_sync import ensure_runtime_schema
-from app.core.seed import ensure_default_admin
+from app.core.database import mark_write
+from app.core.lifecycle import database_available, is_ready, start_bootstrap
+from app.core.ratelimit import RateLimitMiddleware
 
 app = FastAPI(title=settings.app_name)
 
+# Added before CORS so that 429 and 503 responses still carry CORS headers.
+app.add_middleware(
+    RateLimitMiddleware,
+    max_in_flight=settings.shed_max_in_flight,
+    reserved=settings.shed_reserved_in_flight,
+    retry_after=settings.shed_retry_after_seconds,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[origin.strip() for origin in settings.allowed_origins.split(",")],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Retry-After"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+
+@app.middleware("http")
+async def track_writers(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in {"GET", "HEAD", "OPTIONS"} and response.status_code < 400:
+        mark_write(request.headers.get("X-User-Id"))
+    return response
 
 
 @app.on_event("startup")
 def startup() -> None:
-    Base.metadata.create_all(bind=engine)
-    ensure_runtime_schema()
-    ensure_default_admin()
+    start_bootstrap()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    audit_log.writer.stop()
 
 
 @app.get("/health")
@@ -30,10 +68,32 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/live")
+def liveness_check():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+def readiness_check():
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    if not database_available():
+        return JSONResponse(status_code=503, content={"status": "database unavailable"})
+    return {"status": "ready"}
+
+
 app.include_router(medicines.router, prefix="/api")
 app.include_router(suppliers.router, prefix="/api")
 app.include_router(sales.router, prefix="/api")
 app.include_router(purchases.router, prefix="/api")
 app.include_router(dashboard.router, prefix="/api")
+app.include_router(inventory.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
+app.include_router(reports.router, prefix="/api")
+app.include_router(system.router, prefix="/api")
+app.include_router(branches.router, prefix="/api")
+app.include_router(audit.router, prefix="/api")
+if settings.legacy_routes_enabled:
+    app.include_router(routes.router, prefix="/api")
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -1,10 +1,19 @@
 ﻿from app.core.database import Base
+from app.models.audit_log import AuditLog
+from app.models.branch import Branch
 from app.models.medicine import Medicine
+from app.models.medicine_price import MedicinePrice
 from app.models.supplier import Supplier
 from app.models.sale import Sale
 from app.models.sale_item import SaleItem
+from app.models.sale_key import SaleKey
 from app.models.purchase import Purchase
 from app.models.purchase_item import PurchaseItem
 from app.models.user import User
+from app.models.forecast import MedicineForecast
+from app.models.supplier_purchase_month import SupplierPurchaseMonth
+from app.models.medicine_sales_month import MedicineSalesMonth
+from app.models.report_job import ReportJob
+from app.models.table_version import TableVersion
 
-__all__ = ["Base", "Medicine", "Supplier", "Sale", "SaleItem", "Purchase", "PurchaseItem", "User"]
+__all__ = ["Base", "AuditLog", "Branch", "Medicine", "MedicinePrice", "Supplier", "Sale", "SaleItem", "SaleKey", "Purchase", "PurchaseItem", "User", "MedicineForecast", "SupplierPurchaseMonth", "MedicineSalesMonth", "ReportJob", "TableVersion"]
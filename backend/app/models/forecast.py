@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+
+
+class MedicineForecast(Base):
+    __tablename__ = "medicine_forecasts"
+
+    medicine_id: Mapped[int] = mapped_column(ForeignKey("medicines.id", ondelete="CASCADE"), primary_key=True)
+    fitted_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    history_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    level: Mapped[float] = mapped_column(Float, nullable=False)
+    trend: Mapped[float] = mapped_column(Float, nullable=False)
+    seasonal: Mapped[list[float]] = mapped_column(ARRAY(Float), nullable=False)
+    rmse: Mapped[float] = mapped_column(Float, nullable=False)
+    daily_forecast: Mapped[list[float]] = mapped_column(ARRAY(Float), nullable=False)
+
+    medicine = relationship("Medicine")
@@ -1,6 +1,7 @@
 ﻿from datetime import date
+from decimal import Decimal
 
-from sqlalchemy import Date, Float, ForeignKey, Integer, String
+from sqlalchemy import Date, ForeignKey, Index, Integer, Numeric, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -8,15 +9,22 @@ from app.core.database import Base
 
 class Medicine(Base):
     __tablename__ = "medicines"
+    __table_args__ = (
+        UniqueConstraint("branch_id", "name", name="uq_medicines_branch_id_name"),
+        UniqueConstraint("branch_id", "barcode", name="uq_medicines_branch_id_barcode"),
+        Index("ix_medicines_branch_id_supplier_id", "branch_id", "supplier_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    name: Mapped[str] = mapped_column(String(150), nullable=False, unique=True)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=False, server_default="1")
+    name: Mapped[str] = mapped_column(String(150), nullable=False)
     generic_name: Mapped[str | None] = mapped_column(String(150), nullable=True)
     batch_number: Mapped[str] = mapped_column(String(60), nullable=False)
+    barcode: Mapped[str | None] = mapped_column(String(64), nullable=True)
     expiry_date: Mapped[date] = mapped_column(Date, nullable=False)
-    unit_price: Mapped[float] = mapped_column(Float, nullable=False)
+    unit_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     stock_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
-    supplier_id: Mapped[int | None] = mapped_column(ForeignKey("suppliers.id"), nullable=True)
+    supplier_id: Mapped[int | None] = mapped_column(ForeignKey("suppliers.id"), nullable=True, index=True)
 
     supplier = relationship("Supplier", back_populates="medicines")
     sale_items = relationship("SaleItem", back_populates="medicine")
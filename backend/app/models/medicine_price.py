@@ -0,0 +1,24 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, Numeric, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class MedicinePrice(Base):
+    __tablename__ = "medicine_prices"
+    # The unique index on (medicine_id, effective_from) also answers "price at time T" with one backward scan.
+    __table_args__ = (
+        UniqueConstraint("medicine_id", "effective_from", name="uq_medicine_prices_medicine_id_effective_from"),
+        # Lets the scheduled-price refresh read only the prices that came into force since its last run.
+        Index("ix_medicine_prices_effective_from", "effective_from"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    medicine_id: Mapped[int] = mapped_column(ForeignKey("medicines.id", ondelete="CASCADE"), nullable=False)
+    unit_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    effective_from: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    created_by: Mapped[int | None] = mapped_column(Integer, nullable=True)
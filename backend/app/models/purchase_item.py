@@ -1,4 +1,6 @@
-from sqlalchemy import Float, ForeignKey, Integer
+from decimal import Decimal
+
+from sqlalchemy import ForeignKey, Index, Integer, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -6,13 +8,14 @@ from app.core.database import Base
 
 class PurchaseItem(Base):
     __tablename__ = "purchase_items"
+    __table_args__ = (Index("ix_purchase_items_medicine_id_purchase_id", "medicine_id", "purchase_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    purchase_id: Mapped[int] = mapped_column(ForeignKey("purchases.id"), nullable=False)
+    purchase_id: Mapped[int] = mapped_column(ForeignKey("purchases.id"), nullable=False, index=True)
     medicine_id: Mapped[int] = mapped_column(ForeignKey("medicines.id"), nullable=False)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
-    unit_cost: Mapped[float] = mapped_column(Float, nullable=False)
-    line_total: Mapped[float] = mapped_column(Float, nullable=False)
+    unit_cost: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    line_total: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
 
     purchase = relationship("Purchase", back_populates="items")
     medicine = relationship("Medicine")
@@ -1,6 +1,7 @@
 from datetime import datetime
+from decimal import Decimal
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -8,12 +9,17 @@ from app.core.database import Base
 
 class Sale(Base):
     __tablename__ = "sales"
-
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    sold_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    __table_args__ = (
+        Index("ix_sales_branch_id_sold_at", "branch_id", "sold_at"),
+        {"postgresql_partition_by": "RANGE (sold_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, index=True)
+    sold_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow, nullable=False, index=True)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=False, server_default="1")
     customer_name: Mapped[str | None] = mapped_column(String(120), nullable=True)
     user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
-    total_amount: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    total_amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False, default=0)
 
     seller = relationship("User", back_populates="sales")
     items = relationship("SaleItem", back_populates="sale", cascade="all, delete-orphan")
@@ -28,6 +34,10 @@ class Sale(Base):
 
     @property
     def sale_code(self) -> str:
-        stamp = (self.sold_at or datetime.utcnow()).strftime("%m%d%Y")
-        sequence = max((self.id or 1) - 1, 0)
-        return f"{sequence:02d}{stamp}"
+        return sale_code(self.id, self.sold_at)
+
+
+def sale_code(sale_id: int | None, sold_at: datetime | None) -> str:
+    stamp = (sold_at or datetime.utcnow()).strftime("%m%d%Y")
+    sequence = max((sale_id or 1) - 1, 0)
+    return f"{sequence:02d}{stamp}"
@@ -1,4 +1,7 @@
-﻿from sqlalchemy import Float, ForeignKey, Integer
+﻿from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, ForeignKeyConstraint, Index, Integer, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -6,13 +9,20 @@ from app.core.database import Base
 
 class SaleItem(Base):
     __tablename__ = "sale_items"
+    __table_args__ = (
+        ForeignKeyConstraint(["sale_id", "sold_at"], ["sales.id", "sales.sold_at"]),
+        Index("ix_sale_items_medicine_id_sale_id", "medicine_id", "sale_id"),
+        Index("ix_sale_items_sale_id_sold_at", "sale_id", "sold_at"),
+        {"postgresql_partition_by": "RANGE (sold_at)"},
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    sale_id: Mapped[int] = mapped_column(ForeignKey("sales.id"), nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, index=True)
+    sale_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    sold_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
     medicine_id: Mapped[int] = mapped_column(ForeignKey("medicines.id"), nullable=False)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
-    unit_price: Mapped[float] = mapped_column(Float, nullable=False)
-    line_total: Mapped[float] = mapped_column(Float, nullable=False)
+    unit_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    line_total: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
 
     sale = relationship("Sale", back_populates="items")
     medicine = relationship("Medicine", back_populates="sale_items")
@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class SaleKey(Base):
+    __tablename__ = "sale_keys"
+    # sales is partitioned by sold_at; looking sold_at up here first lets by-id queries touch a single partition.
+
+    sale_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    sold_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
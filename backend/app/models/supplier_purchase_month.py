@@ -0,0 +1,21 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, ForeignKey, Index, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class SupplierPurchaseMonth(Base):
+    __tablename__ = "supplier_purchase_months"
+    # Maintained by app.core.supplier_stats in the same transaction as the purchases it sums.
+    __table_args__ = (Index("ix_supplier_purchase_months_branch_id_month", "branch_id", "month"),)
+
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), primary_key=True)
+    supplier_id: Mapped[int] = mapped_column(ForeignKey("suppliers.id", ondelete="CASCADE"), primary_key=True)
+    medicine_id: Mapped[int] = mapped_column(ForeignKey("medicines.id", ondelete="CASCADE"), primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    lines: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    spend: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
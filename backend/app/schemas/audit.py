@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AuditEntryRead(BaseModel):
+    id: int
+    at: datetime
+    user_id: int | None = None
+    branch_id: int | None = None
+    action: str
+    entity: str
+    entity_id: int | None = None
+    details: Any = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AuditPage(BaseModel):
+    items: list[AuditEntryRead]
+    next_before_id: int | None = None
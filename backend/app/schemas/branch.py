@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BranchBase(BaseModel):
+    name: str = Field(min_length=2, max_length=120)
+    address: str | None = None
+
+
+class BranchCreate(BranchBase):
+    pass
+
+
+class BranchUpdate(BranchBase):
+    pass
+
+
+class BranchRead(BranchBase):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ReorderSuggestion(BaseModel):
+    medicine_id: int
+    name: str
+    stock_qty: int
+    average_daily_demand: float
+    days_of_cover: float | None
+    reorder_point: int
+    suggested_qty: int
+    estimated_cost: float
+
+
+class SupplierReorder(BaseModel):
+    supplier_id: int | None
+    supplier_name: str | None
+    estimated_cost: float
+    items: list[ReorderSuggestion]
+
+
+class MedicineForecastRead(BaseModel):
+    medicine_id: int
+    name: str
+    supplier_id: int | None
+    fitted_at: datetime
+    rmse: float
+    horizon_total: float
+    daily_forecast: list[float]
+
+
+class ReorderSuggestions(BaseModel):
+    generated_at: datetime
+    window_days: int
+    lead_time_days: int
+    cover_days: int
+    suppliers: list[SupplierReorder]
@@ -1,17 +1,25 @@
-﻿from datetime import date
+﻿from datetime import date, datetime, timezone
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class MedicineBase(BaseModel):
     name: str = Field(min_length=2, max_length=150)
     generic_name: str | None = None
     batch_number: str
+    barcode: str | None = Field(default=None, max_length=64)
     expiry_date: date
     unit_price: float = Field(gt=0)
     stock_qty: int = Field(ge=0)
     supplier_id: int | None = None
 
+    @field_validator("barcode")
+    @classmethod
+    def strip_barcode(cls, value: str | None) -> str | None:
+        if value is None:
+            return None
+        return value.strip() or None
+
 
 class MedicineCreate(MedicineBase):
     pass
@@ -25,3 +33,69 @@ class MedicineRead(MedicineBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PriceCreate(BaseModel):
+    unit_price: float = Field(gt=0)
+    effective_from: datetime | None = None
+
+    @field_validator("effective_from")
+    @classmethod
+    def to_utc(cls, value: datetime | None) -> datetime | None:
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class PriceRead(BaseModel):
+    id: int
+    medicine_id: int
+    unit_price: float
+    effective_from: datetime
+    created_at: datetime
+    created_by: int | None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PriceAt(BaseModel):
+    medicine_id: int
+    at: datetime
+    unit_price: float
+
+
+class StockCount(BaseModel):
+    medicine_id: int
+    counted_qty: int = Field(ge=0)
+
+
+class StockTake(BaseModel):
+    counts: list[StockCount] = Field(min_length=1, max_length=20_000)
+    dry_run: bool = False
+
+
+class StockTakeLine(BaseModel):
+    medicine_id: int
+    name: str
+    expected_qty: int
+    counted_qty: int
+    variance: int
+    variance_value: float
+
+
+class StockTakeReport(BaseModel):
+    dry_run: bool
+    counted: int
+    changed: int
+    total_variance: int
+    total_variance_value: float
+    lines: list[StockTakeLine]
+
+
+class BarcodeResolve(BaseModel):
+    codes: list[str] = Field(min_length=1, max_length=500)
+
+
+class BarcodeMatches(BaseModel):
+    items: dict[str, MedicineRead]
+    missing: list[str]
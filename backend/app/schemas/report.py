@@ -0,0 +1,99 @@
+from datetime import date, datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class BranchParams(BaseModel):
+    # Set from the requesting user's branch, never taken from the client.
+    branch_id: int = 1
+
+
+class DateRangeParams(BranchParams):
+    date_from: date | None = None
+    date_to: date | None = None
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.date_from and self.date_to and self.date_from >= self.date_to:
+            raise ValueError("date_from must be before date_to")
+        return self
+
+
+class SalesByPeriodParams(DateRangeParams):
+    period: Literal["day", "week", "month"] = "day"
+
+
+class SupplierPurchasesParams(DateRangeParams):
+    pass
+
+
+class StockValuationParams(BranchParams):
+    supplier_id: int | None = None
+
+
+class ReportJobCreate(BaseModel):
+    kind: Literal["sales_by_period", "supplier_purchases", "stock_valuation"]
+    params: dict = Field(default_factory=dict)
+
+
+class ReportJobRead(BaseModel):
+    id: int
+    kind: str
+    params: dict
+    status: str
+    progress: int
+    attempts: int
+    error: str | None
+    created_by: int | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ValuationRow(BaseModel):
+    medicine_id: int | None = None
+    name: str | None = None
+    supplier_id: int | None
+    supplier_name: str | None
+    stock_qty: int
+    average_cost: float | None
+    last_cost: float | None
+    cost_value: float
+    retail_value: float
+    uncosted_qty: int
+
+
+class ValuationReport(BaseModel):
+    generated_at: datetime
+    group_by: str
+    cost_value: float
+    retail_value: float
+    rows: list[ValuationRow]
+
+
+class MarginRow(BaseModel):
+    period: datetime | None = None
+    medicine_id: int | None = None
+    name: str | None = None
+    supplier_id: int | None = None
+    supplier_name: str | None = None
+    quantity: int
+    revenue: float
+    cost: float
+    margin: float
+    margin_pct: float | None
+    uncosted_qty: int
+
+
+class MarginReport(BaseModel):
+    date_from: datetime
+    date_to: datetime
+    group_by: str
+    period: str | None
+    revenue: float
+    cost: float
+    margin: float
+    rows: list[MarginRow]
@@ -23,6 +23,10 @@ class SaleCreate(BaseModel):
     items: list[SaleItemCreate]
 
 
+class SaleBatchCreate(BaseModel):
+    sales: list[SaleCreate] = Field(min_length=1, max_length=500)
+
+
 class SaleUpdate(BaseModel):
     customer_name: str | None = None
 
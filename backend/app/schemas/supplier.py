@@ -1,4 +1,6 @@
-﻿from pydantic import BaseModel, ConfigDict, Field
+﻿from datetime import date
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SupplierBase(BaseModel):
@@ -19,3 +21,57 @@ class SupplierRead(SupplierBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SupplierTotals(BaseModel):
+    lines: int
+    quantity: int
+    spend: float
+    average_cost: float | None
+    sold_estimate: float
+    sell_through: float | None
+    days_to_sell: float | None
+
+
+class SupplierRank(SupplierTotals):
+    rank: int
+    supplier_id: int
+    name: str
+    medicines: int
+
+
+class SupplierRanking(BaseModel):
+    date_from: date
+    sort: str
+    rows: list[SupplierRank]
+
+
+class SupplierMonth(BaseModel):
+    month: date
+    lines: int
+    quantity: int
+    spend: float
+
+
+class MonthlyCost(BaseModel):
+    month: date
+    quantity: int
+    average_cost: float | None
+
+
+class SupplierMedicine(SupplierTotals):
+    medicine_id: int
+    name: str
+    first_cost: float | None
+    last_cost: float | None
+    cost_change_pct: float | None
+    costs: list[MonthlyCost]
+
+
+class SupplierAnalytics(BaseModel):
+    supplier_id: int
+    name: str
+    date_from: date
+    totals: SupplierTotals
+    spend_by_month: list[SupplierMonth]
+    medicines: list[SupplierMedicine]
@@ -7,6 +7,7 @@ class UserRead(BaseModel):
     name: str
     email: str | None
     role: str
+    branch_id: int
     active: bool
 
     class Config:
@@ -20,12 +21,14 @@ class UserCreate(BaseModel):
     username: str | None = None
     password: str | None = None
     active: bool | None = None
+    branch_id: int | None = None
 
 
 class UserUpdate(BaseModel):
     name: str = Field(..., min_length=1)
     email: str = Field(..., min_length=3)
     role: str = Field(..., min_length=1)
+    branch_id: int | None = None
 
 
 class UserStatusUpdate(BaseModel):
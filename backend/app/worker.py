@@ -0,0 +1,113 @@
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+
+from app.core.config import settings
+from app.core.database import engine, read_engine, replica_available, shard_engine
+from app.core.lifecycle import bootstrap
+from app.jobs.queue import claim, finish, heartbeat, release, report_progress, requeue_stale
+from app.jobs.reports import REPORTS
+
+logger = logging.getLogger("app.worker")
+
+
+def run_one(worker_id: str) -> bool:
+    with engine.begin() as connection:
+        job = claim(connection, worker_id)
+    if job is None:
+        return False
+
+    job_id, kind, params = job
+    last = {"progress": 0}
+
+    def progress(value: int) -> None:
+        if value != last["progress"]:
+            last["progress"] = value
+            report_progress(job_id, worker_id, value)
+
+    # A single long statement reports no progress, so liveness comes from a timer rather than from progress.
+    done = threading.Event()
+
+    def beat() -> None:
+        while not done.wait(settings.report_heartbeat_seconds):
+            try:
+                heartbeat(job_id, worker_id)
+            except Exception:
+                logger.exception("Heartbeat for report job %s failed", job_id)
+
+    threading.Thread(target=beat, name=f"heartbeat-{job_id}", daemon=True).start()
+    logger.info("Running report job %s (%s)", job_id, kind)
+    try:
+        params_model, report = REPORTS[kind]
+        params = params_model.model_validate(params)
+        source = shard_engine(params.branch_id) or (read_engine if replica_available() else engine)
+        with source.connect() as connection:
+            if source is not read_engine:
+                # One consistent snapshot for the whole export without holding up writers; standbys cannot
+                # run serializable transactions, and their snapshots are read-only already.
+                connection = connection.execution_options(
+                    isolation_level="SERIALIZABLE", postgresql_readonly=True, postgresql_deferrable=True
+                )
+            result = report(connection, params, progress)
+    except Exception as exc:
+        logger.exception("Report job %s failed", job_id)
+        finish(job_id, worker_id, error=str(exc) or exc.__class__.__name__)
+    else:
+        finish(job_id, worker_id, result=result)
+    finally:
+        done.set()
+    return True
+
+
+def work(worker_id: str, stop: threading.Event, drain: bool) -> None:
+    while not stop.is_set():
+        try:
+            if run_one(worker_id):
+                continue
+            if drain:
+                return
+        except Exception:
+            logger.exception("Polling report jobs failed")
+        stop.wait(settings.report_poll_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run queued report jobs.")
+    parser.add_argument("--concurrency", type=int, default=settings.report_worker_concurrency)
+    parser.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    bootstrap()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=work, args=(f"{prefix}:{index}", stop, args.drain), daemon=True)
+        for index in range(max(1, args.concurrency))
+    ]
+    for thread in threads:
+        thread.start()
+    logger.info("Report worker started with %s threads", len(threads))
+
+    try:
+        while not stop.is_set() and any(thread.is_alive() for thread in threads):
+            requeued = requeue_stale()
+            if requeued:
+                logger.warning("Requeued %s stale report jobs", requeued)
+            stop.wait(settings.report_poll_seconds)
+    except KeyboardInterrupt:
+        stop.set()
+    if stop.is_set():
+        # Exports still running are abandoned; another worker picks them up now instead of after the timeout,
+        # and finish() ignores a job this worker no longer holds.
+        released = release(prefix)
+        if released:
+            logger.warning("Released %s running report jobs", released)
+
+
+if __name__ == "__main__":
+    main()
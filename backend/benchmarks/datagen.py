@@ -0,0 +1,338 @@
+import argparse
+import io
+import math
+import random
+from bisect import bisect
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+
+from sqlalchemy import text
+
+import app.models  # noqa: F401
+from app.core.database import Base, engine
+from app.core.partitions import ensure_partitions
+from app.core.supplier_stats import rebuild
+from app.core.security import hash_password
+
+NULL = "\\N"
+
+
+@dataclass(frozen=True)
+class Plan:
+    medicines: int = 100_000
+    suppliers: int = 500
+    sellers: int = 20
+    sales: int = 10_000_000
+    purchases: int = 200_000
+    days: int = 730
+    mean_items: float = 5.0
+    zipf_s: float = 1.1
+    seed: int = 42
+    chunk_size: int = 100_000
+    end: date = date.today()
+
+
+@dataclass(frozen=True)
+class Offsets:
+    supplier: int
+    medicine: int
+    sale: int
+    purchase: int
+
+
+def _rng(plan: Plan, *parts) -> random.Random:
+    return random.Random(":".join(str(part) for part in (plan.seed, *parts)))
+
+
+def _init_worker() -> None:
+    engine.dispose(close=False)
+
+
+def _copy(table: str, columns: tuple[str, ...], rows) -> None:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(NULL if value is None else str(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+@lru_cache(maxsize=4)
+def medicine_prices(plan: Plan) -> list[float]:
+    rng = _rng(plan, "prices")
+    return [round(min(max(rng.lognormvariate(3.5, 1.0), 1.0), 25_000.0), 2) for _ in range(plan.medicines)]
+
+
+@lru_cache(maxsize=4)
+def medicine_suppliers(plan: Plan) -> list[int]:
+    rng = _rng(plan, "medicine-suppliers")
+    supplier_weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(plan.suppliers)))
+    return [bisect(supplier_weights, rng.random() * supplier_weights[-1]) for _ in range(plan.medicines)]
+
+
+@lru_cache(maxsize=4)
+def popularity(plan: Plan) -> list[float]:
+    ranks = list(range(plan.medicines))
+    _rng(plan, "popularity").shuffle(ranks)
+    return list(accumulate(1 / (ranks[index] + 1) ** plan.zipf_s for index in range(plan.medicines)))
+
+
+@lru_cache(maxsize=4)
+def daily_volume(plan: Plan) -> list[float]:
+    rng = _rng(plan, "days")
+    start = plan.end - timedelta(days=plan.days - 1)
+    weights = []
+    for offset in range(plan.days):
+        day = start + timedelta(days=offset)
+        season = 1 + 0.25 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 15) / 365.25)
+        weekday = 0.7 if day.weekday() == 6 else 1.15 if day.weekday() == 5 else 1.0
+        trend = 0.8 + 0.4 * offset / max(plan.days - 1, 1)
+        weights.append(season * weekday * trend * rng.uniform(0.9, 1.1))
+    return list(accumulate(weights))
+
+
+def write_suppliers(plan: Plan, offsets: Offsets) -> None:
+    rng = _rng(plan, "suppliers")
+    _copy(
+        "suppliers",
+        ("id", "name", "phone", "address"),
+        (
+            (supplier_id, f"Supplier {plan.seed}-{supplier_id:05d}", f"+2519{rng.randrange(10**7, 10**8)}", None)
+            for supplier_id in range(offsets.supplier + 1, offsets.supplier + plan.suppliers + 1)
+        ),
+    )
+
+
+def write_medicines(plan: Plan, offsets: Offsets) -> None:
+    rng = _rng(plan, "medicines")
+    prices = medicine_prices(plan)
+    suppliers = medicine_suppliers(plan)
+    _copy(
+        "medicines",
+        ("id", "name", "generic_name", "batch_number", "expiry_date", "unit_price", "stock_qty", "supplier_id"),
+        (
+            (
+                offsets.medicine + index + 1,
+                f"Medicine {plan.seed}-{offsets.medicine + index + 1:07d}",
+                f"Generic {index % 5_000:04d}",
+                f"B{rng.randrange(10**6, 10**7)}",
+                plan.end + timedelta(days=rng.randint(30, 1_100)),
+                prices[index],
+                rng.randint(0, 500),
+                offsets.supplier + suppliers[index] + 1,
+            )
+            for index in range(plan.medicines)
+        ),
+    )
+
+
+def ensure_sellers(plan: Plan) -> list[int]:
+    password_hash = hash_password("seller12345")
+    with engine.begin() as connection:
+        for index in range(plan.sellers):
+            connection.execute(
+                text(
+                    "INSERT INTO users (username, name, email, role, password_hash, active) "
+                    "VALUES (:username, :name, :email, 'Cashier', :password_hash, true) "
+                    "ON CONFLICT (username) DO NOTHING"
+                ),
+                {
+                    "username": f"seller{index:03d}",
+                    "name": f"Seller {index:03d}",
+                    "email": f"seller{index:03d}@hawi.local",
+                    "password_hash": password_hash,
+                },
+            )
+        return list(
+            connection.scalars(
+                text("SELECT id FROM users WHERE username LIKE 'seller%' ORDER BY username LIMIT :limit"),
+                {"limit": plan.sellers},
+            )
+        )
+
+
+def write_sales_chunk(plan: Plan, offsets: Offsets, sellers: list[int], chunk: int) -> int:
+    rng = _rng(plan, "sales", chunk)
+    prices = medicine_prices(plan)
+    weights = popularity(plan)
+    days = daily_volume(plan)
+    start = datetime.combine(plan.end - timedelta(days=plan.days - 1), datetime.min.time())
+    seller_weights = list(accumulate(1 / (rank + 1) ** 0.5 for rank in range(len(sellers))))
+    first = chunk * plan.chunk_size
+    count = min(plan.chunk_size, plan.sales - first)
+
+    sales = []
+    items = []
+    for index in range(count):
+        sale_id = offsets.sale + first + index + 1
+        day = bisect(days, rng.random() * days[-1])
+        hour = min(max(rng.gauss(14, 3.5), 7), 22)
+        sold_at = start + timedelta(days=day, seconds=int(hour * 3_600))
+        total = 0.0
+        for _ in range(min(1 + int(rng.expovariate(1 / max(plan.mean_items - 0.5, 0.1))), 25)):
+            medicine = bisect(weights, rng.random() * weights[-1])
+            quantity = 1 if rng.random() < 0.7 else rng.randint(2, 6)
+            line_total = round(prices[medicine] * quantity, 2)
+            total += line_total
+            items.append((sale_id, sold_at, offsets.medicine + medicine + 1, quantity, prices[medicine], line_total))
+        seller = sellers[bisect(seller_weights, rng.random() * seller_weights[-1])]
+        customer = f"Customer {rng.randrange(50_000)}" if rng.random() < 0.15 else None
+        sales.append((sale_id, sold_at, customer, seller, round(total, 2)))
+
+    _copy("sales", ("id", "sold_at", "customer_name", "user_id", "total_amount"), sales)
+    _copy("sale_items", ("sale_id", "sold_at", "medicine_id", "quantity", "unit_price", "line_total"), items)
+    return len(items)
+
+
+def write_purchases_chunk(plan: Plan, offsets: Offsets, chunk: int) -> int:
+    rng = _rng(plan, "purchases", chunk)
+    prices = medicine_prices(plan)
+    suppliers = medicine_suppliers(plan)
+    by_supplier: dict[int, list[int]] = {}
+    for medicine, supplier in enumerate(suppliers):
+        by_supplier.setdefault(supplier, []).append(medicine)
+    supplier_keys = sorted(by_supplier)
+    start = datetime.combine(plan.end - timedelta(days=plan.days - 1), datetime.min.time())
+    first = chunk * plan.chunk_size
+    count = min(plan.chunk_size, plan.purchases - first)
+
+    purchases = []
+    items = []
+    for index in range(count):
+        purchase_id = offsets.purchase + first + index + 1
+        supplier = rng.choice(supplier_keys)
+        catalog = by_supplier[supplier]
+        total = 0.0
+        for medicine in rng.sample(catalog, min(len(catalog), rng.randint(1, 15))):
+            quantity = rng.choice((10, 20, 50, 100, 200))
+            unit_cost = round(prices[medicine] * rng.uniform(0.55, 0.8), 2)
+            line_total = round(unit_cost * quantity, 2)
+            total += line_total
+            items.append((purchase_id, offsets.medicine + medicine + 1, quantity, unit_cost, line_total))
+        purchased_at = start + timedelta(seconds=rng.randrange(plan.days * 86_400))
+        purchases.append(
+            (purchase_id, purchased_at, offsets.supplier + supplier + 1, f"INV-{purchase_id}", None, round(total, 2))
+        )
+
+    _copy("purchases", ("id", "purchased_at", "supplier_id", "invoice_number", "note", "total_amount"), purchases)
+    _copy("purchase_items", ("purchase_id", "medicine_id", "quantity", "unit_cost", "line_total"), items)
+    return len(items)
+
+
+def current_offsets() -> Offsets:
+    with engine.connect() as connection:
+        values = [
+            connection.scalar(text(f"SELECT COALESCE(MAX(id), 0) FROM {table}"))
+            for table in ("suppliers", "medicines", "sales", "purchases")
+        ]
+    return Offsets(*values)
+
+
+def write_derived(offsets: Offsets) -> None:
+    """Fill the tables the API keeps alongside the COPY-loaded history, which COPY bypasses."""
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO medicine_prices (medicine_id, unit_price, effective_from, created_at) "
+                "SELECT id, unit_price, '1970-01-01', now() FROM medicines WHERE id > :offset"
+            ),
+            {"offset": offsets.medicine},
+        )
+        connection.execute(
+            text("INSERT INTO sale_keys (sale_id, sold_at) SELECT id, sold_at FROM sales WHERE id > :offset"),
+            {"offset": offsets.sale},
+        )
+        rebuild(connection)
+
+
+def reset_sequences() -> None:
+    with engine.begin() as connection:
+        for table in ("suppliers", "medicines", "sales", "sale_items", "purchases", "purchase_items"):
+            connection.execute(
+                text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))")
+            )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(
+            text(
+                "ANALYZE suppliers, medicines, medicine_prices, sales, sale_items, sale_keys, purchases, "
+                "purchase_items, supplier_purchase_months, medicine_sales_months"
+            )
+        )
+
+
+def generate(plan: Plan, workers: int | None) -> dict[str, int]:
+    if plan.medicines < 1 or plan.suppliers < 1 or plan.sellers < 1:
+        raise ValueError("Need at least one medicine, supplier and seller")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        ensure_partitions(connection, plan.end - timedelta(days=plan.days - 1), plan.end)
+    offsets = current_offsets()
+    sellers = ensure_sellers(plan)
+    write_suppliers(plan, offsets)
+    write_medicines(plan, offsets)
+
+    sale_chunks = math.ceil(plan.sales / plan.chunk_size)
+    purchase_chunks = math.ceil(plan.purchases / plan.chunk_size)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        sale_items = [pool.submit(write_sales_chunk, plan, offsets, sellers, chunk) for chunk in range(sale_chunks)]
+        purchase_items = [pool.submit(write_purchases_chunk, plan, offsets, chunk) for chunk in range(purchase_chunks)]
+        totals = {
+            "sale_items": sum(future.result() for future in sale_items),
+            "purchase_items": sum(future.result() for future in purchase_items),
+        }
+
+    write_derived(offsets)
+    reset_sequences()
+    return {
+        "suppliers": plan.suppliers,
+        "medicines": plan.medicines,
+        "sales": plan.sales,
+        "purchases": plan.purchases,
+        **totals,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-load a deterministic synthetic dataset with COPY.")
+    parser.add_argument("--medicines", type=int, default=Plan.medicines)
+    parser.add_argument("--suppliers", type=int, default=Plan.suppliers)
+    parser.add_argument("--sellers", type=int, default=Plan.sellers)
+    parser.add_argument("--sales", type=int, default=Plan.sales)
+    parser.add_argument("--purchases", type=int, default=Plan.purchases)
+    parser.add_argument("--days", type=int, default=Plan.days)
+    parser.add_argument("--mean-items", type=float, default=Plan.mean_items)
+    parser.add_argument("--zipf", type=float, default=Plan.zipf_s)
+    parser.add_argument("--seed", type=int, default=Plan.seed)
+    parser.add_argument("--chunk-size", type=int, default=Plan.chunk_size)
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="last day of history (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    plan = Plan(
+        medicines=args.medicines,
+        suppliers=args.suppliers,
+        sellers=args.sellers,
+        sales=args.sales,
+        purchases=args.purchases,
+        days=args.days,
+        mean_items=args.mean_items,
+        zipf_s=args.zipf,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        end=args.end,
+    )
+    for table, count in generate(plan, args.workers).items():
+        print(f"{table:<15} {count:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select, text
+
+from app.core.database import engine
+from app.main import app
+from app.models import Medicine, Purchase, PurchaseItem, Sale, SaleItem, Supplier
+from benchmarks.seed import BENCH_PASSWORD, BENCH_USERNAME
+
+# Tables an endpoint is expected to read in full; anything else scanned sequentially is a missing index.
+FULL_READS = {
+    "list_medicines": {"medicines"},
+    "list_suppliers": {"suppliers"},
+    "list_purchases": {"purchases", "purchase_items"},
+    "dashboard_stats": {"medicines", "suppliers", "sales"},
+    "reorder_suggestions": {"medicines", "suppliers", "sale_items"},
+    "valuation": {"medicines", "suppliers", "purchases", "purchase_items"},
+    "margin": {"medicines", "suppliers", "purchases", "purchase_items", "sale_items"},
+}
+
+
+def build_requests(connection) -> dict[str, tuple[str, str]]:
+    medicine_id = connection.scalar(select(SaleItem.medicine_id).limit(1))
+    supplier_id = connection.scalar(select(Medicine.supplier_id).where(Medicine.supplier_id.is_not(None)).limit(1))
+    sale_id = connection.scalar(select(Sale.id).order_by(Sale.sold_at.desc()).limit(1))
+    purchase_id = connection.scalar(select(func.max(Purchase.id)))
+    if None in (medicine_id, supplier_id, sale_id, purchase_id):
+        raise LookupError("Database has no sales/purchases; run python -m benchmarks.datagen first")
+    since = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    # The delete requests target rows that are still referenced, so they stop at the existence checks.
+    return {
+        "list_medicines": ("GET", "/api/medicines"),
+        "get_medicine": ("GET", f"/api/medicines/{medicine_id}"),
+        "list_suppliers": ("GET", "/api/suppliers"),
+        "get_supplier": ("GET", f"/api/suppliers/{supplier_id}"),
+        "list_sales": ("GET", f"/api/sales?date_from={since}"),
+        "get_sale": ("GET", f"/api/sales/{sale_id}"),
+        "list_purchases": ("GET", "/api/purchases"),
+        "get_purchase": ("GET", f"/api/purchases/{purchase_id}"),
+        "dashboard_stats": ("GET", "/api/dashboard/stats"),
+        "reorder_suggestions": ("GET", f"/api/inventory/reorder-suggestions?supplier_id={supplier_id}"),
+        "forecast": ("GET", f"/api/inventory/forecast?supplier_id={supplier_id}"),
+        "valuation": ("GET", f"/api/reports/valuation?supplier_id={supplier_id}"),
+        "margin": ("GET", f"/api/reports/margin?supplier_id={supplier_id}"),
+        "delete_medicine": ("DELETE", f"/api/medicines/{medicine_id}"),
+        "delete_supplier": ("DELETE", f"/api/suppliers/{supplier_id}"),
+    }
+
+
+def capture(client: TestClient, headers: dict[str, str], method: str, path: str) -> list[tuple[str, object]]:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.request(method, path, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    if response.status_code >= 500:
+        raise RuntimeError(f"{method} {path} failed with {response.status_code}: {response.text[:200]}")
+    return statements
+
+
+def seq_scans(plan: dict):
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def parent_table(relation: str) -> str:
+    table, _, suffix = relation.rpartition("_p")
+    return table if table and suffix.isdigit() else relation
+
+
+def login(client: TestClient) -> dict[str, str]:
+    for _ in range(600):
+        if client.get("/health/ready").status_code == 200:
+            break
+        time.sleep(0.2)
+    response = client.post("/api/auth/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+    if response.status_code != 200:
+        raise LookupError("Benchmark login failed; run python -m benchmarks.seed first")
+    return {"X-User-Id": str(response.json()["id"])}
+
+
+def audit(client: TestClient, min_rows: int = 10_000, analyze: bool = False) -> tuple[int, list[dict]]:
+    """EXPLAIN every query the audited endpoints run; return how many were audited and the unexpected seq scans."""
+    headers = login(client)
+    with engine.connect() as connection:
+        if analyze:
+            for model in (Medicine, Supplier, Purchase, PurchaseItem, Sale, SaleItem):
+                connection.execute(text(f"ANALYZE {model.__tablename__}"))
+            connection.commit()
+        sizes = dict(connection.execute(text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'")).all())
+        requests = build_requests(connection)
+
+        findings = []
+        for name, (method, path) in requests.items():
+            for statement, parameters in capture(client, headers, method, path):
+                plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+                for relation in seq_scans(plan[0]["Plan"]):
+                    if sizes.get(relation, 0) < min_rows:
+                        continue
+                    if parent_table(relation) in FULL_READS.get(name, set()):
+                        continue
+                    findings.append(
+                        {
+                            "endpoint": name,
+                            "relation": relation,
+                            "rows": int(sizes[relation]),
+                            "statement": " ".join(statement.split())[:300],
+                        }
+                    )
+            connection.rollback()
+    return len(requests), findings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail when endpoint queries sequentially scan large tables.")
+    parser.add_argument("--min-rows", type=int, default=10_000, help="tables smaller than this may be scanned")
+    parser.add_argument("--analyze", action="store_true", help="refresh planner statistics first")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        try:
+            audited, findings = audit(client, args.min_rows, args.analyze)
+        except (LookupError, RuntimeError) as exc:
+            raise SystemExit(str(exc)) from exc
+
+    if args.json:
+        print(json.dumps(findings, indent=2))
+    else:
+        for finding in findings:
+            print(f"{finding['endpoint']:20} seq scan on {finding['relation']} ({finding['rows']:,} rows)")
+            print(f"    {finding['statement']}")
+        print(f"{audited} endpoints audited, {len(findings)} sequential scans over large tables")
+    sys.exit(1 if findings else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import random
+import statistics
+import time
+from dataclasses import replace
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal, engine
+from app.core.partitions import ensure_partitions
+from app.models import Medicine, Sale, SaleItem
+from benchmarks.datagen import (
+    Plan,
+    current_offsets,
+    ensure_sellers,
+    generate,
+    reset_sequences,
+    write_sales_chunk,
+)
+
+
+def measure_inserts(medicine_ids: list[int], count: int, rng: random.Random) -> list[float]:
+    latencies = []
+    db = SessionLocal()
+    try:
+        prices = dict(db.execute(select(Medicine.id, Medicine.unit_price).where(Medicine.id.in_(medicine_ids))).all())
+        for _ in range(count):
+            started = time.perf_counter()
+            sale = Sale(customer_name=None)
+            total = 0
+            for medicine_id in rng.sample(medicine_ids, 3):
+                total += prices[medicine_id]
+                sale.items.append(
+                    SaleItem(medicine_id=medicine_id, quantity=1, unit_price=prices[medicine_id], line_total=prices[medicine_id])
+                )
+            sale.total_amount = total
+            db.add(sale)
+            db.commit()
+            latencies.append(time.perf_counter() - started)
+    finally:
+        db.close()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show sale insert cost as partitioned history grows.")
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--step-sales", type=int, default=1_000_000)
+    parser.add_argument("--step-days", type=int, default=365)
+    parser.add_argument("--inserts", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    plan = Plan(medicines=5_000, suppliers=50, sellers=5, sales=0, purchases=0, seed=args.seed)
+    generate(plan, workers=1)
+    base = current_offsets()
+    sellers = ensure_sellers(plan)
+    medicine_ids = list(range(base.medicine - plan.medicines + 1, base.medicine + 1))
+    rng = random.Random(args.seed)
+
+    print(f"{'history':>12}  {'mean_us':>9}  {'p95_us':>9}")
+    for step in range(args.steps + 1):
+        with engine.connect() as connection:
+            history = connection.scalar(select(func.count()).select_from(Sale))
+        latencies = measure_inserts(medicine_ids, args.inserts, rng)
+        cuts = statistics.quantiles(latencies, n=20)
+        print(f"{history:>12,}  {statistics.fmean(latencies) * 1e6:>9.0f}  {cuts[18] * 1e6:>9.0f}")
+        if step == args.steps:
+            break
+
+        end = date.today() - timedelta(days=step * args.step_days)
+        step_plan = replace(plan, sales=args.step_sales, chunk_size=args.step_sales, days=args.step_days, end=end)
+        with engine.begin() as connection:
+            ensure_partitions(connection, end - timedelta(days=args.step_days), end)
+        offsets = replace(base, medicine=base.medicine - plan.medicines, sale=current_offsets().sale)
+        write_sales_chunk(step_plan, offsets, sellers, 0)
+        reset_sequences()
+
+
+if __name__ == "__main__":
+    main()
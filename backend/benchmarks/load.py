@@ -0,0 +1,189 @@
+import argparse
+import http.client
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks.seed import BENCH_PASSWORD, BENCH_USERNAME
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+
+class Client:
+    def __init__(self, base_url: str, headers: dict[str, str] | None = None):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def request(self, method: str, path: str, payload=None) -> tuple[int, bytes]:
+        body = json.dumps(payload) if payload is not None else None
+        try:
+            self.connection.request(method, path, body=body, headers=self.headers)
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            raise
+
+
+def login(client: Client) -> int:
+    status, body = client.request("POST", "/api/auth/login", {"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+    if status != 200:
+        raise SystemExit(f"Benchmark login failed with {status}; run python -m benchmarks.seed first")
+    return json.loads(body)["id"]
+
+
+def build_scenarios(medicine_ids: list[int], rng: random.Random):
+    def create_sale():
+        items = [{"medicine_id": rng.choice(medicine_ids), "quantity": 1} for _ in range(rng.randint(1, 3))]
+        return "POST", "/api/sales", {"items": items}
+
+    return {
+        "login": lambda: ("POST", "/api/auth/login", {"username": BENCH_USERNAME, "password": BENCH_PASSWORD}),
+        "list_medicines": lambda: ("GET", "/api/medicines", None),
+        "list_sales": lambda: ("GET", "/api/sales", None),
+        "dashboard_stats": lambda: ("GET", "/api/dashboard/stats", None),
+        "create_sale": create_sale,
+    }
+
+
+def run_scenario(base_url: str, headers: dict[str, str], make_request, duration: float, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    limited = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        nonlocal errors, limited
+        client = Client(base_url, headers)
+        local_latencies = []
+        local_errors = 0
+        local_limited = 0
+        while time.perf_counter() < deadline:
+            method, path, payload = make_request()
+            started = time.perf_counter()
+            try:
+                status, _ = client.request(method, path, payload)
+            except (http.client.HTTPException, OSError):
+                client = Client(base_url, headers)
+                status = 0
+            # Rate limited and shed requests return at once and would flatter throughput and latency.
+            if status in (429, 503):
+                local_limited += 1
+                continue
+            local_latencies.append(time.perf_counter() - started)
+            if status >= 400 or status == 0:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+            limited += local_limited
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, limited, elapsed)
+
+
+def summarize(latencies: list[float], errors: int, limited: int, elapsed: float) -> dict:
+    if len(latencies) < 2:
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "limited": limited,
+            "throughput": 0.0,
+            "p50_ms": 0.0,
+            "p95_ms": 0.0,
+            "p99_ms": 0.0,
+        }
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "limited": limited,
+        "throughput": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput']} < baseline {previous['throughput']}")
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms > baseline {previous['p95_ms']}ms")
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: {current['errors']} errors (baseline {previous.get('errors', 0)})")
+        if current["limited"] > previous.get("limited", 0):
+            regressions.append(f"{name}: {current['limited']} rate limited (baseline {previous.get('limited', 0)})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive core endpoints with concurrent load and compare to a baseline.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", default="login,list_medicines,list_sales,dashboard_stats,create_sale")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    setup = Client(args.base_url)
+    headers = {"X-User-Id": str(login(setup))}
+    setup.headers.update(headers)
+    status, body = setup.request("GET", "/api/medicines")
+    if status != 200:
+        raise SystemExit(f"Cannot list medicines ({status})")
+    medicine_ids = [row["id"] for row in json.loads(body) if row["stock_qty"] > 100]
+    if not medicine_ids:
+        raise SystemExit("No stocked medicines; run python -m benchmarks.seed first")
+
+    scenarios = build_scenarios(medicine_ids, random.Random(args.seed))
+    results = {}
+    for name in [item.strip() for item in args.scenarios.split(",") if item.strip()]:
+        results[name] = run_scenario(args.base_url, headers, scenarios[name], args.duration, args.concurrency)
+        row = results[name]
+        print(
+            f"{name:<16} {row['throughput']:>9.1f} req/s  p50 {row['p50_ms']:>8.2f}ms  "
+            f"p95 {row['p95_ms']:>8.2f}ms  p99 {row['p99_ms']:>8.2f}ms  "
+            f"errors {row['errors']}  limited {row['limited']}"
+        )
+    if any(row["limited"] for row in results.values()):
+        print("WARNING requests were rate limited or shed (429/503); start the server with RATE_LIMIT_ENABLED=false")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print("No baseline to compare against; rerun with --save-baseline to record one")
+        return
+
+    regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
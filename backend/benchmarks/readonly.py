@@ -0,0 +1,65 @@
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal, row_columns
+from app.models import Medicine
+from app.schemas.medicine import MedicineRead
+
+
+def tracked(branch_id: int) -> list[MedicineRead]:
+    """The list endpoint as it ran on ``get_db``: ORM instances kept in the identity map."""
+    db = SessionLocal()
+    try:
+        medicines = db.scalars(select(Medicine).where(Medicine.branch_id == branch_id).order_by(Medicine.name)).all()
+        return [MedicineRead.model_validate(medicine) for medicine in medicines]
+    finally:
+        db.close()
+
+
+def read_only(branch_id: int) -> list[MedicineRead]:
+    """The same list on ``get_readonly_db``: a READ ONLY transaction returning plain rows."""
+    db = SessionLocal(info={"read_only": True})
+    try:
+        rows = db.execute(
+            select(*row_columns(Medicine)).where(Medicine.branch_id == branch_id).order_by(Medicine.name)
+        ).all()
+        return [MedicineRead.model_validate(row) for row in rows]
+    finally:
+        db.close()
+
+
+def measure(function, branch_id: int, repeat: int) -> tuple[float, float, float]:
+    function(branch_id)
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(branch_id)
+        latencies.append(time.perf_counter() - started)
+    tracemalloc.start()
+    function(branch_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(latencies), statistics.quantiles(latencies, n=20)[18], peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the medicine list on get_db and get_readonly_db.")
+    parser.add_argument("--branch", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        rows = db.scalar(select(func.count()).select_from(Medicine).where(Medicine.branch_id == args.branch))
+    print(f"{rows:,} medicines in branch {args.branch}")
+    print(f"{'session':<10}  {'p50_ms':>8}  {'p95_ms':>8}  {'peak_mb':>8}")
+    for name, function in (("get_db", tracked), ("read-only", read_only)):
+        p50, p95, peak = measure(function, args.branch, args.repeat)
+        print(f"{name:<10}  {p50 * 1000:>8.1f}  {p95 * 1000:>8.1f}  {peak / 2**20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import time
+
+import numpy as np
+
+from app.core.reorder import ReorderPolicy, demand_matrix, suggest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the vectorized reorder engine on a synthetic catalog.")
+    parser.add_argument("--medicines", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--density", type=float, default=0.2, help="share of (medicine, day) cells with sales")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    medicine_ids = np.arange(1, args.medicines + 1, dtype=np.int64)
+    cells = int(args.medicines * args.days * args.density)
+    sale_medicine_ids = rng.zipf(1.3, cells) % args.medicines + 1
+    sale_days = rng.integers(0, args.days, cells)
+    quantities = rng.integers(1, 6, cells)
+    stock = rng.integers(0, 500, args.medicines).astype(np.float64)
+    policy = ReorderPolicy(window_days=args.days)
+
+    build, compute = [], []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        demand = demand_matrix(medicine_ids, sale_medicine_ids, sale_days, quantities, args.days)
+        built = time.perf_counter()
+        result = suggest(stock, demand, policy)
+        build.append(built - started)
+        compute.append(time.perf_counter() - built)
+
+    print(f"{args.medicines:,} medicines x {args.days} days, {cells:,} sale rows")
+    print(f"matrix build  best {min(build) * 1000:8.1f} ms")
+    print(f"suggestions   best {min(compute) * 1000:8.1f} ms")
+    print(f"to reorder    {int((result['suggested_qty'] > 0).sum()):,} medicines")
+
+
+if __name__ == "__main__":
+    main()
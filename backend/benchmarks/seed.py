@@ -0,0 +1,121 @@
+import argparse
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+import app.models  # noqa: F401
+from app.core.database import Base, engine
+from app.core.partitions import ensure_partitions
+from app.core.security import hash_password
+from app.models import Medicine, Sale, SaleItem, Supplier, User
+
+BENCH_USERNAME = "bench"
+BENCH_PASSWORD = "bench12345"
+BATCH_SIZE = 5_000
+
+
+def _batches(rows, size=BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def ensure_bench_user(connection) -> int:
+    user_id = connection.scalar(select(User.id).where(User.username == BENCH_USERNAME))
+    if user_id:
+        return user_id
+    return connection.scalar(
+        insert(User)
+        .values(
+            username=BENCH_USERNAME,
+            name="Benchmark Cashier",
+            email="bench@hawi.local",
+            role="Admin",
+            password_hash=hash_password(BENCH_PASSWORD),
+            active=True,
+        )
+        .returning(User.id)
+    )
+
+
+def seed(medicines: int, suppliers: int, sales: int, days: int, max_items: int, seed_value: int) -> None:
+    rng = random.Random(seed_value)
+    Base.metadata.create_all(bind=engine)
+    start = datetime.utcnow() - timedelta(days=days)
+    with engine.begin() as connection:
+        ensure_partitions(connection, start.date(), datetime.utcnow().date())
+        user_id = ensure_bench_user(connection)
+        prefix = f"bench-{seed_value}-{connection.scalar(select(func.count(Medicine.id)))}"
+
+        supplier_ids = connection.scalars(
+            insert(Supplier).returning(Supplier.id, sort_by_parameter_order=True),
+            [{"name": f"{prefix} supplier {index}"} for index in range(suppliers)],
+        ).all()
+
+        medicine_rows = [
+            {
+                "name": f"{prefix} medicine {index}",
+                "batch_number": f"B{index:07d}",
+                "expiry_date": date.today() + timedelta(days=rng.randint(30, 1_000)),
+                "unit_price": round(rng.uniform(5, 500), 2),
+                "stock_qty": 1_000_000,
+                "supplier_id": rng.choice(supplier_ids),
+            }
+            for index in range(medicines)
+        ]
+        medicine_ids = []
+        for batch in _batches(medicine_rows):
+            statement = insert(Medicine).returning(Medicine.id, sort_by_parameter_order=True)
+            medicine_ids.extend(connection.scalars(statement, batch).all())
+        prices = {medicine_id: row["unit_price"] for medicine_id, row in zip(medicine_ids, medicine_rows)}
+
+        for batch_start in range(0, sales, BATCH_SIZE):
+            count = min(BATCH_SIZE, sales - batch_start)
+            baskets = [
+                [(rng.choice(medicine_ids), rng.randint(1, 5)) for _ in range(rng.randint(1, max_items))]
+                for _ in range(count)
+            ]
+            sold_at = [start + timedelta(seconds=rng.randint(0, days * 86_400)) for _ in baskets]
+            sale_ids = connection.scalars(
+                insert(Sale).returning(Sale.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "sold_at": moment,
+                        "user_id": user_id,
+                        "total_amount": round(sum(prices[mid] * qty for mid, qty in basket), 2),
+                    }
+                    for moment, basket in zip(sold_at, baskets)
+                ],
+            ).all()
+            connection.execute(
+                insert(SaleItem),
+                [
+                    {
+                        "sale_id": sale_id,
+                        "sold_at": moment,
+                        "medicine_id": medicine_id,
+                        "quantity": quantity,
+                        "unit_price": prices[medicine_id],
+                        "line_total": round(prices[medicine_id] * quantity, 2),
+                    }
+                    for sale_id, moment, basket in zip(sale_ids, sold_at, baskets)
+                    for medicine_id, quantity in basket
+                ],
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the configured database for benchmarks.")
+    parser.add_argument("--medicines", type=int, default=1_000)
+    parser.add_argument("--suppliers", type=int, default=50)
+    parser.add_argument("--sales", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--max-items", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    seed(args.medicines, args.suppliers, args.sales, args.days, args.max_items, args.seed)
+    print(f"Seeded {args.medicines} medicines and {args.sales} sales; login as {BENCH_USERNAME}/{BENCH_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import time
+
+from sqlalchemy import or_, select
+
+from app.core import statements
+from app.core.database import SessionLocal
+from app.models import Medicine, Supplier, User
+
+
+def inline_cases(db, medicine: Medicine, supplier: Supplier, user: User):
+    """The registry's statements rebuilt on every call, so the two sides differ only in construction cost."""
+    return {
+        "login": lambda: db.scalar(
+            select(User).where(or_(User.username == user.username, User.email == user.username)).limit(1)
+        ),
+        "current user": lambda: db.execute(
+            select(*(User.__table__.c[column] for column in statements.USER_COLUMNS)).where(User.id == user.id)
+        ).first(),
+        "medicine name": lambda: db.scalar(
+            select(Medicine.id).where(Medicine.branch_id == medicine.branch_id, Medicine.name == medicine.name)
+        ),
+        "medicine conflict": lambda: db.scalar(
+            select(Medicine.id)
+            .where(
+                Medicine.branch_id == medicine.branch_id,
+                or_(Medicine.name == medicine.name, Medicine.batch_number == medicine.batch_number),
+                Medicine.id != medicine.id,
+            )
+            .limit(1)
+        ),
+        "supplier conflict": lambda: db.scalar(
+            select(Supplier.id).where(Supplier.name == supplier.name, Supplier.id != supplier.id).limit(1)
+        ),
+    }
+
+
+def registry_cases(db, medicine: Medicine, supplier: Supplier, user: User):
+    return {
+        "login": lambda: db.scalar(statements.USER_BY_LOGIN, {"login": user.username}),
+        "current user": lambda: db.execute(statements.USER_STATE, {"user_id": user.id}).first(),
+        "medicine name": lambda: db.scalar(
+            statements.MEDICINE_ID_BY_NAME, {"branch_id": medicine.branch_id, "name": medicine.name}
+        ),
+        "medicine conflict": lambda: db.scalar(
+            statements.MEDICINE_CONFLICT,
+            {
+                "branch_id": medicine.branch_id,
+                "name": medicine.name,
+                "batch_number": medicine.batch_number,
+                "medicine_id": medicine.id,
+            },
+        ),
+        "supplier conflict": lambda: db.scalar(
+            statements.SUPPLIER_CONFLICT, {"name": supplier.name, "supplier_id": supplier.id}
+        ),
+    }
+
+
+def cpu_per_call(function, iterations: int) -> float:
+    function()
+    started = time.process_time()
+    for _ in range(iterations):
+        function()
+    return (time.process_time() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Client CPU per hot-path query, inline constructs vs the registry.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        medicine = db.scalar(select(Medicine).limit(1))
+        supplier = db.scalar(select(Supplier).limit(1))
+        user = db.scalar(select(User).limit(1))
+        if medicine is None or supplier is None or user is None:
+            raise SystemExit("Seed the database first (python -m benchmarks.seed)")
+        inline = inline_cases(db, medicine, supplier, user)
+        registry = registry_cases(db, medicine, supplier, user)
+
+        print(f"{'query':<18}  {'inline_us':>9}  {'registry_us':>11}  {'saved_us':>8}")
+        total_saved = 0.0
+        for name in inline:
+            before = cpu_per_call(inline[name], args.iterations)
+            after = cpu_per_call(registry[name], args.iterations)
+            total_saved += before - after
+            print(f"{name:<18}  {before * 1e6:>9.1f}  {after * 1e6:>11.1f}  {(before - after) * 1e6:>8.1f}")
+        print(f"saved per request touching all of them: {total_saved * 1e6:.1f} us of CPU")
+        print(statements.stats.metrics())
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+# Importing app.main mounts every router before the worker serves, so the budget covers route building; numeric
+# code such as numpy loads inside the handlers that need it.
+IMPORT_BUDGET_US = 2_000_000
+
+
+def _import_times(module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$", line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+
+def test_app_main_mounts_routers_without_numpy():
+    times = _import_times("app.main")
+    assert "app.api.medicines" in times
+    assert "numpy" not in times
+
+
+def test_app_main_import_budget():
+    times = _import_times("app.main")
+    assert times["app.main"] < IMPORT_BUDGET_US
@@ -0,0 +1,98 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from hypothesis import HealthCheck, given, settings
+from hypothesis import strategies as st
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import SessionLocal, engine
+from app.core.money import from_cents, to_cents
+
+cents = st.integers(min_value=-(10**12), max_value=10**12)
+
+
+@given(cents)
+def test_cents_round_trip(value):
+    assert to_cents(from_cents(value)) == value
+
+
+@given(cents)
+def test_from_cents_has_two_places(value):
+    assert from_cents(value).as_tuple().exponent == -2
+
+
+@given(cents)
+def test_two_place_float_converts_exactly(value):
+    # str() of a float is its shortest repr, so 0.1 + 0.2 style noise never reaches the Decimal.
+    assert to_cents(value / 100) == value
+
+
+@given(st.integers(min_value=0, max_value=10**9))
+def test_half_cent_rounds_up(value):
+    half = Decimal(value) / 100 + Decimal("0.005")
+    assert to_cents(half) == value + 1
+    assert to_cents(half - Decimal("0.001")) == value
+    assert to_cents(-half) == -(value + 1)
+
+
+def test_known_half_up_cases():
+    assert to_cents("0.005") == 1
+    assert to_cents("1.005") == 101
+    assert to_cents(1.005) == 101
+    assert to_cents(2.675) == 268
+    assert to_cents("0.0049") == 0
+
+
+def _database_ready() -> bool:
+    try:
+        with engine.connect() as connection:
+            connection.scalar(select(1))
+    except OperationalError:
+        return False
+    return True
+
+
+# Each line is (list price in cents, quantity), sized so a sale stays inside Numeric(12, 2).
+sale_lines = st.lists(
+    st.tuples(st.integers(min_value=1, max_value=10**5), st.integers(min_value=1, max_value=1000)),
+    min_size=1,
+    max_size=20,
+)
+
+
+@pytest.mark.skipif(not _database_ready(), reason="DATABASE_URL is not reachable")
+@settings(max_examples=40, deadline=None, suppress_health_check=[HealthCheck.too_slow])
+@given(sale_lines)
+def test_sale_totals_match_decimal_totals(lines):
+    from app.api.service import create_sales
+    from app.models import Medicine, Sale
+    from app.schemas.sale import SaleCreate
+
+    db = SessionLocal(info={"branch_id": 1})
+    try:
+        medicines = [
+            Medicine(
+                branch_id=1,
+                name=f"Money {uuid.uuid4().hex}",
+                batch_number="PROP",
+                expiry_date=date(2099, 1, 1),
+                unit_price=from_cents(price),
+                stock_qty=10**6,
+            )
+            for price, _ in lines
+        ]
+        db.add_all(medicines)
+        db.flush()
+        items = [{"medicine_id": medicine.id, "quantity": line[1]} for medicine, line in zip(medicines, lines)]
+        (sale,) = create_sales(db, 1, [SaleCreate(items=items)])
+
+        expected = [Decimal(price) / 100 * quantity for price, quantity in lines]
+        assert [item.line_total for item in sale.items] == expected
+        db.expire_all()
+        assert db.scalar(select(Sale.total_amount).where(Sale.id == sale.id)) == sum(expected, Decimal(0))
+    finally:
+        db.rollback()
+        db.close()
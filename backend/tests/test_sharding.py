@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.core.database import engine
+
+BACKEND = Path(__file__).resolve().parents[1]
+SHARD_DATABASE = f"{engine.url.database}_shard_test"
+BRANCH_NAME = f"Shard Test {uuid.uuid4().hex[:8]}"
+
+# Runs in its own interpreter because the shard settings are read when app.core.database is imported.
+SCENARIO = """
+import json, sys
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app.main import app
+
+admin_id, name = sys.argv[1], sys.argv[2]
+headers = {"X-User-Id": admin_id}
+with TestClient(app) as client:
+    branch = client.post("/api/branches", json={"name": name}, headers=headers)
+    supplier = client.post("/api/suppliers", json={"name": name}, headers=headers)
+    headers["X-Branch-Id"] = str(branch.json()["id"])
+    medicine = client.post("/api/medicines", headers=headers, json={
+        "name": name, "batch_number": "SHARD-1", "expiry_date": str(date.today() + timedelta(days=365)),
+        "unit_price": 12.5, "stock_qty": 10, "supplier_id": supplier.json()["id"],
+    })
+    items = [{"medicine_id": medicine.json()["id"], "quantity": 2}]
+    sale = client.post("/api/sales", headers=headers, json={"items": items})
+    removed = client.delete(f"/api/suppliers/{supplier.json()['id']}", headers=headers)
+print(json.dumps({
+    "branch": [branch.status_code, branch.json()["id"]],
+    "supplier": [supplier.status_code, supplier.json()["id"]],
+    "medicine": medicine.status_code,
+    "sale": [sale.status_code, sale.json().get("id")],
+    "removed": removed.status_code,
+}))
+"""
+
+
+def _shard_url():
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{SHARD_DATABASE}" WITH (FORCE)'))
+            connection.execute(text(f'CREATE DATABASE "{SHARD_DATABASE}"'))
+    except (OperationalError, ProgrammingError):
+        return None
+    return engine.url.set(database=SHARD_DATABASE)
+
+
+@pytest.fixture
+def shard_url():
+    url = _shard_url()
+    if url is None:
+        pytest.skip("DATABASE_URL is not reachable or cannot create databases")
+    yield url
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM suppliers WHERE name = :name"), {"name": BRANCH_NAME})
+        connection.execute(text("DELETE FROM branches WHERE name = :name"), {"name": BRANCH_NAME})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{SHARD_DATABASE}" WITH (FORCE)'))
+
+
+def test_sale_in_sharded_branch_references_mirrored_rows(shard_url):
+    with engine.connect() as connection:
+        admin_id = connection.scalar(text("SELECT id FROM users WHERE role = 'Super Admin' ORDER BY id LIMIT 1"))
+        next_id = connection.scalar(text("SELECT max(id) + 1 FROM branches"))
+    if admin_id is None:
+        pytest.skip("no Super Admin to act as")
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(BACKEND),
+        "SHARD_DATABASE_URLS": shard_url.render_as_string(hide_password=False),
+        "SHARDED_BRANCH_IDS": ",".join(str(branch_id) for branch_id in range(next_id, next_id + 100)),
+        "BOOTSTRAP_IN_BACKGROUND": "false",
+        "RATE_LIMIT_ENABLED": "false",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", SCENARIO, str(admin_id), BRANCH_NAME],
+        cwd=BACKEND, env=env, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    outcome = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert outcome["branch"][0] == 201
+    assert outcome["supplier"][0] == 201
+    assert outcome["medicine"] == 201
+    assert outcome["sale"][0] == 201
+    # The supplier's medicine lives only on the shard, so the primary alone would have allowed the delete.
+    assert outcome["removed"] == 400
+
+    shard = create_engine(shard_url)
+    try:
+        with shard.connect() as connection:
+            assert connection.scalar(text("SELECT count(*) FROM sales WHERE id = :id"), {"id": outcome["sale"][1]}) == 1
+            assert connection.scalar(
+                text("SELECT count(*) FROM branches WHERE id = :id"), {"id": outcome["branch"][1]}
+            ) == 1
+    finally:
+        shard.dispose()
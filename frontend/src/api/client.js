@@ -12,7 +12,7 @@ function getStoredUser() {
   }
 }
 
-async function request(path, options = {}) {
+async function request(path, { raw = false, ...options } = {}) {
   const user = getStoredUser();
   const authHeaders =
     user && Number.isFinite(user.id)
@@ -42,6 +42,9 @@ async function request(path, options = {}) {
   }
 
   const text = await response.text();
+  if (raw) {
+    return text;
+  }
   if (!text) {
     return null;
   }
@@ -52,8 +55,16 @@ async function request(path, options = {}) {
 export const api = {
   login: (payload) => request("/auth/login", { method: "POST", body: JSON.stringify(payload) }),
   getStats: () => request("/dashboard/stats"),
+  getReorderSuggestions: (params = {}) =>
+    request(`/inventory/reorder-suggestions?${new URLSearchParams(params).toString()}`),
+  createReportJob: (kind, params = {}) =>
+    request("/reports/jobs", { method: "POST", body: JSON.stringify({ kind, params }) }),
+  getReportJob: (jobId) => request(`/reports/jobs/${jobId}`),
+  listReportJobs: () => request("/reports/jobs"),
   listMedicines: () => request("/medicines"),
   getMedicine: (medicineId) => request(`/medicines/${medicineId}`),
+  getMedicineByBarcode: (code) => request(`/medicines/by-barcode/${encodeURIComponent(code)}`),
+  resolveBarcodes: (codes) => request("/medicines/by-barcode", { method: "POST", body: JSON.stringify({ codes }) }),
   createMedicine: (payload) => request("/medicines", { method: "POST", body: JSON.stringify(payload) }),
   updateMedicine: (medicineId, payload) =>
     request(`/medicines/${medicineId}`, { method: "PUT", body: JSON.stringify(payload) }),
@@ -66,6 +77,8 @@ export const api = {
   updateSupplier: (supplierId, payload) => request(`/suppliers/${supplierId}`, { method: "PUT", body: JSON.stringify(payload) }),
   deleteSupplier: (supplierId) => request(`/suppliers/${supplierId}`, { method: "DELETE" }),
   listSales: () => request("/sales"),
+  getSaleReceipt: (saleId) => request(`/sales/${saleId}/receipt`, { raw: true }),
+  getSaleReceipts: (params) => request(`/sales/receipts?${new URLSearchParams(params).toString()}`, { raw: true }),
   getSale: (saleId) => request(`/sales/${saleId}`),
   createSale: (payload) => request("/sales", { method: "POST", body: JSON.stringify(payload) }),
   updateSale: (saleId, payload) => request(`/sales/${saleId}`, { method: "PATCH", body: JSON.stringify(payload) }),
@@ -90,3 +103,21 @@ export const api = {
   changePassword: (payload) =>
     request("/auth/change-password", { method: "POST", body: JSON.stringify(payload) }),
 };
+
+export function subscribeEvents(handlers) {
+  const user = getStoredUser();
+  if (!user || !Number.isFinite(user.id) || typeof EventSource === "undefined") {
+    return () => {};
+  }
+
+  const source = new EventSource(`${API_BASE}/events?user_id=${user.id}`);
+  Object.entries(handlers).forEach(([type, handler]) => {
+    source.addEventListener(type, (event) => handler(event.data ? JSON.parse(event.data) : {}));
+  });
+  return () => source.close();
+}
+
+export function applyStockChanges(items, changes) {
+  const qtyById = new Map(changes);
+  return items.map((item) => (qtyById.has(item.id) ? { ...item, stock_qty: qtyById.get(item.id) } : item));
+}
@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from "react";
-import { api } from "../api/client";
+import { api, applyStockChanges, subscribeEvents } from "../api/client";
 import { formatEtb } from "../utils/format";
 import { buildCsv, downloadCsv, filterByQuery, paginate } from "../utils/table";
 
@@ -7,6 +7,7 @@ const initialForm = {
   name: "",
   generic_name: "",
   batch_number: "",
+  barcode: "",
   expiry_date: "",
   unit_price: "",
   stock_qty: "",
@@ -45,6 +46,16 @@ export default function MedicinesPage() {
     load();
   }, []);
 
+  useEffect(
+    () =>
+      subscribeEvents({
+        "stock.changed": ({ items }) => setMedicines((current) => applyStockChanges(current, items)),
+        "medicine.deleted": ({ id }) => setMedicines((current) => current.filter((medicine) => medicine.id !== id)),
+        resync: () => load(),
+      }),
+    []
+  );
+
   useEffect(() => {
     setPage(1);
   }, [query, supplierFilter, pageSize]);
@@ -72,6 +83,7 @@ export default function MedicinesPage() {
         unit_price: Number(form.unit_price),
         stock_qty: Number(form.stock_qty),
         supplier_id: form.supplier_id ? Number(form.supplier_id) : null,
+        barcode: form.barcode || null,
       });
 
       setForm(initialForm);
@@ -164,6 +176,7 @@ export default function MedicinesPage() {
         <input className="rounded border px-3 py-2" placeholder="Medicine name" value={form.name} onChange={(e) => setForm({ ...form, name: e.target.value })} required />
         <input className="rounded border px-3 py-2" placeholder="Generic name" value={form.generic_name} onChange={(e) => setForm({ ...form, generic_name: e.target.value })} />
         <input className="rounded border px-3 py-2" placeholder="Batch" value={form.batch_number} onChange={(e) => setForm({ ...form, batch_number: e.target.value })} required />
+        <input className="rounded border px-3 py-2" placeholder="Barcode (optional)" value={form.barcode} onChange={(e) => setForm({ ...form, barcode: e.target.value })} />
         <input className="rounded border px-3 py-2" type="date" value={form.expiry_date} onChange={(e) => setForm({ ...form, expiry_date: e.target.value })} required />
         <input className="rounded border px-3 py-2" type="number" min="0.01" step="0.01" placeholder="Unit price (ETB)" value={form.unit_price} onChange={(e) => setForm({ ...form, unit_price: e.target.value })} required />
         <input className="rounded border px-3 py-2" type="number" min="0" placeholder="Stock qty" value={form.stock_qty} onChange={(e) => setForm({ ...form, stock_qty: e.target.value })} required />
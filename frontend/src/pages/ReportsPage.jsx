@@ -1,14 +1,13 @@
 import { useEffect, useMemo, useState } from "react";
 import { api } from "../api/client";
 import { formatEtbPlain } from "../utils/format";
-import { openSaleReceiptPrint } from "../utils/receipt";
+import { openReceiptPrint } from "../utils/receipt";
 import { filterByQuery, paginate } from "../utils/table";
 
 const pageSizes = [10, 25, 50];
 
 export default function ReportsPage() {
   const [sales, setSales] = useState([]);
-  const [medicineById, setMedicineById] = useState(new Map());
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [query, setQuery] = useState("");
@@ -18,9 +17,7 @@ export default function ReportsPage() {
   async function loadData() {
     try {
       setLoading(true);
-      const [salesData, medicinesData] = await Promise.all([api.listSales(), api.listMedicines()]);
-      setSales(salesData);
-      setMedicineById(new Map(medicinesData.map((medicine) => [medicine.id, medicine.name])));
+      setSales(await api.listSales());
       setError("");
     } catch (err) {
       setError(err?.message || "Failed to load reports");
@@ -53,13 +50,27 @@ export default function ReportsPage() {
 
   const { pageItems, pageCount, page: safePage, total } = paginate(filtered, page, pageSize);
 
-  function printReceipt(sale) {
-    const result = openSaleReceiptPrint(sale, medicineById);
-    if (!result.ok) {
-      setError(result.message);
+  async function printDocument(loadReceipts) {
+    try {
+      const result = openReceiptPrint(await loadReceipts());
+      if (!result.ok) {
+        setError(result.message);
+      }
+    } catch (err) {
+      setError(err?.message || "Failed to load receipts");
     }
   }
 
+  function printReceipt(sale) {
+    return printDocument(() => api.getSaleReceipt(sale.id));
+  }
+
+  function printTodaysReceipts() {
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
+    return printDocument(() => api.getSaleReceipts({ date_from: today.toISOString() }));
+  }
+
   return (
     <div className="space-y-4 rounded-xl border border-slate-200 bg-white p-4">
       <div className="flex flex-wrap items-center justify-between gap-3">
@@ -67,7 +78,16 @@ export default function ReportsPage() {
           <h3 className="text-lg font-semibold">Reports</h3>
           <p className="text-xs text-slate-500">{total} sales records</p>
         </div>
-        {loading ? <span className="text-xs text-slate-400">Loading...</span> : null}
+        <div className="flex items-center gap-3">
+          {loading ? <span className="text-xs text-slate-400">Loading...</span> : null}
+          <button
+            type="button"
+            onClick={printTodaysReceipts}
+            className="rounded-lg border border-slate-300 px-3 py-2 text-sm hover:bg-slate-50"
+          >
+            Reprint today's receipts
+          </button>
+        </div>
       </div>
 
       <div className="flex flex-wrap items-center gap-3">
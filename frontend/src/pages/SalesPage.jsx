@@ -1,7 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
-import { api } from "../api/client";
+import { api, applyStockChanges, subscribeEvents } from "../api/client";
 import { formatEtbPlain } from "../utils/format";
-import { openSaleReceiptPrint } from "../utils/receipt";
+import { openReceiptPrint } from "../utils/receipt";
 import { buildCsv, downloadCsv, filterByQuery, paginate } from "../utils/table";
 
 const pageSizes = [10, 25, 50];
@@ -12,6 +12,7 @@ export default function SalesPage() {
   const [lastCommittedSale, setLastCommittedSale] = useState(null);
   const [customerName, setCustomerName] = useState("");
   const [medicineId, setMedicineId] = useState("");
+  const [barcode, setBarcode] = useState("");
   const [quantity, setQuantity] = useState(1);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
@@ -38,6 +39,17 @@ export default function SalesPage() {
     loadAll();
   }, []);
 
+  useEffect(
+    () =>
+      subscribeEvents({
+        "stock.changed": ({ items }) => setMedicines((current) => applyStockChanges(current, items)),
+        "medicine.deleted": ({ id }) => setMedicines((current) => current.filter((medicine) => medicine.id !== id)),
+        "sale.deleted": ({ id }) => setSales((current) => current.filter((sale) => sale.id !== id)),
+        resync: () => loadAll(),
+      }),
+    []
+  );
+
   useEffect(() => {
     setPage(1);
   }, [query, pageSize]);
@@ -55,10 +67,27 @@ export default function SalesPage() {
       .join(", ");
   }
 
-  function printSaleReceipt(sale) {
-    const receiptResult = openSaleReceiptPrint(sale, medicineById);
-    if (!receiptResult.ok) {
-      setError(receiptResult.message);
+  async function printSaleReceipt(sale) {
+    try {
+      const receiptResult = openReceiptPrint(await api.getSaleReceipt(sale.id));
+      if (!receiptResult.ok) {
+        setError(receiptResult.message);
+      }
+    } catch (err) {
+      setError(err?.message || "Failed to load receipt");
+    }
+  }
+
+  async function onScan(e) {
+    if (e.key !== "Enter" || !barcode.trim()) return;
+    e.preventDefault();
+    try {
+      const medicine = await api.getMedicineByBarcode(barcode.trim());
+      setMedicineId(String(medicine.id));
+      setBarcode("");
+      setError("");
+    } catch (err) {
+      setError(err?.message || "Barcode not found");
     }
   }
 
@@ -119,6 +148,13 @@ export default function SalesPage() {
           onChange={(e) => setCustomerName(e.target.value)}
           className="w-full rounded-lg border border-slate-300 px-3 py-2"
         />
+        <input
+          placeholder="scan barcode"
+          value={barcode}
+          onChange={(e) => setBarcode(e.target.value)}
+          onKeyDown={onScan}
+          className="w-full rounded-lg border border-slate-300 px-3 py-2"
+        />
         <select
           required
           value={medicineId}
@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from "react";
-import { api } from "../api/client";
+import { api, applyStockChanges, subscribeEvents } from "../api/client";
 import { formatEtbPlain } from "../utils/format";
 import { buildCsv, downloadCsv, filterByQuery, paginate } from "../utils/table";
 
@@ -39,6 +39,22 @@ export default function StockPage() {
     loadStock();
   }, []);
 
+  useEffect(
+    () =>
+      subscribeEvents({
+        "stock.changed": ({ items }) =>
+          setRows((current) =>
+            applyStockChanges(current, items).map((row) => ({
+              ...row,
+              stock_value: Number(row.unit_price || 0) * Number(row.stock_qty || 0),
+            }))
+          ),
+        "medicine.deleted": ({ id }) => setRows((current) => current.filter((row) => row.id !== id)),
+        resync: () => loadStock(),
+      }),
+    []
+  );
+
   useEffect(() => {
     setPage(1);
   }, [query, pageSize]);